@@ -0,0 +1,107 @@
+import unittest
+from unittest import mock
+import sqlite3
+
+try:
+  import pyarrow
+except ImportError:
+  pyarrow = None
+
+try:
+  import pandas
+except ImportError:
+  pandas = None
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+from grizzly.generator import GrizzlyGenerator
+
+@unittest.skipUnless(pyarrow, "pyarrow is not installed")
+class ArrowTest(unittest.TestCase):
+
+  def setUp(self):
+    c = sqlite3.connect(":memory:")
+    c.execute("create table numbers (n int, half real, name text, maybe int)")
+    c.executemany("insert into numbers values (?, ?, ?, ?)", [(i, i / 2, f"n{i}", None if i < 8 else i) for i in range(25)])
+    # SQLite does not enforce column types
+    c.execute("create table mixed (v)")
+    c.executemany("insert into mixed values (?)", [(i,) for i in range(5)] + [(i + 0.5,) for i in range(5)])
+    grizzly.use(RelationalExecutor(c, SQLGenerator("sqlite")))
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_toArrow(self):
+    df = grizzly.read_table("numbers")
+    t = df.to_arrow(batchSize=7)
+
+    self.assertEqual(t.num_rows, 25)
+    self.assertEqual(len(t.to_batches()), 4)
+    self.assertEqual(t.schema.names, ["n", "half", "name", "maybe"])
+    self.assertEqual(t.schema.field("n").type, pyarrow.int64())
+    self.assertEqual(t.schema.field("half").type, pyarrow.float64())
+    self.assertEqual(t.schema.field("name").type, pyarrow.string())
+    # the first batch contains only NULLs
+    self.assertEqual(t.schema.field("maybe").type, pyarrow.int64())
+    self.assertEqual(t.column("maybe").to_pylist(), [None] * 8 + list(range(8, 25)))
+
+  def test_mixedBatchTypes(self):
+    df = grizzly.read_table("mixed")
+    t = df.to_arrow(batchSize=5)
+
+    self.assertEqual(len(t.to_batches()), 2)
+    self.assertEqual(t.schema.field("v").type, pyarrow.float64())
+    self.assertEqual(t.column("v").to_pylist(), [0, 1, 2, 3, 4, 0.5, 1.5, 2.5, 3.5, 4.5])
+
+  def test_emptyWithSchema(self):
+    df = grizzly.read_table("numbers", schema={"n": int, "half": float, "name": str, "maybe": int})
+    df = df[df.n > 100]
+    t = df.to_arrow()
+
+    self.assertEqual(t.num_rows, 0)
+    self.assertEqual(t.schema.field("name").type, pyarrow.string())
+    self.assertEqual(t.schema.field("n").type, pyarrow.float64())
+
+  def test_toDf(self):
+    df = grizzly.read_table("numbers")
+    df = df[df.n >= 20]
+    p_df = GrizzlyGenerator.to_df(df)
+
+    self.assertEqual(list(p_df.columns), ["n", "half", "name", "maybe"])
+    self.assertEqual(p_df["n"].tolist(), [20, 21, 22, 23, 24])
+    self.assertEqual(p_df["name"].tolist(), ["n20", "n21", "n22", "n23", "n24"])
+
+  def test_toDfUnpivot(self):
+    df = grizzly.read_table("numbers", schema={"n": int, "half": float, "name": str, "maybe": int})
+    p_df = GrizzlyGenerator.to_df(df.describe())
+
+    self.assertEqual(list(p_df.columns), ["min", "max", "mean", "count"])
+    self.assertEqual(p_df["max"].tolist(), [24, 12.0, 24])
+
+@unittest.skipUnless(pandas, "pandas is not installed")
+class PandasTest(unittest.TestCase):
+
+  def setUp(self):
+    c = sqlite3.connect(":memory:")
+    c.execute("create table numbers (n int, name text)")
+    c.executemany("insert into numbers values (?, ?)", [(i, f"n{i}") for i in range(25)])
+    grizzly.use(RelationalExecutor(c, SQLGenerator("sqlite")))
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_toDfWithoutArrow(self):
+    df = grizzly.read_table("numbers", schema={"n": int, "name": str})
+    # the import of pyarrow fails
+    with mock.patch.dict("sys.modules", {"pyarrow": None}):
+      p_df = GrizzlyGenerator.to_df(df[df.n >= 20])
+      p_desc = GrizzlyGenerator.to_df(df.describe())
+
+    self.assertEqual(list(p_df.columns), ["n", "name"])
+    self.assertEqual(p_df["n"].tolist(), [20, 21, 22, 23, 24])
+    self.assertEqual(list(p_desc.columns), ["min", "max", "mean", "count"])
+    self.assertEqual(p_desc["max"].tolist(), [24])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import asyncio
+import sqlite3
+import tempfile
+import os
+
+import aiosqlite
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.asyncexecutor import AsyncRelationalExecutor
+
+class AsyncTest(unittest.TestCase):
+
+  def setUp(self):
+    (fd, self.path) = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    c = sqlite3.connect(self.path)
+    c.execute("create table numbers (n int, name text)")
+    c.executemany("insert into numbers values (?, ?)", [(i, f"n{i}") for i in range(25)])
+    c.commit()
+    c.close()
+
+  def tearDown(self):
+    os.remove(self.path)
+
+  def run_both(self, test):
+    # with the thread offloading for sqlite3 and natively with aiosqlite
+    async def sync():
+      executor = AsyncRelationalExecutor(sqlite3.connect(self.path, check_same_thread=False), SQLGenerator("sqlite"), batchSize=4)
+      grizzly.use(executor)
+      try:
+        await test()
+      finally:
+        await executor.aclose()
+
+    async def native():
+      executor = AsyncRelationalExecutor(await aiosqlite.connect(self.path), SQLGenerator("sqlite"), batchSize=4)
+      grizzly.use(executor)
+      try:
+        await test()
+      finally:
+        await executor.aclose()
+
+    asyncio.run(sync())
+    asyncio.run(native())
+
+  def test_acollect(self):
+    async def test():
+      df = grizzly.read_table("numbers")
+      df = df[df.n < 3]
+      self.assertEqual(await df.acollect(), [[0, "n0"], [1, "n1"], [2, "n2"]])
+      self.assertEqual((await df.acollect(includeHeader=True))[0], ["n", "name"])
+    self.run_both(test)
+
+  def test_afirst(self):
+    async def test():
+      df = grizzly.read_table("numbers")
+      self.assertEqual(await df[df.n == 7].afirst(), (7, "n7"))
+      self.assertIsNone(await df[df.n > 100].afirst())
+    self.run_both(test)
+
+  def test_asyncIteration(self):
+    async def test():
+      df = grizzly.read_table("numbers")
+      rows = [row async for row in df]
+      self.assertEqual([r[0] for r in rows], list(range(25)))
+
+      sizes = [len(batch) async for batch in df.abatches(10)]
+      self.assertEqual(sizes, [10, 10, 5])
+    self.run_both(test)
+
+  def test_earlyBreak(self):
+    async def test():
+      df = grizzly.read_table("numbers")
+      it = df.__aiter__()
+      self.assertEqual((await it.__anext__())[0], 0)
+      await it.aclose()
+      self.assertEqual(len(await df.acollect()), 25)
+    self.run_both(test)
+
+  def test_ato_df(self):
+    async def test():
+      df = grizzly.read_table("numbers")
+      df = df[df.n >= 20]
+      p_df = await df.ato_df()
+      self.assertEqual(list(p_df.columns), ["n", "name"])
+      self.assertEqual(p_df["n"].tolist(), [20, 21, 22, 23, 24])
+    self.run_both(test)
+
+  def test_syncActions(self):
+    executor = AsyncRelationalExecutor(sqlite3.connect(self.path), SQLGenerator("sqlite"))
+    grizzly.use(executor)
+    self.assertEqual(len(grizzly.read_table("numbers")), 25)
+    executor.close()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sqlite3
+
+from matcher import CodeMatcher
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class BindParamsTest(CodeMatcher):
+
+  def setUp(self):
+    c = sqlite3.connect("grizzly.db")
+    self.gen = SQLGenerator("sqlite", bindParams=True)
+    executor = RelationalExecutor(c, self.gen)
+    grizzly.use(executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_paramstyleFromConnection(self):
+    self.assertEqual(self.gen.paramstyle, "qmark")
+
+  def test_qmark(self):
+    df = grizzly.read_table("events")
+    df = df[(df.theyear == 2015) & (df.actor1name == "ZUNI")]
+
+    (pre, sql, params) = self.gen.generateParameterized(df)
+    self.matchSnipped(sql, "select * from (select * from events $t0) $t1 where $t1.theyear = ? and $t1.actor1name = ?")
+    self.assertEqual(params, [2015, "ZUNI"])
+
+    # the query text is unchanged
+    self.matchSnipped(df.generateQuery(), "select * from (select * from events $t0) $t1 where $t1.theyear = 2015 and $t1.actor1name = 'ZUNI'")
+
+  def test_textualOrder(self):
+    df = grizzly.read_table("events")
+    df = df[df.theyear == 2015]
+    df["next"] = df.theyear + 1
+    df = df[df.monthyear > 201501]
+
+    (pre, sql, params) = self.gen.generateParameterized(df)
+    self.matchSnipped(sql, "select * from (select *, ($t1.theyear + ?) as next from (select * from events $t0) $t1 where $t1.theyear = ?) $t2 where $t2.monthyear > ?")
+    self.assertEqual(params, [1, 2015, 201501])
+
+  def test_limitInline(self):
+    df = grizzly.read_table("events")
+    df = df[df.theyear == 2015]
+    df = df[2:10]
+
+    (pre, sql, params) = self.gen.generateParameterized(df)
+    self.matchSnipped(sql, "select $t2.* from (select * from (select * from events $t0) $t1 where $t1.theyear = ?) $t2 limit 10 offset 2")
+    self.assertEqual(params, [2015])
+
+  def test_named(self):
+    gen = SQLGenerator("oracle", bindParams=True, paramstyle="named")
+    df = grizzly.read_table("events")
+    df = df[(df.theyear == 2015) | (df.theyear == 2016)]
+
+    (pre, sql, params) = gen.generateParameterized(df)
+    self.matchSnipped(sql, "select * from (select * from events $t0) $t1 where $t1.theyear = :p1 or $t1.theyear = :p2")
+    self.assertEqual(params, {"p1": 2015, "p2": 2016})
+
+  def test_pyformatEscape(self):
+    gen = SQLGenerator("postgresql", bindParams=True, paramstyle="pyformat")
+    df = grizzly.read_table("events")
+    df = df[df.theyear % 4 == 1]
+
+    (pre, sql, params) = gen.generateParameterized(df)
+    self.matchSnipped(sql, "select * from (select * from events $t0) $t1 where $t1.theyear %% %(p1)s = %(p2)s")
+    self.assertEqual(params, {"p1": 4, "p2": 1})
+
+  def test_pyformatNoParams(self):
+    gen = SQLGenerator("postgresql", bindParams=True, paramstyle="pyformat")
+    df = grizzly.read_table("events")
+    df = df[(df.theyear % df.globaleventid) == df.theyear]
+
+    (pre, sql, params) = gen.generateParameterized(df)
+    self.matchSnipped(sql, "select * from (select * from events $t0) $t1 where $t1.theyear % $t1.globaleventid = $t1.theyear")
+    self.assertEqual(params, {})
+
+  def test_sameResult(self):
+    df = grizzly.read_table("events")
+    df = df[(df.globaleventid <= 468189636) & (df.actor1name != None)]
+    df = df[["globaleventid", "actor1name"]]
+
+    bound = df.collect()
+
+    self.gen.bindParams = False
+    inlined = df.collect()
+
+    self.assertEqual(bound, inlined)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+from grizzly import columnar
+
+import sqlite3
+import sys
+import time
+from decimal import Decimal
+
+# Compares the value conversion of collect() before (one convert() call per value) and
+# after (column-wise per batch) on the rows of an in-memory SQLite table.
+# Usage: python collect_benchmark.py [number of rows]
+
+numRows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+repetitions = 3
+
+# return the "price" column as Decimal, like the NUMERIC columns of PostgreSQL or Oracle
+sqlite3.register_converter("DECIMAL", lambda b: Decimal(b.decode()))
+con = sqlite3.connect(":memory:", detect_types=sqlite3.PARSE_DECLTYPES)
+con.execute("create table facts (id int, name text, value real, price decimal, note text)")
+con.executemany("insert into facts values (?, ?, ?, ?, ?)",
+  ((i, f"name{i % 1000}", i / 3, str(i % 977) + ".25", None if i % 10 == 0 else "x") for i in range(numRows)))
+
+def fetchBatches(query):
+  cursor = con.cursor()
+  cursor.execute(query)
+  batches = []
+  while True:
+    rows = cursor.fetchmany(columnar.DEFAULT_BATCH_SIZE)
+    if not rows:
+      break
+    batches.append(rows)
+  cursor.close()
+  return batches
+
+def perValue(batches):
+  # the implementation of collect() before the column-wise conversion
+  return [[columnar.convertValue(elem) for elem in row] for rows in batches for row in rows]
+
+def columnWise(batches):
+  converter = columnar.RowConverter()
+  result = []
+  for rows in batches:
+    result.extend(converter.convert(rows))
+  return result
+
+def measure(name, func, batches):
+  best = None
+  for _ in range(repetitions):
+    start = time.perf_counter()
+    result = func(batches)
+    duration = time.perf_counter() - start
+    best = duration if best is None else min(best, duration)
+  print(f"{name:>28}: {best:6.2f}s {numRows / best:12,.0f} rows/sec")
+  return result
+
+for (title, query) in [("int, text, real", "select id, name, value from facts"),
+                       ("with Decimal and NULL values", "select * from facts")]:
+  batches = fetchBatches(query)
+  print(title)
+  before = measure("per value (before)", perValue, batches)
+  after = measure("column-wise (after)", columnWise, batches)
+  assert before == after, "results differ"
@@ -0,0 +1,55 @@
+import unittest
+import sqlite3
+import tempfile
+import os
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+from grizzly.pool import PooledExecutor
+
+class CollectAllTest(unittest.TestCase):
+
+  def setUp(self):
+    (fd, self.path) = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    c = sqlite3.connect(self.path)
+    c.execute("create table numbers (n int, name text)")
+    c.executemany("insert into numbers values (?, ?)", [(i, f"n{i}") for i in range(100)])
+    c.commit()
+    c.close()
+
+  def tearDown(self):
+    grizzly.close()
+    os.remove(self.path)
+
+  def frames(self):
+    df = grizzly.read_table("numbers")
+    return [df[df.n < i] for i in range(1, 21)]
+
+  def check(self, results):
+    self.assertEqual(len(results), 20)
+    for (i, res) in enumerate(results):
+      self.assertEqual(len(res.rows), i + 1)
+      self.assertGreaterEqual(res.elapsed, 0)
+      self.assertIn(f"< {i + 1}", res.sql)
+
+  def test_singleConnection(self):
+    grizzly.use(RelationalExecutor(sqlite3.connect(self.path), SQLGenerator("sqlite")))
+    self.check(grizzly.collect_all(self.frames()))
+
+  def test_pooled(self):
+    executor = PooledExecutor(lambda: sqlite3.connect(self.path, check_same_thread=False), minSize=0, maxSize=4, queryGenerator=SQLGenerator("sqlite"))
+    grizzly.use(executor)
+
+    self.check(grizzly.collect_all(self.frames(), parallelism=3))
+    self.assertLessEqual(executor.pool._size, 3)
+
+  def test_header(self):
+    grizzly.use(RelationalExecutor(sqlite3.connect(self.path), SQLGenerator("sqlite")))
+    df = grizzly.read_table("numbers")
+    [res] = grizzly.collect_all([df[df.n == 3]], includeHeader=True)
+    self.assertEqual(res.rows, [["n", "name"], [3, "n3"]])
+
+if __name__ == "__main__":
+    unittest.main()
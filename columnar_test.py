@@ -0,0 +1,31 @@
+import unittest
+import datetime
+from decimal import Decimal
+
+from grizzly.columnar import RowConverter, convertValue
+
+class RowConverterTest(unittest.TestCase):
+
+  def assertSameAsPerValue(self, rows):
+    expected = [[convertValue(v) for v in row] for row in rows]
+    self.assertEqual(RowConverter().convert(rows), expected)
+
+  def test_plain(self):
+    rows = [(1, "a", 1.5, True), (2, "b", 2.5, False)]
+    self.assertEqual(RowConverter().convert(rows), [[1, "a", 1.5, True], [2, "b", 2.5, False]])
+
+  def test_decimal(self):
+    rows = [(1, Decimal("1.25")), (2, Decimal("2.5"))]
+    self.assertEqual(RowConverter().convert(rows), [[1, 1.25], [2, 2.5]])
+
+  def test_nulls(self):
+    self.assertSameAsPerValue([(1, None), (None, "b"), (3, Decimal("3.5"))])
+
+  def test_otherTypes(self):
+    self.assertSameAsPerValue([(datetime.date(2021, 1, 2), b"x"), (datetime.date(2021, 1, 3), Decimal("1"))])
+
+  def test_empty(self):
+    self.assertEqual(RowConverter().convert([]), [])
+
+if __name__ == "__main__":
+    unittest.main()
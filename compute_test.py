@@ -0,0 +1,63 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class ComputeTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.con.execute("create table facts (id int, x real)")
+    self.con.executemany("insert into facts values (?, ?)", [(i, i * 1.5) for i in range(10)])
+    self.con.commit()
+
+    self.statements = []
+    self.con.set_trace_callback(self.statements.append)
+    grizzly.use(RelationalExecutor(self.con))
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_singleQuery(self):
+    df = grizzly.read_table("facts")
+    df = df[df.id > 2]
+
+    (n, top, avg, total) = grizzly.compute(df.lazy.len(), df.lazy.max("x"), df.lazy.mean("x"), df.lazy.sum("id"))
+    self.assertEqual((n, top, avg, total), (7, 13.5, 9.0, 42))
+
+    self.assertEqual(len(self.statements), 1)
+    self.assertEqual(self.statements[0].upper().count("FROM FACTS"), 1)
+
+  def test_sameOperations(self):
+    # independently built frames with the same operations are merged
+    df1 = grizzly.read_table("facts")
+    df2 = grizzly.read_table("facts")
+
+    self.assertEqual(grizzly.compute(df1.lazy.min("id"), df2.lazy.max("id")), (0, 9))
+    self.assertEqual(len(self.statements), 1)
+
+  def test_severalSources(self):
+    df = grizzly.read_table("facts")
+    filtered = df[df.id < 5]
+
+    self.assertEqual(grizzly.compute(df.lazy.count(), filtered.lazy.count(), df.lazy.count("id")), (10, 5, 10))
+    self.assertEqual(len(self.statements), 2)
+
+  def test_duplicates(self):
+    df = grizzly.read_table("facts")
+    self.assertEqual(grizzly.compute(df.lazy.max("x"), df.lazy.max(df.x)), (13.5, 13.5))
+    self.assertEqual(self.statements[0].lower().count("max("), 1)
+
+  def test_singleColumn(self):
+    df = grizzly.read_table("facts", schema={"id": int, "x": float})
+    self.assertEqual(df["x"].lazy.min().compute(), 0.0)
+    self.assertRaises(ValueError, lambda: df.lazy.min())
+
+  def test_invalid(self):
+    df = grizzly.read_table("facts")
+    self.assertRaises(ValueError, lambda: grizzly.compute(df.lazy.len(), 3))
+    self.assertRaises(ValueError, lambda: df.groupby(["id"]).lazy.len())
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.relationaldbexecutor import RelationalExecutor
+from grizzly.sqlgenerator import SQLGenerator
+
+class ContainsTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.con.execute("create table people (id int, name text)")
+    self.con.executemany("insert into people values (?, ?)", [(i, f"n{i}") for i in range(100)])
+    self.con.commit()
+
+    self.statements = []
+    self.con.set_trace_callback(self.statements.append)
+    self.executor = RelationalExecutor(self.con)
+    grizzly.use(self.executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def people(self):
+    return grizzly.read_table("people", schema={"id": int, "name": str})
+
+  def test_existsProbe(self):
+    df = self.people()
+
+    self.assertTrue((5, "n5") in df)
+    self.assertFalse((5, "n6") in df)
+
+    # one probe per check, no row count
+    self.assertEqual(len(self.statements), 2)
+    self.assertTrue(all("EXISTS" in s for s in self.statements))
+
+  def test_existsQuery(self):
+    gen = SQLGenerator("sqlite")
+    df = self.people()
+    (pre, sql, params) = gen.generateExists(df[df.id == 5])
+    self.assertEqual(pre, [])
+    self.assertIsNone(params)
+    self.assertTrue(sql.startswith("SELECT CASE WHEN EXISTS (SELECT"))
+
+  def test_containsMany(self):
+    df = self.people()
+    candidates = [(1, "n1"), (2, "x"), (99, "n99"), (100, "n100"), (1, "n1")]
+
+    self.assertEqual(df.contains_many(candidates), [True, False, True, False, True])
+    self.assertEqual(len(self.statements), 1)
+
+  def test_containsManyFiltered(self):
+    df = self.people()
+    df = df[df.id > 50]
+    df = df[[df.name]]
+    self.assertEqual(df.contains_many(["n10", "n60"]), [False, True])
+
+  def test_containsManyChunks(self):
+    old = RelationalExecutor.MAX_PARAMS
+    RelationalExecutor.MAX_PARAMS = 9
+    try:
+      candidates = [(i, f"n{i}") for i in range(90, 110)]
+      self.assertEqual(self.people().contains_many(candidates), [i < 100 for i in range(90, 110)])
+      # 3 candidates per query
+      self.assertEqual(len(self.statements), 7)
+    finally:
+      RelationalExecutor.MAX_PARAMS = old
+
+  def test_containsManyParameterized(self):
+    self.executor.queryGenerator = SQLGenerator("sqlite", bindParams=True, paramstyle="qmark")
+    df = self.people()
+    df = df[df.name != "n1"]
+    self.assertEqual(df.contains_many([(1, "n1"), (2, "n2"), (3, "n4")]), [False, True, False])
+    self.assertTrue((2, "n2") in df)
+
+  def test_containsManyQuote(self):
+    df = self.people()
+    self.assertEqual(df.contains_many([(1, "it's")]), [False])
+
+  def test_containsManyInvalid(self):
+    df = self.people()
+    self.assertRaises(ValueError, lambda: df.contains_many([(1,)]))
+    self.assertRaises(TypeError, lambda: df.contains_many([("1", "n1")]))
+    self.assertEqual(df.contains_many([]), [])
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import sqlite3
+
+from matcher import CodeMatcher
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class CTETest(CodeMatcher):
+
+  def setUp(self):
+    c = sqlite3.connect("grizzly.db")
+    self.gen = SQLGenerator("sqlite", cte=True)
+    executor = RelationalExecutor(c, self.gen)
+    grizzly.use(executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def base(self):
+    df = grizzly.read_table("events")
+    return df[df.theyear >= 2015]
+
+  def test_sharedByIdentity(self):
+    df = self.base()
+    u = df[["globaleventid"]].union(df[["actor1name"]])
+
+    actual = u.generateQuery()
+    expected = "with cte_$t1 as (select * from (select * from events $t0) $t1 where $t1.theyear >= 2015) select $t2.globaleventid from (select * from cte_$t1) $t2 union all select $t3.actor1name from (select * from cte_$t1) $t3"
+    self.matchSnipped(actual, expected)
+
+  def test_sharedByFingerprint(self):
+    l = self.base()
+    r = self.base()
+    j = l.join(r, on = ["globaleventid", "globaleventid"], how = "inner")
+
+    actual = j.generateQuery()
+    expected = "with cte_$t1 as (select * from (select * from events $t0) $t1 where $t1.theyear >= 2015) select * from (select * from cte_$t1) $t1 inner join (select * from cte_$t1) $t3 on $t1.globaleventid = $t3.globaleventid"
+    self.matchSnipped(actual, expected)
+
+  def test_optimized(self):
+    self.gen.optimize = True
+    df = self.base()
+    u = df[["globaleventid"]].union(df[["actor1name"]])
+
+    actual = u.generateQuery()
+    expected = "with cte_$t1 as (select * from events $t0 where $t0.theyear >= 2015) select $t2.globaleventid from cte_$t1 $t2 union all select $t3.actor1name from cte_$t1 $t3"
+    self.matchSnipped(actual, expected)
+
+  def test_tablesNotShared(self):
+    df = grizzly.read_table("events")
+    u = df[["globaleventid"]].union(df[["actor1name"]])
+    self.assertNotIn("WITH", u.generateQuery())
+
+  def test_materialized(self):
+    gen = SQLGenerator("postgresql", cte=True, materializeCTEs=True)
+    df = self.base()
+    u = df[["globaleventid"]].union(df[["actor1name"]])
+
+    (pre, actual) = gen.generate(u)
+    expected = "with cte_$t1 as materialized (select * from (select * from events $t0) $t1 where $t1.theyear >= 2015) select $t2.globaleventid from (select * from cte_$t1) $t2 union all select $t3.actor1name from (select * from cte_$t1) $t3"
+    self.matchSnipped(actual, expected)
+
+  def test_disabledByDefault(self):
+    df = self.base()
+    u = df[["globaleventid"]].union(df[["actor1name"]])
+    (pre, actual) = SQLGenerator("sqlite").generate(u)
+    self.assertNotIn("WITH", actual)
+
+  def test_sameResult(self):
+    df = grizzly.read_table("events", schema={"globaleventid": int, "theyear": int, "monthyear": int})
+    df = df[df.globaleventid < 468189636]
+    d = df.describe()
+
+    withCTE = d.collect()
+
+    self.gen.cte = False
+    inlined = d.collect()
+
+    self.assertEqual(withCTE, inlined)
+
+if __name__ == "__main__":
+    unittest.main()
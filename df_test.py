@@ -1191,7 +1191,7 @@ $$ LANGUAGE plpython3u; SELECT sentiment, count($t0.review) FROM (SELECT *, appl
     df = grizzly.read_table("b", index="globaleventid", schema = {"globaleventid":int, "actor1name":str, "actor1countrycode":str,"actiongeo_long":float})
     # df = df[[df.globaleventid, df.actor1name, df.actiongeo_long]]
     actual = df.describe().generateQuery()
-    expected = "SELECT min($t1.globaleventid) as min, max($t1.globaleventid) as max, avg($t1.globaleventid) as mean, count($t1.globaleventid) as count FROM (SELECT * from b $t0) $t1 UNION ALL SELECT min($t2.actiongeo_long) as min, max($t2.actiongeo_long) as max, avg($t2.actiongeo_long) as mean, count($t2.actiongeo_long) as count FROM (SELECT * from b $t0) $t2"
+    expected = "SELECT min($t1.globaleventid) as min_0, max($t1.globaleventid) as max_0, avg($t1.globaleventid) as mean_0, count($t1.globaleventid) as count_0, min($t1.actiongeo_long) as min_1, max($t1.actiongeo_long) as max_1, avg($t1.actiongeo_long) as mean_1, count($t1.actiongeo_long) as count_1 FROM (SELECT * from b $t0) $t1"
 
     self.matchSnipped(actual, expected)
 
@@ -1199,10 +1199,42 @@ $$ LANGUAGE plpython3u; SELECT sentiment, count($t0.review) FROM (SELECT *, appl
     df = grizzly.read_table("b", index="globaleventid", schema = {"globaleventid":int, "actor1name":str, "actor1countrycode":str,"actiongeo_long":float})
     df = df[[df.globaleventid, df.actor1name, df.actiongeo_long]]
     actual = df.describe().generateQuery()
-    expected = "SELECT min($t1.globaleventid) as min, max($t1.globaleventid) as max, avg($t1.globaleventid) as mean, count($t1.globaleventid) as count FROM (SELECT $t3.globaleventid, $t3.actor1name, $t3.actiongeo_long FROM (SELECT * from b $t0) $t3) $t1 UNION ALL SELECT min($t2.actiongeo_long) as min, max($t2.actiongeo_long) as max, avg($t2.actiongeo_long) as mean, count($t2.actiongeo_long) as count FROM (SELECT $t3.globaleventid, $t3.actor1name, $t3.actiongeo_long FROM (SELECT * from b $t0) $t3) $t2"
+    expected = "SELECT min($t2.globaleventid) as min_0, max($t2.globaleventid) as max_0, avg($t2.globaleventid) as mean_0, count($t2.globaleventid) as count_0, min($t2.actiongeo_long) as min_1, max($t2.actiongeo_long) as max_1, avg($t2.actiongeo_long) as mean_1, count($t2.actiongeo_long) as count_1 FROM (SELECT $t1.globaleventid, $t1.actor1name, $t1.actiongeo_long FROM (SELECT * from b $t0) $t1) $t2"
 
     self.matchSnipped(actual, expected)
 
+  def test_describeCollect(self):
+    df = grizzly.read_table("t3", index="globaleventid", schema = {"globaleventid":int, "actor1name":str, "actor1countrycode":str,"actiongeo_long":float})
+    actual = df.describe().collect(includeHeader=True)
+
+    self.assertEqual(actual[0], ["min", "max", "mean", "count"])
+    self.assertEqual(len(actual), 2+1, "expected one row per numeric column") # + header
+    self.assertEqual(actual[2][0], df.min("actiongeo_long"))
+    self.assertEqual(actual[2][1], df.max("actiongeo_long"))
+
+  def test_describeNotLast(self):
+    df = grizzly.read_table("t3", index="globaleventid", schema = {"globaleventid":int, "actor1name":str, "actor1countrycode":str,"actiongeo_long":float})
+    d = df.describe()
+
+    with self.assertRaises(ValueError):
+      d[d["min"] > 0].generateQuery()
+
+  def test_describeLen(self):
+    df = grizzly.read_table("t3", index="globaleventid", schema = {"globaleventid":int, "actor1name":str, "actor1countrycode":str,"actiongeo_long":float})
+    d = df.describe()
+
+    # the reshaped rows are counted on the client
+    self.assertEqual(len(d), 2)
+    self.assertEqual(d.shape, (4, 2))
+    self.assertEqual(len(list(d)), 2)
+    self.assertEqual(len(df.max()), 4)
+
+  def test_tableAggNoColumns(self):
+    df = grizzly.read_table("t3", index="globaleventid", schema = {"globaleventid":int, "actor1name":str, "actor1countrycode":str,"actiongeo_long":float})
+    df = df[[df.actor1name, df.actor1countrycode]]
+    self.assertIsNone(df.mean())
+    self.assertIsNone(df.sum())
+
   def test_describeFunc(self):
 
     from grizzly.generator import GrizzlyGenerator
@@ -1225,9 +1257,9 @@ $$ LANGUAGE plpython3u; SELECT sentiment, count($t0.review) FROM (SELECT *, appl
     l = l + l
     return l
     $$ LANGUAGE plpython3u;
-    SELECT min($t1.globaleventid) as min, max($t1.globaleventid) as max, avg($t1.globaleventid) as mean, count($t1.globaleventid) as count FROM (SELECT $t4.globaleventid, myfunc($t4.actor1name) as newcol FROM (SELECT * from b $t0) $t4) $t1 
-    UNION ALL 
-    SELECT min($t3.newcol) as min, max($t3.newcol) as max, avg($t3.newcol) as mean, count($t3.newcol) as count FROM (SELECT $t4.globaleventid, myfunc($t4.actor1name) as newcol FROM (SELECT * from b $t0) $t4) $t3"""
+    SELECT min($t1.globaleventid) as min_0, max($t1.globaleventid) as max_0, avg($t1.globaleventid) as mean_0, count($t1.globaleventid) as count_0,
+      min($t1.newcol) as min_1, max($t1.newcol) as max_1, avg($t1.newcol) as mean_1, count($t1.newcol) as count_1
+    FROM (SELECT $t4.globaleventid, myfunc($t4.actor1name) as newcol FROM (SELECT * from b $t0) $t4) $t1"""
     ""
 
 
@@ -0,0 +1,113 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.aggregates import AggregateType
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class FingerprintTest(unittest.TestCase):
+
+  def setUp(self):
+    c = sqlite3.connect("grizzly.db")
+    self.gen = SQLGenerator("sqlite", cacheSize=2)
+    executor = RelationalExecutor(c, self.gen)
+    grizzly.use(executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def pipeline(self, year = 2015, ascending = True):
+    df = grizzly.read_table("events")
+    df = df[(df.theyear == year) & (df.actor1name != None)]
+    df["next"] = df.theyear + 1
+    j = df.join(grizzly.read_table("t3"), on = ["globaleventid", "globaleventid"], how = "left")
+    g = j.groupby(["actor1countrycode"])
+    a = g.agg(col="next", aggType=AggregateType.MAX, alias="m")
+    return a.sort_values("m", ascending=ascending)
+
+  def test_sameStructure(self):
+    df1 = self.pipeline()
+    df2 = self.pipeline()
+
+    self.assertNotEqual(df1.alias, df2.alias)
+    self.assertEqual(df1.fingerprint(), df2.fingerprint())
+
+  def test_differentStructure(self):
+    fp = self.pipeline().fingerprint()
+
+    self.assertNotEqual(fp, self.pipeline(year = 2016).fingerprint())
+    self.assertNotEqual(fp, self.pipeline(ascending = False).fingerprint())
+
+    df = grizzly.read_table("events")
+    self.assertNotEqual(df[df.theyear == 2015].fingerprint(), df[df.theyear == "2015"].fingerprint())
+    self.assertNotEqual(df[df.theyear == 2015].fingerprint(), df[df.monthyear == 2015].fingerprint())
+
+  def test_udf(self):
+    def myfunc(a: int) -> str:
+      return a+"_grizzly"
+
+    def myfunc2(a: int) -> str:
+      return a+"_bear"
+
+    def udfFrame(func):
+      df = grizzly.read_table("events")
+      df["newid"] = df["globaleventid"].map(func)
+      return df
+
+    fp = udfFrame(myfunc).fingerprint()
+    self.assertEqual(fp, udfFrame(myfunc).fingerprint())
+    self.assertNotEqual(fp, udfFrame(myfunc2).fingerprint())
+
+  def test_cacheHit(self):
+    (pre1, sql1) = self.pipeline().generate()
+    (pre2, sql2) = self.pipeline().generate()
+
+    self.assertEqual(sql1, sql2)
+    self.assertEqual(pre1, pre2)
+    info = self.gen.cacheInfo()
+    self.assertEqual(info.hits, 1)
+    self.assertEqual(info.misses, 1)
+    self.assertEqual(info.size, 1)
+
+  def test_cacheMode(self):
+    self.pipeline().generate()
+    self.gen.optimize = True
+    (_, sql) = self.pipeline().generate()
+    self.gen.optimize = False
+
+    self.assertEqual(self.gen.cacheInfo().misses, 2)
+    self.assertNotEqual(sql, self.pipeline().generate()[1])
+
+  def test_cacheEviction(self):
+    self.pipeline(year = 2013).generate()
+    self.pipeline(year = 2014).generate()
+    self.pipeline(year = 2013).generate()
+    self.pipeline(year = 2015).generate()
+
+    # 2014 was used least recently
+    self.pipeline(year = 2013).generate()
+    self.pipeline(year = 2014).generate()
+    info = self.gen.cacheInfo()
+    self.assertEqual(info.hits, 2)
+    self.assertEqual(info.misses, 4)
+    self.assertEqual(info.size, 2)
+
+  def test_cacheInvalidate(self):
+    df = self.pipeline()
+    df.generate()
+    self.gen.invalidate(self.pipeline())
+    df.generate()
+    self.assertEqual(self.gen.cacheInfo().misses, 2)
+
+    self.gen.clearCache()
+    self.assertEqual(self.gen.cacheInfo(), (0, 0, 0, 2))
+
+  def test_cacheDisabled(self):
+    gen = SQLGenerator("sqlite")
+    gen.generate(self.pipeline())
+    gen.generate(self.pipeline())
+    self.assertEqual(gen.cacheInfo(), (0, 0, 0, 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,6 +9,24 @@ def use(backend):
 def close():
   GrizzlyGenerator.close()
 
+def collect_all(dfs, includeHeader=False, parallelism=None):
+  '''
+  Collect the results of several DataFrames at once. All queries are generated up front,
+  shared pre-queries are executed only once, and with a PooledExecutor the queries run
+  concurrently on up to parallelism connections.
+  Returns a QueryResult(rows, sql, elapsed) per DataFrame in the order of the input.
+  '''
+  return GrizzlyGenerator.collectAll(dfs, includeHeader, parallelism)
+
+def compute(*scalars):
+  '''
+  Compute several deferred aggregates (see DataFrame.lazy) at once. The aggregates over
+  the same DataFrame are computed with a single query. Returns the values in the order
+  of the arguments.
+  '''
+  from .dataframes.frame import LazyScalar
+  return tuple(LazyScalar.computeAll(scalars))
+
 def read_table(tableName, index=None, schema=None, inferSchema=False):
 
   if schema is None and not inferSchema:
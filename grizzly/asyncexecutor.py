@@ -0,0 +1,236 @@
+from grizzly.relationaldbexecutor import RelationalExecutor
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.dataframes.frame import Unpivot
+from grizzly import columnar
+
+import asyncio
+import concurrent.futures
+import inspect
+import itertools
+import threading
+
+import logging
+logger = logging.getLogger(__name__)
+
+async def _await(value):
+  # async drivers differ in which of their methods are coroutines
+  if inspect.isawaitable(value):
+    return await value
+  return value
+
+class AsyncRelationalExecutor(object):
+  '''
+  An executor with awaitable actions (acollect, afetchone, ato_df) and async
+  iterators over the rows (aiterator) and batches of rows (abatches) of a result.
+
+  For connections of async drivers (e.g. aiosqlite, psycopg's AsyncConnection) the
+  queries are executed natively. Otherwise, the connection (or a synchronous executor,
+  e.g. a PooledExecutor) is used in a bounded pool of maxWorkers threads, so that the
+  event loop is not blocked. A single DB-API connection is only used by one thread
+  at a time, and it must allow to be used from another thread than the one that
+  created it (e.g. sqlite3.connect(..., check_same_thread=False)).
+
+  The synchronous actions (collect, show, ...) are still available for synchronous
+  drivers.
+  '''
+
+  def __init__(self, connection, queryGenerator=None, maxWorkers=4, batchSize=1000):
+    self.batchSize = batchSize
+    self._native = AsyncRelationalExecutor._isAsyncConnection(connection)
+
+    if self._native:
+      self.connection = connection
+      self._sync = None
+      self.queryGenerator = queryGenerator if queryGenerator is not None else SQLGenerator()
+      if self.queryGenerator.paramstyle is None:
+        self.queryGenerator.paramstyle = RelationalExecutor._getParamstyle(connection)
+      self._installed = set()
+      self._generateLock = threading.RLock()
+      # queries on one connection are executed one after the other
+      self._connectionLock = asyncio.Lock()
+      self._threads = None
+    else:
+      if hasattr(connection, "collect") and hasattr(connection, "iterator"):
+        # already an executor
+        self._sync = connection
+      else:
+        self._sync = RelationalExecutor(connection, queryGenerator)
+      self.connection = getattr(self._sync, "connection", None)
+      self.queryGenerator = self._sync.queryGenerator
+      # only a pool can serve several threads at once
+      workers = maxWorkers if hasattr(self._sync, "pool") else 1
+      self._threads = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="grizzly")
+
+    super().__init__()
+
+  @staticmethod
+  def _isAsyncConnection(connection) -> bool:
+    return inspect.iscoroutinefunction(getattr(connection, "commit", None))
+
+  def __getattr__(self, name):
+    # the synchronous actions, e.g. for df.collect()
+    sync = self.__dict__.get("_sync")
+    if sync is None:
+      raise AttributeError(f"'{name}' is not supported for async connections, use the awaitable methods")
+    return getattr(sync, name)
+
+  def generate(self, df):
+    if not self._native:
+      return self._sync.generate(df)
+
+    with self._generateLock:
+      return self.queryGenerator.generate(df)
+
+  def generateQuery(self, df):
+    (pre,qry) = self.generate(df)
+    prequeries = ";".join(pre)
+    return f"{prequeries} {qry}"
+
+  async def _offload(self, func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(self._threads, func, *args)
+
+  async def _execute(self, sql, params=None):
+    logger.debug(sql)
+    cursor = await _await(self.connection.cursor())
+    try:
+      if params:
+        await _await(cursor.execute(sql, params))
+      else:
+        await _await(cursor.execute(sql))
+      return cursor
+    except Exception as e:
+      self._installed.clear()
+      await _await(cursor.close())
+      logger.error(f"Failed to execute query. Reason: {e}")
+      logger.error(f"Query: {sql}")
+      raise e
+
+  async def _nativeBatches(self, df, batchSize, header=None):
+    with self._generateLock:
+      if self.queryGenerator.bindParams:
+        (pre, sql, params) = self.queryGenerator.generateParameterized(df)
+      else:
+        (pre, sql) = self.queryGenerator.generate(df)
+        params = None
+
+    async with self._connectionLock:
+      (statements, hashes) = RelationalExecutor._pendingPreQueries(pre, self._installed, self.queryGenerator.templates)
+      for stmt in statements:
+        await _await((await self._execute(stmt)).close())
+      self._installed.update(hashes)
+
+      cursor = await self._execute(sql, params)
+      try:
+        if header is not None:
+          header.extend(df.header if isinstance(df, Unpivot) else [d[0] for d in (cursor.description or [])])
+
+        if isinstance(df, Unpivot):
+          yield df.reshape(await _await(cursor.fetchone()))
+          return
+
+        while True:
+          rows = await _await(cursor.fetchmany(batchSize))
+          if not rows:
+            break
+          yield rows
+      finally:
+        await _await(cursor.close())
+
+  async def _syncBatches(self, df, batchSize, header=None):
+    it = await self._offload(self._sync.iterator, df, header is not None, batchSize)
+    nextBatch = lambda: list(itertools.islice(it, batchSize))
+    try:
+      rows = await self._offload(nextBatch)
+      if header is not None and rows:
+        header.extend(rows[0])
+        rows = rows[1:] if len(rows) > 1 else await self._offload(nextBatch)
+
+      while rows:
+        yield rows
+        rows = await self._offload(nextBatch)
+    finally:
+      # closes the cursor in the same worker thread
+      await self._offload(it.close)
+
+  def abatches(self, df, batchSize=None, header=None):
+    '''
+    Async iterator over the result in batches (lists) of batchSize rows.
+    If header is a list, it is filled with the column names.
+    '''
+    if batchSize is None:
+      batchSize = self.batchSize
+
+    if self._native:
+      return self._nativeBatches(df, batchSize, header)
+    return self._syncBatches(df, batchSize, header)
+
+  async def aiterator(self, df, includeHeader=False, batchSize=None):
+    '''
+    Async iterator over the rows of the result.
+    If includeHeader is true, the first row to be returned are the column names
+    '''
+    header = [] if includeHeader else None
+    batches = self.abatches(df, batchSize, header)
+    try:
+      first = True
+      async for rows in batches:
+        if first and includeHeader:
+          yield header
+        first = False
+        for row in rows:
+          yield row
+      if first and includeHeader:
+        yield header
+    finally:
+      await batches.aclose()
+
+  async def acollect(self, df, includeHeader=False):
+    if not self._native:
+      return await self._offload(self._sync.collect, df, includeHeader)
+
+    header = []
+    tuples = []
+    converter = columnar.RowConverter()
+    async for rows in self.abatches(df, columnar.DEFAULT_BATCH_SIZE, header):
+      tuples.extend(converter.convert(rows))
+
+    if includeHeader:
+      tuples.insert(0, header)
+    return tuples
+
+  async def afetchone(self, df):
+    if not self._native:
+      return await self._offload(self._sync.fetchone, df)
+
+    batches = self.abatches(df, 1)
+    try:
+      async for rows in batches:
+        return rows[0]
+      return None
+    finally:
+      await batches.aclose()
+
+  async def ato_df(self, df):
+    if not self._native:
+      return await self._offload(self._sync.to_df, df)
+
+    import pandas
+    header = []
+    rows = []
+    async for batch in self.abatches(df, columnar.DEFAULT_BATCH_SIZE, header):
+      rows.extend(batch)
+    return pandas.DataFrame.from_records(rows, columns=header)
+
+  async def aclose(self):
+    if self._native:
+      await _await(self.connection.close())
+    else:
+      await self._offload(self._sync.close)
+      self._threads.shutdown()
+
+  def close(self):
+    if self._native:
+      raise ValueError("use 'await executor.aclose()' for async connections")
+    self._sync.close()
+    self._threads.shutdown()
@@ -0,0 +1,270 @@
+from grizzly.dataframes.schema import ColType
+
+from typing import List
+from decimal import Decimal
+
+# number of rows to fetch from the cursor at once
+DEFAULT_BATCH_SIZE = 10000
+
+class ColumnBuilder(object):
+  '''
+  Collects the values of one result column in a typed NumPy array.
+
+  The array is allocated for the expected number of rows (if known) and grown
+  on demand. The dtype is derived from the column type of the schema and the
+  fetched values: numeric columns become int64 or float64 (NULL values are
+  stored as NaN), boolean columns bool, and everything else is kept as Python
+  objects. If a later batch does not fit the current dtype, the column is
+  converted to a more general one.
+  '''
+
+  def __init__(self, colType: ColType = ColType.UNKNOWN, capacity: int = 0):
+    import numpy
+    self.colType = colType
+    self.size = 0
+    self.data = numpy.empty(max(capacity, 0), dtype=ColumnBuilder._initialDtype(colType))
+    # the dtype is only fixed once the first values are seen
+    self._typed = False
+
+  @staticmethod
+  def _initialDtype(colType: ColType):
+    import numpy
+    if colType == ColType.NUMERIC:
+      return numpy.float64
+    elif colType == ColType.BOOL:
+      return numpy.bool_
+    else:
+      return object
+
+  def _chunkToArray(self, values):
+    import numpy
+
+    if self.colType == ColType.TEXT:
+      return numpy.array(values, dtype=object)
+
+    chunk = numpy.array(values)
+    if chunk.dtype.kind in "iufb":
+      return chunk
+
+    if chunk.dtype.kind == "O" and self.colType != ColType.BOOL and not any(isinstance(v, str) for v in values):
+      # NULL values or Decimals in a numeric column
+      try:
+        return numpy.array(values, dtype=numpy.float64)
+      except (TypeError, ValueError):
+        pass
+
+    # strings and everything else are kept as Python objects
+    return numpy.array(values, dtype=object)
+
+  def append(self, values):
+    import numpy
+
+    if len(values) == 0:
+      return
+
+    chunk = self._chunkToArray(values)
+
+    if not self._typed:
+      dtype = chunk.dtype
+      self._typed = True
+    elif self.data.dtype == object or chunk.dtype == object:
+      dtype = numpy.dtype(object)
+    else:
+      dtype = numpy.result_type(self.data.dtype, chunk.dtype)
+
+    required = self.size + len(chunk)
+    if dtype != self.data.dtype or required > len(self.data):
+      # only the already filled part has to be copied (and converted)
+      capacity = len(self.data) if required <= len(self.data) else max(required, 2 * len(self.data))
+      grown = numpy.empty(capacity, dtype=dtype)
+      grown[:self.size] = self.data[:self.size]
+      self.data = grown
+
+    self.data[self.size:required] = chunk
+    self.size = required
+
+  def finish(self):
+    return self.data[:self.size]
+
+def convertValue(value):
+  '''
+  The conversion of collect() for a single value
+  '''
+  t = type(value)
+  if t is int or t is float or t is str or t is bool:
+    return value
+  elif isinstance(value, Decimal):
+    return float(value)
+  else:
+    return str(value)
+
+class RowConverter(object):
+  '''
+  Converts fetched rows into lists of plain Python values: int, float, str and bool are kept,
+  Decimal is converted into float, everything else into its string representation.
+
+  The conversion is applied column-wise to a whole batch of rows. For every column, the set
+  of value types in the batch determines the converter: columns with plain values only are
+  passed through untouched, pure Decimal columns are converted with float() and only
+  columns with other types are converted value by value.
+  '''
+
+  PLAIN_TYPES = frozenset([int, float, str, bool])
+
+  @staticmethod
+  def _convertColumn(values):
+    types = set(map(type, values))
+    if types <= RowConverter.PLAIN_TYPES:
+      return None
+    elif types == {Decimal}:
+      return list(map(float, values))
+    elif types <= RowConverter.PLAIN_TYPES | {type(None)}:
+      # NULL values are converted into their string representation
+      return ["None" if v is None else v for v in values]
+    else:
+      return list(map(convertValue, values))
+
+  def convert(self, rows) -> List[list]:
+    columns = list(zip(*rows))
+    converted = False
+    for (i, values) in enumerate(columns):
+      convertedValues = RowConverter._convertColumn(values)
+      if convertedValues is not None:
+        columns[i] = convertedValues
+        converted = True
+
+    if not converted:
+      return list(map(list, rows))
+    return list(map(list, zip(*columns)))
+
+def uniqueNames(names: List[str]) -> List[str]:
+  '''
+  Make the column names of a result unique, e.g. for the columns of both join inputs.
+  Duplicates get a suffix with a running number.
+  '''
+  result = []
+  seen = set()
+  for name in names:
+    unique = name
+    i = 0
+    while unique in seen:
+      i += 1
+      unique = f"{name}_{i}"
+    seen.add(unique)
+    result.append(unique)
+  return result
+
+def fetchColumns(cursor, colTypes: List[ColType], batchSize: int = DEFAULT_BATCH_SIZE) -> list:
+  '''
+  Fetch all rows of the cursor in batches and return one NumPy array per column
+  '''
+  capacity = cursor.rowcount if cursor.rowcount is not None and cursor.rowcount > 0 else batchSize
+  builders = [ColumnBuilder(t, capacity) for t in colTypes]
+
+  while True:
+    rows = cursor.fetchmany(batchSize)
+    if not rows:
+      break
+
+    # transpose the rows into columns
+    for (builder, values) in zip(builders, zip(*rows)):
+      builder.append(values)
+
+  cursor.close()
+  return [b.finish() for b in builders]
+
+def toStructured(names: List[str], arrays: list):
+  '''
+  Combine the column arrays into a NumPy structured array
+  '''
+  import numpy
+  numRows = len(arrays[0]) if arrays else 0
+  result = numpy.empty(numRows, dtype=[(name, arr.dtype) for (name, arr) in zip(names, arrays)])
+  for (name, arr) in zip(names, arrays):
+    result[name] = arr
+  return result
+
+def _arrowType(colType: ColType):
+  import pyarrow
+  if colType == ColType.TEXT:
+    return pyarrow.string()
+  elif colType == ColType.BOOL:
+    return pyarrow.bool_()
+  else:
+    # numeric columns may be integer or floating point, use the fetched values
+    return None
+
+def _toArrowArray(values, colType: ColType):
+  import pyarrow
+  try:
+    return pyarrow.array(values, type=_arrowType(colType))
+  except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+    pass
+
+  try:
+    # the values do not match the column type of the schema
+    return pyarrow.array(values)
+  except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+    # values of different types in one column (e.g. SQLite), use their string representation
+    return pyarrow.array([None if v is None else str(v) for v in values], type=pyarrow.string())
+
+def _commonArrowType(types: list):
+  '''
+  The type all chunks of a column are cast to, if the batches resulted in different types
+  '''
+  import pyarrow
+  types = set([t for t in types if not pyarrow.types.is_null(t)])
+  if len(types) == 0:
+    return pyarrow.null()
+
+  isNumeric = lambda t: pyarrow.types.is_integer(t) or pyarrow.types.is_floating(t) or pyarrow.types.is_decimal(t)
+  if all([isNumeric(t) for t in types]):
+    # like collect(), decimals are converted into floats
+    if len(types) == 1 and not pyarrow.types.is_decimal(next(iter(types))):
+      return types.pop()
+    return pyarrow.float64()
+
+  if len(types) == 1:
+    return types.pop()
+  return pyarrow.string()
+
+def fetchArrow(cursor, names: List[str], colTypes: List[ColType], batchSize: int = DEFAULT_BATCH_SIZE):
+  '''
+  Fetch all rows of the cursor into a pyarrow.Table. If the cursor supports it
+  (e.g. ADBC or DuckDB), its native Arrow interface is used. Otherwise, the rows are
+  fetched in batches and every batch is converted into a RecordBatch.
+  '''
+  import pyarrow
+
+  if hasattr(cursor, "fetch_arrow_table"):
+    table = cursor.fetch_arrow_table()
+    cursor.close()
+    return table
+
+  chunks = [[] for _ in names]
+  while True:
+    rows = cursor.fetchmany(batchSize)
+    if not rows:
+      break
+
+    for (colChunks, colType, values) in zip(chunks, colTypes, zip(*rows)):
+      colChunks.append(_toArrowArray(values, colType))
+
+  cursor.close()
+
+  fields = []
+  for (name, colType, colChunks) in zip(names, colTypes, chunks):
+    if colChunks:
+      arrowType = _commonArrowType([c.type for c in colChunks])
+    else:
+      arrowType = _arrowType(colType) or (pyarrow.float64() if colType == ColType.NUMERIC else pyarrow.null())
+    fields.append(pyarrow.field(name, arrowType))
+  schema = pyarrow.schema(fields)
+
+  numBatches = len(chunks[0]) if chunks else 0
+  batches = []
+  for i in range(numBatches):
+    arrays = [colChunks[i].cast(field.type) for (colChunks, field) in zip(chunks, fields)]
+    batches.append(pyarrow.RecordBatch.from_arrays(arrays, schema=schema))
+
+  return pyarrow.Table.from_batches(batches, schema=schema)
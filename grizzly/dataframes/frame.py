@@ -4,6 +4,7 @@ import queue
 from typing import List, Tuple, Callable
 from grizzly.expression import AllColumns, ArithmExpr, ArithmeticOperation, BinaryExpression, BoolExpr, Constant, Expr, ColRef, FuncCall, ComputedCol, ExpressionException, ExprTraverser, LogicExpr, BooleanOperation, SetExpr, SetOperation
 from grizzly.generator import GrizzlyGenerator
+from grizzly import columnar
 from grizzly.expression import ModelUDF,UDF, Param, ModelType
 from grizzly.udfcompiler.udfcompiler_exceptions import UDFCompilerException
 
@@ -16,6 +17,9 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+# number of rows and whether it was counted (True) or estimated from catalog statistics (False)
+RowCount = namedtuple("RowCount", ["count", "exact"])
+
 class GrizzlyIndexError(Exception):
   def __init__(self, *args: object) -> None:
       super().__init__(*args)
@@ -45,6 +49,19 @@ class DataFrame(object):
 
     self.alias = alias
 
+    # Table over the temporary table that stores the result, see persist()
+    self._persisted = None
+
+    # incremented on every in-place modification to detect outdated memoized SQL
+    self._version = 0
+    # (token, dependencies, prequeries, sql) memoized by the SQLGenerator
+    self._sqlMemo = None
+
+  def _invalidate(self):
+    self._version += 1
+    # the stored result does not reflect the modification
+    self._persisted = None
+
   @property
   def schema(self):
     return self._schema
@@ -188,16 +205,10 @@ class DataFrame(object):
   ###################################
   # iteration
 
-  def __contains__(self, item):
+  def _checkCandidate(self, item) -> list:
     '''
-    Implementation of 'in' operator: check if a value/tuple exists in the dataframe
-
-    :param item: value to check If it is a tuple, it is checked if it exists in the dataframe. 
-                                If it is a single string, it is checked if it is a column name.
-    :return: True if the value exists in the dataframe, False otherwise
-
+    Check that the value/tuple matches the schema of the DataFrame and return it as a list
     '''
-
     if not self.schema:
       raise SchemaError("Cannot check if tuple exists in dataframe without schema")
 
@@ -207,45 +218,70 @@ class DataFrame(object):
     if len(item) != len(self.schema):
       raise ValueError(f"Tuple must have same length as schema: tuple has {len(item)} columns, schema has {len(self.schema)} columns")
 
+    cols = self.schema.columns(df = self)
+    for(c,x) in zip(cols, item):
+      if not self.schema.checkType(c,Constant(x)):
+        raise TypeError(f"Type mismatch: type of column {c} does not match type of value {x} ({type(x)})")
+
+    return list(item)
+
+  def __contains__(self, item):
+    '''
+    Implementation of 'in' operator: check if a value/tuple exists in the dataframe
+
+    :param item: value to check If it is a tuple, it is checked if it exists in the dataframe. 
+                                If it is a single string, it is checked if it is a column name.
+    :return: True if the value exists in the dataframe, False otherwise
+
+    '''
+
+    item = self._checkCandidate(item)
 
     constants = [Constant(x) for x in item]
     cols = self.schema.columns(df = self)
 
-    for(c,x) in zip(cols, constants):
-      if not self.schema.checkType(c,x):
-        raise TypeError(f"Type mismatch: type of column {c} does not match type of value {x} ({type(x)})")
-
     expr = BoolExpr(cols,  constants, BooleanOperation.EQ)
     
     f = self.filter(expr)
 
-    i = GrizzlyGenerator.iterator(f, includeHeader=False)
+    # SELECT EXISTS(...) instead of fetching the matching rows
+    return GrizzlyGenerator.exists(f)
 
-    try:
-      i.__next__()
-      return True
-    except StopIteration:
-      return False
+  def contains_many(self, items) -> List[bool]:
+    '''
+    Check for every value/tuple of items if it exists in the dataframe. All candidates
+    are sent to the database at once and checked with a single semi-join query.
+
+    :param items: list of values/tuples, each must match the schema like for the 'in' operator
+    :return: a list with True for the items that exist in the dataframe, False otherwise
+    '''
+    candidates = [self._checkCandidate(item) for item in items]
+    if not candidates:
+      return []
+
+    return GrizzlyGenerator.containsMany(self, self.schema.columns(), candidates)
 
   def __iter__(self):
     return GrizzlyGenerator.iterator(self)
 
-  def iterrows(self):
+  def iterrows(self, batchSize=None):
     '''
     Iterate over DataFrame rows as (index, Array) pairs.
+    The rows are fetched in batches of batchSize rows.
     '''
     num = 0
-    for row in self:
+    for row in GrizzlyGenerator.iterator(self, batchSize=batchSize):
       yield (num, list(row))
       num += 1
 
 
-  def itertuples(self, name="Grizzly",index=None):
+  def itertuples(self, name="Grizzly",index=None, batchSize=None):
     '''
     Iterate over DataFrame rows as namedtuples.
+    The rows are fetched in batches of batchSize rows.
     '''
     
-    theIter = GrizzlyGenerator.iterator(self, includeHeader=True)
+    theIter = GrizzlyGenerator.iterator(self, includeHeader=True, batchSize=batchSize)
 
     headerRow = next(theIter)
 
@@ -286,6 +322,7 @@ class DataFrame(object):
       #get the last added agg func and set its alias name
       f = value.aggFunc[-1]
       f.alias = key
+      value._invalidate()
     
     elif isinstance(value, Expr) or isinstance(value, DataFrame):
       
@@ -298,10 +335,12 @@ class DataFrame(object):
 
       self.computedCols.append(newCol)
       self.schema.append(newCol)
+      self._invalidate()
     else: # not am expr or DF -> must be a constant
       newCol = ComputedCol(Constant(value), key)
       self.schema.append(newCol)
       self.computedCols.append(newCol)
+      self._invalidate()
 
   # magic function for read access by index: []
   def __getitem__(self, key):
@@ -364,46 +403,142 @@ class DataFrame(object):
     '''
     Return a Numpy representation of the DataFrame.
     '''
-    raise NotImplementedError("This method has not been implemented yet")
+    return self.to_numpy()
 
-  def to_numpy(self):
+  def to_numpy(self, asDict = False, batchSize = columnar.DEFAULT_BATCH_SIZE):
     '''
     Return a Numpy representation of the DataFrame.
+
+    The result is fetched in batches of batchSize rows into one typed array per column.
+    Returns a structured array with a field per column, or a dict of column name -> array
+    if asDict is True.
     '''
-    raise NotImplementedError("This method has not been implemented yet")
+    return GrizzlyGenerator.to_numpy(self, asDict, batchSize)
+
+  def to_arrow(self, batchSize = columnar.DEFAULT_BATCH_SIZE):
+    '''
+    Return the result as a pyarrow.Table, which is built from RecordBatches of batchSize rows.
+    '''
+    return GrizzlyGenerator.to_arrow(self, batchSize)
+
+  def persist(self, indexColumns = None):
+    '''
+    Execute the operations once and store the result in a temporary table of the database,
+    optionally with an index on the given column(s). Afterwards, this DataFrame and all
+    DataFrames derived from it read from the temporary table. The table is dropped with
+    unpersist() or when the connection is closed.
+    '''
+    if isinstance(indexColumns, str):
+      indexColumns = [indexColumns]
+    GrizzlyGenerator.persist(self, indexColumns)
+    return self
+
+  def cache(self, indexColumns = None):
+    return self.persist(indexColumns)
+
+  def unpersist(self):
+    '''
+    Drop the temporary table of persist(), the operations are executed again by the next query
+    '''
+    GrizzlyGenerator.unpersist(self)
+    return self
+
+  def to_view(self, name: str, materialized = False):
+    '''
+    Create a view (or a materialized view) with the query of this DataFrame in the database,
+    so that it does not receive the complete nested query on every request. Systems without
+    materialized views (e.g. SQLite, MySQL) store the result in a table that is filled again
+    by refresh(). Returns a View that reads from the created object.
+    '''
+    return GrizzlyGenerator.createView(self, name, materialized)
+
+  def materialize(self, batchSize = columnar.DEFAULT_BATCH_SIZE):
+    '''
+    Fetch the result into local NumPy arrays. Operations on the returned DataFrame
+    are evaluated in-process (see NumpyExecutor) instead of in the database.
+    '''
+    return LocalTable(GrizzlyGenerator.to_numpy(self, True, batchSize), self.index)
 
   def collect(self, includeHeader = False):
     return GrizzlyGenerator.collect(self, includeHeader)
 
+  # awaitable actions, require an AsyncRelationalExecutor
+
+  async def acollect(self, includeHeader = False):
+    return await GrizzlyGenerator.acollect(self, includeHeader)
+
+  async def afirst(self):
+    tup = await GrizzlyGenerator.afetchone(self)
+    if tup is not None and len(tup) >= 1:
+      return tup
+    else:
+      return None
+
+  async def ato_df(self):
+    '''
+    Return the result as Pandas DataFrame.
+    '''
+    return await GrizzlyGenerator.ato_df(self)
+
+  def __aiter__(self):
+    return GrizzlyGenerator.aiterator(self)
+
+  def abatches(self, batchSize = None):
+    '''
+    Async iterator over the result in lists of batchSize rows.
+    '''
+    return GrizzlyGenerator.abatches(self, batchSize)
+
   # Pandas DF stuff
 
   def describe(self):
     # min, max, (avg), count, count distinct
 
-    unioned = None
-    for col in self.schema.columns(lambda t : t[1] == ColType.NUMERIC):
+    # all aggregates are computed in a single pass over the data. The resulting
+    # (wide) row is reshaped into one row per column on the client
+    funcs = []
+    for (i, col) in enumerate(self.schema.columns(lambda t : t[1] == ColType.NUMERIC)):
       ref = ColRef(col, self)
-      fMin = FuncCall(AggregateType.MIN, [ref],alias = "min")
-      fMax = FuncCall(AggregateType.MAX, [ref],alias = "max")
-      fAvg = FuncCall(AggregateType.MEAN, [ref],alias = "mean")
-      fCount = FuncCall(AggregateType.COUNT, [ref], alias ="count")
-
-      p = self.project([fMin, fMax, fAvg, fCount])
-      if unioned is None:
-        unioned = p
-      else:
-        unioned = unioned.union(p)
+      fMin = FuncCall(AggregateType.MIN, [ref],alias = f"min_{i}")
+      fMax = FuncCall(AggregateType.MAX, [ref],alias = f"max_{i}")
+      fAvg = FuncCall(AggregateType.MEAN, [ref],alias = f"mean_{i}")
+      fCount = FuncCall(AggregateType.COUNT, [ref], alias = f"count_{i}")
+
+      funcs += [fMin, fMax, fAvg, fCount]
+
+    if not funcs:
+      return None
 
-    return unioned
+    return Unpivot(self.project(funcs), ["min", "max", "mean", "count"], 4)
 
 
   def __len__(self) -> int:
+    return self.rowcount().count
+
+  def rowcount(self, approx: bool = None) -> RowCount:
+    '''
+    Return the number of rows and whether this number is exact.
+
+    If approx is True (or None and the backend is configured to use approximate counts),
+    the number of rows of an unfiltered table is read from the catalog statistics of the
+    database. If no estimate is available, or the DataFrame is not a table, the rows are
+    counted.
+    '''
+    if isinstance(self, Unpivot):
+      # reshaped on the client, no SQL can be generated on top of it
+      return RowCount(self.numRows(), True)
+
+    if isinstance(self, Table):
+      estimate = GrizzlyGenerator.estimateRowCount(self.table, approx)
+      if estimate is not None:
+        return RowCount(estimate, False)
+
     f = FuncCall(AggregateType.COUNT, [AllColumns(self)],None, "rowcount")
     cnter = self.project([f])
 
     # res is a tuple! We are only interested in the first element
     res = GrizzlyGenerator.fetchone(cnter)[0]
-    return res
+    return RowCount(res, True)
 
   @property
   def shape(self):
@@ -412,6 +547,17 @@ class DataFrame(object):
 
     (number of columns, number of rows)
     '''
+    if isinstance(self, Unpivot):
+      return (len(self.header), self.numRows())
+
+    if isinstance(self, Table):
+      estimate = GrizzlyGenerator.estimateRowCount(self.table)
+      if estimate is not None:
+        # only the number of columns is needed from the table itself
+        resultRow = GrizzlyGenerator.fetchone(self.limit(1))
+        if resultRow is not None:
+          return (len(resultRow), estimate)
+
     f = self.project(FuncCall("count", [AllColumns(self)], None, "rowcount"))
     cc = ComputedCol(f)
 
@@ -445,6 +591,16 @@ class DataFrame(object):
   def loc(self):
     return _IndexLocator(self)
     
+  @property
+  def lazy(self):
+    '''
+    Deferred aggregates (LazyScalar) that are not executed immediately. All aggregates over
+    the same DataFrame that are passed to grizzly.compute() are computed in one query:
+
+      (n, top) = grizzly.compute(df.lazy.count(), df.lazy.max("price"))
+    '''
+    return _LazyAggregates(self)
+
   @property  
   def iat(self):
     raise NotImplementedError("getting columns by number is not supported")
@@ -545,7 +701,8 @@ class DataFrame(object):
 
     aggName = AggregateType.getName(aggType)
 
-    result = None
+    funcs = []
+    colNames = []
     for colName in col:
       theCols = DataFrame._getFuncCallCol(self, colName)
       theCol = theCols[0]
@@ -555,13 +712,14 @@ class DataFrame(object):
       if not filterFunc(("",colType)):
         raise SchemaError(f"cannot apply function {aggName} to column of type {colType} (column: {theCol.colName()})")
 
-      f = FuncCall(aggType, theCols, alias=aggName)
-      proj = [Constant(theCol.column, "colname"), f]
-      if result is None:
-        result = self.project(proj)
-      else:
-        prj = self.project(proj)
-        result = result.union(prj)
+      funcs.append(FuncCall(aggType, theCols, alias=f"{aggName}_{len(funcs)}"))
+      colNames.append(theCol.column)
+
+    if not funcs:
+      return None
+
+    # compute the aggregates of all columns in one pass and create one row (colname, value) per column
+    result = Unpivot(self.project(funcs), ["colname", aggName], 1, colNames)
 
     if len(col) == 1:
       # fetch single value. Consists of two columns (col name and value) -> return only the value
@@ -583,9 +741,17 @@ class DataFrame(object):
     prequeries = "" if not pre else ";".join(pre)
     return f"{prequeries} {qry}"
 
-  def show(self, pretty=False, delim=",", maxColWidth=20, limit=20):
+  def fingerprint(self) -> str:
+    from grizzly.fingerprint import Fingerprint
+    return Fingerprint.of(self)
+
+  def show(self, pretty=False, delim=",", maxColWidth=20, limit=20, countRemaining=False):
+    '''
+    Print the first limit rows. Only these rows are fetched from the database; with
+    countRemaining, the number of the other rows is counted (or estimated) separately.
+    '''
     try:
-      print(GrizzlyGenerator.toString(self,delim,pretty,maxColWidth,limit))
+      print(GrizzlyGenerator.toString(self,delim,pretty,maxColWidth,limit,countRemaining))
     except UDFCompilerException:
       print(self._fallback())
 
@@ -600,6 +766,7 @@ class DataFrame(object):
         if isinstance(x, FuncCall):
           funccall = x
           table.computedCols.remove(funccall)
+          table._invalidate()
           funccall_found = True
       # Get parent df if current df has no funccall objekt in computedCols 
       table = table.parents[0]
@@ -646,15 +813,11 @@ class DataFrame(object):
     if not isinstance(self, Ordering):
       raise ValueError("can get tail only of ordered DataFrame")
 
-
-    # add a count 
-    cntFunc = FuncCall(AggregateType.COUNT, inputCols=[])
-    prj = self.project(cntFunc)
-
-    # add the offset: count - n
-    expr = ArithmExpr(prj, Constant(n), ArithmeticOperation.SUB)
-
-    return self.limit(n=n, offset=expr).collect()
+    # fetch the first n rows in the inverted order instead of skipping
+    # all other rows with OFFSET count - n, then restore the order
+    rows = self._inverted().limit(n).collect()
+    rows.reverse()
+    return rows
     
   # def __str__(self):
   #   strRep = GrizzlyGenerator.toString(self, pretty=True)
@@ -681,6 +844,21 @@ class Table(DataFrame):
 
     super().__init__(schema, None, alias, index)
 
+class View(Table):
+  '''
+  A view or materialized view that was created from a DataFrame with to_view().
+  It is read like a table; refresh() updates the result of a materialized view.
+  '''
+  def __init__(self, name, index, schema, materialized, query):
+    self.materialized = materialized
+    # the defining query, to refill the table if materialized views are emulated
+    self.query = query
+    super().__init__(name, index, schema)
+
+  def refresh(self):
+    GrizzlyGenerator.refreshView(self)
+    return self
+
 class ExternalTable(DataFrame):
   def __init__(self, file, schema, hasHeader, delimiter, format, fdw_extension_name):
     self.filenames = file
@@ -695,6 +873,69 @@ class ExternalTable(DataFrame):
     theSchema = Schema.fromList(schema)
     super().__init__(theSchema, None, alias)
 
+class LocalTable(DataFrame):
+  '''
+  Data that is held locally as a dict of column name -> NumPy array, e.g. the
+  result of materialize(). DataFrames derived from it are evaluated by the
+  NumpyExecutor and cannot be combined with tables of the database.
+  '''
+  def __init__(self, data: dict, index=None):
+    import numpy
+    self.data = {name: numpy.asarray(values) for (name, values) in data.items()}
+    lengths = set([len(values) for values in self.data.values()])
+    if len(lengths) > 1:
+      raise ValueError(f"all columns must have the same length, but got {sorted(lengths)}")
+
+    alias = GrizzlyGenerator._incrAndGetTupleVar()
+    schema = Schema({name: LocalTable._colType(values) for (name, values) in self.data.items()})
+    super().__init__(schema, None, alias, index)
+
+  @staticmethod
+  def _colType(values) -> ColType:
+    kind = values.dtype.kind
+    if kind in "iuf":
+      return ColType.NUMERIC
+    elif kind == "b":
+      return ColType.BOOL
+    elif kind in "US":
+      return ColType.TEXT
+    elif kind == "O":
+      nonNull = next((v for v in values if v is not None), None)
+      return ColType.fromPython(type(nonNull))
+    return ColType.UNKNOWN
+
+  @staticmethod
+  def isLocal(df) -> bool:
+    '''
+    True if the DataFrame is derived from local data only. Raises a ValueError if
+    it combines local data with tables of the database.
+    '''
+    local = False
+    remote = False
+    visited = set()
+    todo = [df]
+    while todo:
+      current = todo.pop()
+      if id(current) in visited:
+        continue
+      visited.add(id(current))
+
+      if isinstance(current, LocalTable):
+        local = True
+      elif isinstance(current, (Table, ExternalTable)):
+        remote = True
+
+      if current.parents:
+        todo.extend(current.parents)
+      if isinstance(current, Join):
+        todo.append(current.right)
+      elif isinstance(current, Union):
+        todo.append(current.other)
+
+    if local and remote:
+      raise ValueError("materialized data cannot be combined with tables of the database")
+    return local
+
 class Projection(DataFrame):
 
   def __init__(self, columns, parent: DataFrame, doDistinct = False):
@@ -746,9 +987,11 @@ class Projection(DataFrame):
     c = self._updateRef(col)
     self.columns.append(c)
     self.schema.append(c)
+    self._invalidate()
 
   def distinct(self):
     self.doDistinct = True
+    self._invalidate()
     return self
 
   def apply_torch_model(self, path: str, toTensorFunc, clazz, outputDict, clazzParameters: List, n_predictions: int = 1, *helperFuncs):
@@ -925,6 +1168,7 @@ class Grouping(DataFrame):
   def _addAggFunc(self,funcCall: FuncCall):
     self.aggFunc.append(funcCall)
     self.schema.append(funcCall)
+    self._invalidate()
     
 
   def filter(self, expr):
@@ -951,6 +1195,7 @@ class Grouping(DataFrame):
 
     if isHaving:
       self.having.append(expr)
+      self._invalidate()
       return self
     
     
@@ -1032,6 +1277,34 @@ class Union(DataFrame):
   def rightParent(self):
     return self.other
 
+class Unpivot(DataFrame):
+  '''
+  Reshapes the single row of its parent into one row per group of width columns,
+  optionally prefixed with a label for every row. The reshaping is performed
+  on the client, thus Unpivot must be the last operation.
+  '''
+  def __init__(self, parent, header: List[str], width: int, labels: List = None):
+    self.header = header
+    self.width = width
+    self.labels = labels
+    super().__init__(Schema(None), parent, GrizzlyGenerator._incrAndGetTupleVar())
+
+  def numRows(self) -> int:
+    # the parent is a projection of the aggregates and returns exactly one row
+    return len(self.parents[0].columns) // self.width
+
+  def reshape(self, row) -> List[Tuple]:
+    if row is None:
+      return []
+
+    rows = []
+    for i in range(0, len(row), self.width):
+      values = tuple(row[i:i+self.width])
+      if self.labels is not None:
+        values = (self.labels[i // self.width],) + values
+      rows.append(values)
+    return rows
+
 class Limit(DataFrame):
   def __init__(self, limit, offset, parent):
     self.limit = limit
@@ -1058,6 +1331,24 @@ class Ordering(DataFrame):
     self.by = sortCols
     self.ascending = ascending
 
+  def _inverted(self):
+    '''
+    The same ordering of the parent in the opposite direction for every sort key
+    '''
+    if self.ascending is None:
+      ascending = False
+    elif isinstance(self.ascending, list):
+      ascending = [not a for a in self.ascending]
+    else:
+      ascending = not self.ascending
+
+    # new references, the ones of this ordering must not be changed
+    inverted = Ordering([c.column for c in self.by], ascending, self.parents[0])
+    # it replaces this ordering in the query, thus the computed columns may keep referring to its alias
+    inverted.alias = self.alias
+    inverted.computedCols = list(self.computedCols)
+    return inverted
+
 
 #########################
 # helpers
@@ -1082,6 +1373,98 @@ class _IndexAccessor:
     else:
       raise ValueError(f"invalid argument to at. Expected column name or tuple, but got {type(at)}")
 
+class LazyScalar(object):
+  '''
+  An aggregate over a DataFrame that is computed with grizzly.compute() or compute()
+  '''
+  def __init__(self, df, aggType: AggregateType, col = None):
+    self.df = df
+    self.aggType = aggType
+    self.col = col
+    super(LazyScalar, self).__init__()
+
+  def _colName(self):
+    if self.col is None:
+      return None
+    return self.col.column if isinstance(self.col, ColRef) else self.col
+
+  def _funcCall(self, df, alias):
+    colName = self._colName()
+    inputCols = [AllColumns(df)] if colName is None else [ColRef(colName, df)]
+    return FuncCall(self.aggType, inputCols, None, alias)
+
+  def compute(self):
+    return LazyScalar.computeAll([self])[0]
+
+  @staticmethod
+  def computeAll(scalars) -> list:
+    '''
+    Compute the values of all scalars. The aggregates over the same DataFrame (or DataFrames
+    with the same operations) are merged into a single SELECT, i.e. one query per DataFrame.
+    '''
+    scalars = list(scalars)
+    for s in scalars:
+      if not isinstance(s, LazyScalar):
+        raise ValueError(f"expected a LazyScalar (e.g. df.lazy.count()), but got {type(s)}")
+
+    # fingerprint -> positions of the scalars
+    groups = {}
+    for (i, s) in enumerate(scalars):
+      groups.setdefault(s.df.fingerprint(), []).append(i)
+
+    results = [None] * len(scalars)
+    for positions in groups.values():
+      source = scalars[positions[0]].df
+
+      # the same aggregate is computed only once
+      funcs = []
+      columnOf = {}
+      for p in positions:
+        key = (scalars[p].aggType, scalars[p]._colName())
+        if key not in columnOf:
+          columnOf[key] = len(funcs)
+          funcs.append(scalars[p]._funcCall(source, f"agg_{len(funcs)}"))
+
+      row = GrizzlyGenerator.fetchone(source.project(funcs))
+      for p in positions:
+        results[p] = row[columnOf[(scalars[p].aggType, scalars[p]._colName())]]
+
+    return results
+
+class _LazyAggregates:
+  def __init__(self, df):
+    if isinstance(df, Grouping):
+      raise ValueError("aggregates of a grouping are not scalar values")
+    self.df = df
+    super(_LazyAggregates, self).__init__()
+
+  def _scalar(self, aggType, col):
+    if col is None:
+      # a single column (e.g. df['x']) can be aggregated without a name
+      cols = self.df.schema.columns()
+      if len(cols) != 1:
+        raise ValueError("must specify a column to aggregate!")
+      col = cols[0]
+    return LazyScalar(self.df, aggType, col)
+
+  def len(self):
+    return LazyScalar(self.df, AggregateType.COUNT)
+
+  def count(self, col = None):
+    return LazyScalar(self.df, AggregateType.COUNT, col)
+
+  def min(self, col = None):
+    return self._scalar(AggregateType.MIN, col)
+
+  def max(self, col = None):
+    return self._scalar(AggregateType.MAX, col)
+
+  def mean(self, col = None):
+    return self._scalar(AggregateType.MEAN, col)
+
+  def sum(self, col = None):
+    return self._scalar(AggregateType.SUM, col)
+
 class _IndexLocator:
   def __init__(self, df):
     self.df = df
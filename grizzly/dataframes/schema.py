@@ -101,7 +101,8 @@ class Schema(object):
       if filterFunc is not None:
         l = filter(filterFunc, l)
 
-      if df:
+      # not 'if df', this would count the rows of the DataFrame
+      if df is not None:
         return list(map(lambda x: ColRef(x[0], df), l)) 
       else:
         return list(map(lambda t : t[0], l))
@@ -0,0 +1,99 @@
+from grizzly.dataframes.frame import DataFrame, Limit, Unpivot, Ordering, Table, ExternalTable, LocalTable, Projection, Filter, Join, Grouping, Union
+from grizzly.expression import BinaryExpression, ColRef, ComputedCol, Constant, FuncCall, ModelUDF, UDF
+
+import hashlib
+
+class Fingerprint(object):
+  '''
+  A canonical, structural representation of a DataFrame tree.
+
+  Two trees that describe the same operations on the same inputs result in the same
+  fingerprint, even if they were built independently. The generated aliases (tN) of
+  the DataFrames are not part of the fingerprint. Instead, every node is numbered in
+  the order it is visited and references to columns of a node use this number.
+  '''
+
+  def __init__(self):
+    # id of node -> number of the node
+    self._nodes = {}
+    super().__init__()
+
+  @staticmethod
+  def of(df: DataFrame) -> str:
+    canonical = Fingerprint().canonical(df)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+  def canonical(self, df: DataFrame) -> str:
+    return self._node(df)
+
+  def _node(self, df: DataFrame) -> str:
+    if id(df) in self._nodes:
+      return f"#{self._nodes[id(df)]}"
+
+    num = len(self._nodes)
+    self._nodes[id(df)] = num
+
+    if isinstance(df, Table):
+      params = [repr(df.table), repr(df.index)]
+    elif isinstance(df, ExternalTable):
+      params = [repr(df.filenames), repr(df.colDefs), repr(df.hasHeader), repr(df.delimiter), repr(df.format), repr(df.fdw_extension_name)]
+    elif isinstance(df, LocalTable):
+      # the same data, not only equal values
+      params = [f"id:{id(df.data)}", repr(df.index)]
+    elif isinstance(df, Projection):
+      params = [self._expr(df.columns), repr(df.doDistinct)]
+    elif isinstance(df, Filter):
+      params = [self._expr(df.expr)]
+    elif isinstance(df, Grouping):
+      params = [self._expr(df.groupCols), self._expr(df.aggFunc), self._expr(df.having)]
+    elif isinstance(df, Join):
+      params = [self._node(df.rightParent()), self._expr(df.on), repr(df.how), repr(df.comp)]
+    elif isinstance(df, Union):
+      params = [self._node(df.rightParent()), repr(df.distinct)]
+    elif isinstance(df, Limit):
+      params = [self._expr(df.limit), self._expr(df.offset)]
+    elif isinstance(df, Ordering):
+      params = [self._expr(df.by), repr(df.ascending)]
+    elif isinstance(df, Unpivot):
+      params = [repr(df.header), repr(df.width), repr(df.labels)]
+    else:
+      params = []
+
+    if df._persisted is not None:
+      # the SQL reads from the temporary table instead of the operations
+      params.append(f"persisted:{df._persisted.table}")
+
+    parents = [self._node(p) for p in df.parents] if df.parents else []
+    schema = repr(sorted([(k, str(v)) for (k, v) in df.schema.typeDict.items()])) if df.schema.typeDict is not None else "None"
+    computed = self._expr(df.computedCols)
+
+    return f"{type(df).__name__}#{num}({','.join(parents)};{';'.join(params)};{computed};{schema})"
+
+  def _expr(self, expr) -> str:
+    if isinstance(expr, DataFrame):
+      return self._node(expr)
+    elif isinstance(expr, ColRef):
+      df = self._node(expr.df) if expr.df is not None else "None"
+      return f"{type(expr).__name__}({repr(expr.column)},{df},{repr(expr.alias)})"
+    elif isinstance(expr, Constant):
+      return f"Constant({type(expr.value).__name__}:{repr(expr.value)},{repr(expr.alias)})"
+    elif isinstance(expr, BinaryExpression):
+      return f"{type(expr).__name__}({self._expr(expr.left)},{expr.operand},{self._expr(expr.right)})"
+    elif isinstance(expr, FuncCall):
+      return f"FuncCall({repr(expr.funcName)},{self._expr(expr.inputCols)},{self._udf(expr.udf)},{repr(expr.alias)})"
+    elif isinstance(expr, ComputedCol):
+      return f"ComputedCol({self._expr(expr.value)},{repr(expr.alias)})"
+    elif isinstance(expr, list) or isinstance(expr, tuple):
+      return "[" + ",".join([self._expr(e) for e in expr]) + "]"
+    else:
+      return f"{type(expr).__name__}:{repr(expr)}"
+
+  def _udf(self, udf: UDF) -> str:
+    if udf is None:
+      return "None"
+
+    params = ",".join([f"{p.name}:{p.type}" for p in udf.params])
+    s = f"UDF({repr(udf.name)},[{params}],{repr(udf.returnType)},{repr(udf.lang)},{repr(udf.lines)},{repr(udf.fallback)}"
+    if isinstance(udf, ModelUDF):
+      s += f",{udf.modelType},{repr(sorted([(k, str(v)) for (k, v) in udf.templace_replacement_dict.items()]))}"
+    return s + ")"
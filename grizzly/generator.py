@@ -4,8 +4,25 @@ class GrizzlyGenerator(object):
   """
 
   _backend = None
+  # evaluates DataFrames of materialized data, created on first use
+  _local = None
   tVarCounter = 0
 
+  @staticmethod
+  def _executorFor(df):
+    """
+    The executor for the DataFrame: the local NumpyExecutor if it is derived
+    from materialized data, the configured backend otherwise
+    """
+    from grizzly.dataframes.frame import LocalTable
+    if not LocalTable.isLocal(df):
+      return GrizzlyGenerator._backend
+
+    if GrizzlyGenerator._local is None:
+      from grizzly.numpyexecutor import NumpyExecutor
+      GrizzlyGenerator._local = NumpyExecutor()
+    return GrizzlyGenerator._local
+
   @staticmethod
   def _incrAndGetTupleVar():
     tVar = f"t{GrizzlyGenerator.tVarCounter}"
@@ -17,33 +34,94 @@ class GrizzlyGenerator(object):
     """
     Call the underlying code generator and produce the query text
     """
-    return GrizzlyGenerator._backend.generate(df)
+    return GrizzlyGenerator._executorFor(df).generate(df)
 
   @staticmethod
   def collect(df, includeHeader):
-    return GrizzlyGenerator._backend.collect(df, includeHeader)
+    return GrizzlyGenerator._executorFor(df).collect(df, includeHeader)
+
+  @staticmethod
+  def collectAll(dfs, includeHeader, parallelism):
+    from grizzly.dataframes.frame import LocalTable
+    dfs = list(dfs)
+    local = [LocalTable.isLocal(df) for df in dfs]
+    if not any(local):
+      return GrizzlyGenerator._backend.collectAll(dfs, includeHeader, parallelism)
+
+    # the DataFrames of materialized data are evaluated locally, the others in one batch by the backend
+    executor = GrizzlyGenerator._executorFor(dfs[local.index(True)])
+    localResults = iter(executor.collectAll([df for (df, l) in zip(dfs, local) if l], includeHeader, parallelism))
+    remote = [df for (df, l) in zip(dfs, local) if not l]
+    remoteResults = iter(GrizzlyGenerator._backend.collectAll(remote, includeHeader, parallelism) if remote else [])
+    return [next(localResults) if l else next(remoteResults) for l in local]
 
   @staticmethod
   def fetchone(df):
-    return GrizzlyGenerator._backend.fetchone(df)
+    return GrizzlyGenerator._executorFor(df).fetchone(df)
+
+  @staticmethod
+  def exists(df):
+    return GrizzlyGenerator._executorFor(df).exists(df)
+
+  @staticmethod
+  def containsMany(df, columns, candidates):
+    return GrizzlyGenerator._executorFor(df).containsMany(df, columns, candidates)
+
+  @staticmethod
+  def estimateRowCount(tableName, approx=None):
+    return GrizzlyGenerator._backend.estimateRowCount(tableName, approx)
+
+  @staticmethod
+  def iterator(df, includeHeader = False, batchSize = None):
+     return GrizzlyGenerator._executorFor(df).iterator(df, includeHeader, batchSize)
+
+  @staticmethod
+  def acollect(df, includeHeader):
+    return GrizzlyGenerator._executorFor(df).acollect(df, includeHeader)
+
+  @staticmethod
+  def afetchone(df):
+    return GrizzlyGenerator._executorFor(df).afetchone(df)
 
   @staticmethod
-  def iterator(df, includeHeader = False):
-     return GrizzlyGenerator._backend.iterator(df, includeHeader)
+  def ato_df(df):
+    return GrizzlyGenerator._executorFor(df).ato_df(df)
 
   @staticmethod
-  def toString(df, delim=",", pretty=False, maxColWidth=20, limit=20):
+  def aiterator(df, includeHeader = False, batchSize = None):
+    return GrizzlyGenerator._executorFor(df).aiterator(df, includeHeader, batchSize)
+
+  @staticmethod
+  def abatches(df, batchSize = None):
+    return GrizzlyGenerator._executorFor(df).abatches(df, batchSize)
+
+  @staticmethod
+  def toString(df, delim=",", pretty=False, maxColWidth=20, limit=20, countRemaining=False):
     """
     Call the underlying generator, execute the query and return string representation
     """
-    return GrizzlyGenerator._backend.toString(df,delim,pretty,maxColWidth,limit)
+    return GrizzlyGenerator._executorFor(df).toString(df,delim,pretty,maxColWidth,limit,countRemaining)
+
+  @staticmethod
+  def to_numpy(df, asDict, batchSize):
+    """
+    Call the underlying generator, execute the query and return the result as NumPy arrays
+    """
+    return GrizzlyGenerator._executorFor(df).to_numpy(df, asDict, batchSize)
+
+  @staticmethod
+  def to_arrow(df, batchSize):
+    """
+    Call the underlying generator, execute the query and return the result as pyarrow.Table
+    """
+    return GrizzlyGenerator._executorFor(df).to_arrow(df, batchSize)
 
   @staticmethod
   def to_df(df):
     """
     Call the underlying generator, execute the query and return df representation
     """
-    return GrizzlyGenerator._backend.to_df(df)
+    return GrizzlyGenerator._executorFor(df).to_df(df)
 
   
   @staticmethod
@@ -52,7 +130,23 @@ class GrizzlyGenerator(object):
     Call the underlying generator, execute the query and return string representation
     as a beautiful table...
     """
-    return GrizzlyGenerator._backend.table(df)
+    return GrizzlyGenerator._executorFor(df).table(df)
+
+  @staticmethod
+  def persist(df, indexColumns):
+    return GrizzlyGenerator._executorFor(df).persist(df, indexColumns)
+
+  @staticmethod
+  def unpersist(df):
+    return GrizzlyGenerator._executorFor(df).unpersist(df)
+
+  @staticmethod
+  def createView(df, name, materialized):
+    return GrizzlyGenerator._executorFor(df).createView(df, name, materialized)
+
+  @staticmethod
+  def refreshView(view):
+    return GrizzlyGenerator._backend.refreshView(view)
 
   @staticmethod
   def close():
@@ -65,8 +159,8 @@ class GrizzlyGenerator(object):
     
   @staticmethod
   def aggregate(df, f):
-    return GrizzlyGenerator._backend._execAgg(df, f)
+    return GrizzlyGenerator._executorFor(df)._execAgg(df, f)
 
   @staticmethod
   def _gen_aggregate(df, func):
-    return GrizzlyGenerator._backend._gen_agg(df, func)
+    return GrizzlyGenerator._executorFor(df)._gen_agg(df, func)
@@ -0,0 +1,869 @@
+from grizzly.dataframes.frame import DataFrame, LocalTable, Projection, Filter, Grouping, Join, Union, Limit, Ordering, Unpivot
+from grizzly.expression import AllColumns, ArithmExpr, ArithmeticOperation, BoolExpr, BooleanOperation, ColRef, ComputedCol, Constant, FuncCall, LogicExpr, LogicOperation, SetExpr, SetOperation, ExpressionException
+from grizzly.aggregates import AggregateType
+from grizzly.relationaldbexecutor import RelationalExecutor, QueryResult
+from grizzly import columnar
+
+import operator
+import time
+from typing import List
+
+import logging
+logger = logging.getLogger(__name__)
+
+class _Result(object):
+  '''
+  The columns of an evaluated DataFrame. Every column keeps the aliases of the DataFrames
+  it was produced by, so that column references of joins can be resolved like in SQL.
+  '''
+  def __init__(self, names: List[str], arrays: list, tags: List[set], numRows: int):
+    self.names = names
+    self.arrays = arrays
+    self.tags = tags
+    self.numRows = numRows
+
+  def __len__(self):
+    return self.numRows
+
+  def find(self, ref: ColRef):
+    matches = [i for (i, name) in enumerate(self.names) if name == ref.column]
+    if len(matches) > 1 and ref.df is not None:
+      tagged = [i for i in matches if ref.df.alias in self.tags[i]]
+      if tagged:
+        matches = tagged
+    return matches[0] if matches else None
+
+  def column(self, ref: ColRef):
+    i = self.find(ref)
+    if i is None:
+      raise ExpressionException(f"No such column: {ref.column}")
+    return self.arrays[i]
+
+  def take(self, index) -> "_Result":
+    arrays = [a[index] for a in self.arrays]
+    numRows = len(arrays[0]) if arrays else len(range(self.numRows)[index] if isinstance(index, slice) else index)
+    return _Result(list(self.names), arrays, [set(t) for t in self.tags], numRows)
+
+  def tagged(self, alias: str) -> "_Result":
+    for t in self.tags:
+      t.add(alias)
+    return self
+
+def _isNull(arr):
+  import numpy
+  if arr.dtype.kind == "f":
+    return numpy.isnan(arr)
+  elif arr.dtype.kind == "O":
+    return numpy.fromiter((v is None or (isinstance(v, float) and v != v) for v in arr), dtype=bool, count=len(arr))
+  return numpy.zeros(len(arr), dtype=bool)
+
+def _toArray(values):
+  import numpy
+  arr = numpy.array(values)
+  if arr.dtype.kind in "USO" or arr.ndim != 1:
+    # strings and mixed values are kept as Python objects, like in to_numpy()
+    arr = numpy.empty(len(values), dtype=object)
+    arr[:] = values
+  return arr
+
+def _broadcast(value, n: int):
+  import numpy
+  if isinstance(value, numpy.ndarray):
+    return value
+  if value is None or isinstance(value, str):
+    arr = numpy.empty(n, dtype=object)
+    arr[:] = [value] * n
+    return arr
+  return numpy.full(n, value)
+
+def _kind(value) -> str:
+  import numpy
+  if isinstance(value, numpy.ndarray):
+    return value.dtype.kind
+  elif isinstance(value, bool):
+    return "b"
+  elif isinstance(value, int):
+    return "i"
+  elif isinstance(value, float):
+    return "f"
+  return "O"
+
+def _isStar(col) -> bool:
+  return isinstance(col, AllColumns) or (isinstance(col, ColRef) and col.column == "*")
+
+def _scalar(value):
+  # NumPy scalars as Python values
+  return value.item() if hasattr(value, "item") and not isinstance(value, (str, bytes)) else value
+
+def _takeOrNull(arr, index):
+  '''
+  arr[index] where index -1 stands for a missing row (NULL), e.g. of an outer join
+  '''
+  import numpy
+  missing = index < 0
+  if not missing.any():
+    return arr[index]
+
+  if arr.dtype.kind in "iuf":
+    result = arr.astype(numpy.float64)[numpy.where(missing, 0, index)] if len(arr) else numpy.empty(len(index))
+    result[missing] = numpy.nan
+  else:
+    result = numpy.empty(len(index), dtype=object)
+    if len(arr):
+      result[:] = arr[numpy.where(missing, 0, index)]
+    result[missing] = None
+  return result
+
+def _factorize(values):
+  '''
+  Returns the distinct values (sorted, if possible) and for every value the position of its distinct value
+  '''
+  import numpy
+  if values.dtype.kind != "O" and not (values.dtype.kind == "f" and numpy.isnan(values).any()):
+    (uniques, inverse) = numpy.unique(values, return_inverse=True)
+    return (uniques, inverse.reshape(-1))
+
+  if values.dtype.kind == "O":
+    try:
+      (uniques, inverse) = numpy.unique(values, return_inverse=True)
+      return (uniques, inverse.reshape(-1))
+    except TypeError:
+      # NULL values or values of different types
+      pass
+
+  codes = {}
+  inverse = numpy.empty(len(values), dtype=numpy.int64)
+  for (i, v) in enumerate(values):
+    # as Python values, like the results of the database
+    key = None if isinstance(v, float) and v != v else _scalar(v)
+    inverse[i] = codes.setdefault(key, len(codes))
+  uniques = numpy.empty(len(codes), dtype=object)
+  uniques[:] = list(codes.keys())
+  return (uniques, inverse)
+
+def _groupIndex(keys: list, numRows: int):
+  '''
+  Number the distinct combinations of the key columns.
+  Returns the key values of every group and for every row the number of its group
+  '''
+  import numpy
+  if numRows == 0:
+    return ([k[:0] for k in keys], numpy.empty(0, dtype=numpy.int64))
+
+  factorized = [_factorize(k) for k in keys]
+  if len(keys) == 1:
+    (uniques, inverse) = factorized[0]
+    return ([uniques], inverse)
+
+  codes = numpy.stack([inverse for (_, inverse) in factorized], axis=1)
+  (groupCodes, inverse) = numpy.unique(codes, axis=0, return_inverse=True)
+  values = [uniques[groupCodes[:, i]] for (i, (uniques, _)) in enumerate(factorized)]
+  return (values, inverse.reshape(-1))
+
+def _distinctIndex(arrays: list, numRows: int):
+  '''
+  Positions of the first occurrence of every distinct row
+  '''
+  import numpy
+  rows = zip(*[[_scalar(v) for v in a.tolist()] for a in arrays]) if arrays else iter([()] * numRows)
+  first = {}
+  for (i, row) in enumerate(rows):
+    row = tuple([None if isinstance(v, float) and v != v else v for v in row])
+    first.setdefault(row, i)
+  return numpy.fromiter(first.values(), dtype=numpy.int64, count=len(first))
+
+class NumpyExecutor(object):
+  '''
+  Evaluates DataFrames that are derived from locally materialized data (see
+  DataFrame.materialize()) in-process with vectorized NumPy operations instead of
+  sending them to the database.
+
+  Supported are filters, projections (incl. DISTINCT and computed columns), groupings with
+  min/max/mean/count/sum and HAVING, orderings, limits, unions and joins. Equi-joins are
+  executed as sort-merge joins; other join conditions evaluate the cross product and are
+  only suited for small inputs. UDFs are called row by row with their Python function.
+  '''
+
+  _AGGREGATES = {"min": AggregateType.MIN, "max": AggregateType.MAX, "avg": AggregateType.MEAN, "mean": AggregateType.MEAN,
+                 "count": AggregateType.COUNT, "sum": AggregateType.SUM}
+
+  _COMPARISONS = {BooleanOperation.EQ: operator.eq, BooleanOperation.NE: operator.ne, BooleanOperation.GT: operator.gt,
+                  BooleanOperation.GE: operator.ge, BooleanOperation.LT: operator.lt, BooleanOperation.LE: operator.le}
+
+  def __init__(self, batchSize=columnar.DEFAULT_BATCH_SIZE):
+    self.batchSize = batchSize
+    super().__init__()
+
+  @staticmethod
+  def isLocal(df) -> bool:
+    return LocalTable.isLocal(df)
+
+  ###################################
+  # evaluation
+
+  def evaluate(self, df: DataFrame) -> _Result:
+    return self._eval(df, {})
+
+  def _eval(self, df: DataFrame, memo: dict) -> _Result:
+    if id(df) in memo:
+      cached = memo[id(df)]
+      return _Result(list(cached.names), list(cached.arrays), [set(t) for t in cached.tags], cached.numRows)
+
+    if isinstance(df, LocalTable):
+      names = list(df.data.keys())
+      arrays = list(df.data.values())
+      res = _Result(names, arrays, [set() for _ in names], len(arrays[0]) if arrays else 0)
+      ctx = res
+
+    elif isinstance(df, Projection):
+      ctx = self._eval(df.parents[0], memo)
+      res = self._project(df, ctx)
+
+    elif isinstance(df, Filter):
+      ctx = self._eval(df.parents[0], memo)
+      mask = _broadcast(self._expr(df.expr, ctx), len(ctx)).astype(bool)
+      res = ctx.take(mask)
+      ctx = res
+
+    elif isinstance(df, Grouping):
+      res = self._group(df, self._eval(df.parents[0], memo))
+      ctx = res
+
+    elif isinstance(df, Join):
+      res = self._join(df, self._eval(df.leftParent(), memo), self._eval(df.rightParent(), memo))
+      ctx = res
+
+    elif isinstance(df, Union):
+      res = self._union(df, self._eval(df.leftParent(), memo), self._eval(df.rightParent(), memo))
+      ctx = res
+
+    elif isinstance(df, Limit):
+      ctx = self._eval(df.parents[0], memo)
+      limit = _scalar(self._expr(df.limit, ctx))
+      offset = _scalar(self._expr(df.offset, ctx)) if df.offset is not None else 0
+      if hasattr(offset, "__len__"):
+        offset = _scalar(offset[0])
+      res = ctx.take(slice(int(offset), int(offset) + int(limit)))
+      ctx = res
+
+    elif isinstance(df, Ordering):
+      ctx = self._eval(df.parents[0], memo)
+      res = ctx.take(self._sortIndex(df, ctx))
+      ctx = res
+
+    elif isinstance(df, Unpivot):
+      raise ValueError("Unpivot must be the last operation")
+
+    else:
+      raise ValueError(f"{type(df).__name__} cannot be evaluated locally, only DataFrames derived from materialized data")
+
+    for c in df.computedCols:
+      # the computed columns of a projection are based on its input
+      res.names.append(c.alias)
+      res.arrays.append(_broadcast(self._expr(c, ctx), len(res)))
+      res.tags.append(set())
+
+    if isinstance(df, Projection) and df.doDistinct:
+      res = res.take(_distinctIndex(res.arrays, len(res)))
+
+    res.tagged(df.alias)
+    memo[id(df)] = res
+    return res
+
+  def _name(self, col) -> str:
+    if isinstance(col, ColRef):
+      return col.alias if col.alias else col.column
+    elif isinstance(col, FuncCall):
+      if col.alias:
+        return col.alias
+      aggType = NumpyExecutor._aggType(col)
+      name = AggregateType.getName(aggType) if aggType is not None else str(col.funcName)
+      args = ",".join(["*" if _isStar(c) else self._name(c) for c in col.inputCols or []])
+      return f"{name}({args})"
+    elif isinstance(col, (ComputedCol, Constant)) and col.alias:
+      return col.alias
+    elif isinstance(col, Constant):
+      return str(col.value)
+    return str(col)
+
+  def _project(self, df: Projection, ctx: _Result) -> _Result:
+    if not df.columns:
+      return _Result(list(ctx.names), list(ctx.arrays), [set(t) for t in ctx.tags], len(ctx))
+
+    isAggregation = any([isinstance(c, FuncCall) and NumpyExecutor._aggType(c) is not None for c in df.columns])
+
+    names = []
+    values = []
+    tags = []
+    for col in df.columns:
+      if isinstance(col, AllColumns):
+        names.extend(ctx.names)
+        values.extend(ctx.arrays)
+        tags.extend([set(t) for t in ctx.tags])
+        continue
+
+      names.append(self._name(col))
+      values.append(self._expr(col, ctx))
+      i = ctx.find(col) if isinstance(col, ColRef) else None
+      tags.append(set(ctx.tags[i]) if i is not None else set())
+
+    if isAggregation:
+      # a single row with the aggregates over all rows
+      import numpy
+      arrays = []
+      for v in values:
+        if isinstance(v, numpy.ndarray):
+          v = _scalar(v[0]) if len(v) else None
+        arrays.append(_toArray([v]))
+      return _Result(names, arrays, tags, 1)
+
+    return _Result(names, [_broadcast(v, len(ctx)) for v in values], tags, len(ctx))
+
+  def _group(self, df: Grouping, ctx: _Result) -> _Result:
+    keys = [_broadcast(self._expr(c, ctx), len(ctx)) for c in df.groupCols]
+    (groupValues, inverse) = _groupIndex(keys, len(ctx))
+    numGroups = len(groupValues[0]) if groupValues else 0
+
+    names = [self._name(c) for c in df.groupCols]
+    arrays = list(groupValues)
+    for f in df.aggFunc:
+      names.append(self._name(f))
+      arrays.append(self._aggregateGroups(f, ctx, inverse, numGroups))
+
+    res = _Result(names, arrays, [set() for _ in names], numGroups)
+    for h in df.having:
+      res = res.take(_broadcast(self._expr(h, res), len(res)).astype(bool))
+    return res
+
+  def _union(self, df: Union, left: _Result, right: _Result) -> _Result:
+    import numpy
+    if len(left.arrays) != len(right.arrays):
+      raise ValueError(f"UNION of {len(left.arrays)} and {len(right.arrays)} columns")
+
+    arrays = []
+    for (l, r) in zip(left.arrays, right.arrays):
+      if l.dtype.kind == "O" or r.dtype.kind == "O":
+        arrays.append(numpy.concatenate([l.astype(object), r.astype(object)]))
+      else:
+        arrays.append(numpy.concatenate([l, r]))
+
+    res = _Result(list(left.names), arrays, [set(t) for t in left.tags], len(left) + len(right))
+    if df.distinct:
+      res = res.take(_distinctIndex(res.arrays, len(res)))
+    return res
+
+  def _sortIndex(self, df: Ordering, ctx: _Result):
+    import numpy
+    if isinstance(df.ascending, list):
+      ascending = df.ascending
+    else:
+      ascending = [df.ascending is None or bool(df.ascending)] * len(df.by)
+
+    sortKeys = []
+    for (col, asc) in zip(df.by, ascending):
+      values = ctx.column(col)
+      nulls = _isNull(values)
+      rank = numpy.empty(len(values), dtype=numpy.int64)
+      try:
+        (uniques, inverse) = numpy.unique(values[~nulls], return_inverse=True)
+        rank[~nulls] = inverse.reshape(-1)
+      except TypeError:
+        # values of different types
+        distinct = sorted(set(values[~nulls].tolist()), key=lambda v: (type(v).__name__, v))
+        position = {v: i for (i, v) in enumerate(distinct)}
+        rank[~nulls] = [position[v] for v in values[~nulls].tolist()]
+        uniques = distinct
+      # NULL values are the smallest values, like in SQLite and MySQL
+      rank[nulls] = -1
+      sortKeys.append(rank if asc else -rank)
+
+    # lexsort sorts by the last key first and is stable
+    return numpy.lexsort(sortKeys[::-1]) if sortKeys else numpy.arange(len(ctx))
+
+  ###################################
+  # joins
+
+  @staticmethod
+  def _equiJoin(lk, rk):
+    '''
+    Positions of the matching rows of an equi-join of the key columns. NULL values never match.
+    '''
+    import numpy
+    lpos = numpy.flatnonzero(~_isNull(lk))
+    rpos = numpy.flatnonzero(~_isNull(rk))
+    lv = lk[lpos]
+    rv = rk[rpos]
+
+    try:
+      order = numpy.argsort(rv, kind="stable")
+      sortedRight = rv[order]
+      lo = numpy.searchsorted(sortedRight, lv, "left")
+      hi = numpy.searchsorted(sortedRight, lv, "right")
+    except TypeError:
+      # values that cannot be sorted, use a hash join
+      positions = {}
+      for (i, v) in enumerate(rv.tolist()):
+        positions.setdefault(v, []).append(i)
+      li = []
+      ri = []
+      for (i, v) in enumerate(lv.tolist()):
+        for j in positions.get(v, []):
+          li.append(lpos[i])
+          ri.append(rpos[j])
+      return (numpy.array(li, dtype=numpy.int64), numpy.array(ri, dtype=numpy.int64))
+
+    counts = hi - lo
+    li = numpy.repeat(lpos, counts)
+    starts = numpy.repeat(lo, counts)
+    offsets = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    ri = rpos[order[starts + offsets]]
+    return (li, ri)
+
+  def _joinKeys(self, on, left: _Result, right: _Result):
+    '''
+    The key columns of an equi-join condition, or None if the condition is no equi-join
+    '''
+    if isinstance(on, ColRef):
+      ref = ColRef(on.column, None)
+      return (left.column(ref), right.column(ref))
+
+    if isinstance(on, BoolExpr) and not isinstance(on, SetExpr) and on.operand == BooleanOperation.EQ \
+        and isinstance(on.left, ColRef) and isinstance(on.right, ColRef):
+      (l, r) = (on.left, on.right)
+      if left.find(l) is None or right.find(r) is None:
+        (l, r) = (r, l)
+      if left.find(l) is not None and right.find(r) is not None:
+        return (left.column(l), right.column(r))
+
+    return None
+
+  def _join(self, df: Join, left: _Result, right: _Result) -> _Result:
+    import numpy
+    how = df.how.lower().replace("outer", "").strip() if df.how else "inner"
+
+    on = df.on
+    if isinstance(on, list):
+      if len(on) != 2:
+        raise ExpressionException("on condition must consist of exacltly two columns")
+      op = {"=": BooleanOperation.EQ, "==": BooleanOperation.EQ, "!=": BooleanOperation.NE, "<>": BooleanOperation.NE,
+            ">": BooleanOperation.GT, ">=": BooleanOperation.GE, "<": BooleanOperation.LT, "<=": BooleanOperation.LE}[df.comp]
+      on = BoolExpr(on[0], on[1], op)
+
+    keys = self._joinKeys(on, left, right)
+    if keys is not None:
+      (li, ri) = NumpyExecutor._equiJoin(keys[0], keys[1])
+    else:
+      # cross product, filtered by the join condition
+      li = numpy.repeat(numpy.arange(len(left)), len(right))
+      ri = numpy.tile(numpy.arange(len(right)), len(left))
+      if on is not None:
+        combined = NumpyExecutor._combine(left, right, li, ri)
+        mask = _broadcast(self._expr(on, combined), len(combined)).astype(bool)
+        (li, ri) = (li[mask], ri[mask])
+
+    if how in ["left", "full"]:
+      unmatched = numpy.setdiff1d(numpy.arange(len(left)), li)
+      li = numpy.concatenate([li, unmatched])
+      ri = numpy.concatenate([ri, numpy.full(len(unmatched), -1)])
+    if how in ["right", "full"]:
+      unmatched = numpy.setdiff1d(numpy.arange(len(right)), ri)
+      li = numpy.concatenate([li, numpy.full(len(unmatched), -1)])
+      ri = numpy.concatenate([ri, unmatched])
+
+    res = NumpyExecutor._combine(left, right, li, ri)
+    if isinstance(df.on, ColRef):
+      # USING: the key column is returned only once
+      drop = len(left.names) + right.find(ColRef(df.on.column, None))
+      for l in [res.names, res.arrays, res.tags]:
+        del l[drop]
+    return res
+
+  @staticmethod
+  def _combine(left: _Result, right: _Result, li, ri) -> _Result:
+    arrays = [_takeOrNull(a, li) for a in left.arrays] + [_takeOrNull(a, ri) for a in right.arrays]
+    tags = [set(t) for t in left.tags] + [set(t) for t in right.tags]
+    return _Result(left.names + right.names, arrays, tags, len(li))
+
+  ###################################
+  # expressions
+
+  def _expr(self, expr, ctx: _Result):
+    import numpy
+
+    if expr is None:
+      return None
+
+    elif isinstance(expr, Constant):
+      return expr.value
+
+    elif isinstance(expr, AllColumns):
+      raise ExpressionException("* can only be used in count(*)")
+
+    elif isinstance(expr, ColRef):
+      return ctx.column(expr)
+
+    elif isinstance(expr, ComputedCol):
+      return self._expr(expr.value, ctx)
+
+    elif isinstance(expr, LogicExpr):
+      l = _broadcast(self._expr(expr.left, ctx), len(ctx)).astype(bool)
+      if expr.operand == LogicOperation.NOT:
+        return numpy.logical_not(l)
+
+      r = _broadcast(self._expr(expr.right, ctx), len(ctx)).astype(bool)
+      if expr.operand == LogicOperation.AND:
+        return numpy.logical_and(l, r)
+      elif expr.operand == LogicOperation.OR:
+        return numpy.logical_or(l, r)
+      elif expr.operand == LogicOperation.XOR:
+        return numpy.logical_xor(l, r)
+      raise ExpressionException(f"unknown logical operation: {expr.operand}")
+
+    elif isinstance(expr, SetExpr):
+      l = _broadcast(self._expr(expr.left, ctx), len(ctx))
+      if isinstance(expr.right, DataFrame):
+        sub = self.evaluate(expr.right)
+        candidates = sub.arrays[0].tolist() if sub.arrays else []
+      else:
+        candidates = list(expr.right)
+
+      if expr.operand != SetOperation.IN:
+        raise ExpressionException(f"unknown set operation: {expr.operand}")
+      candidates = set(candidates)
+      return numpy.fromiter((v in candidates for v in l.tolist()), dtype=bool, count=len(l))
+
+    elif isinstance(expr, BoolExpr):
+      if isinstance(expr.left, (list, tuple)):
+        # a tuple of columns compared with a tuple of values
+        results = [self._expr(BoolExpr(l, r, expr.operand), ctx) for (l, r) in zip(expr.left, expr.right)]
+        combine = numpy.logical_or if expr.operand == BooleanOperation.NE else numpy.logical_and
+        result = numpy.ones(len(ctx), dtype=bool) if expr.operand != BooleanOperation.NE else numpy.zeros(len(ctx), dtype=bool)
+        for r in results:
+          result = combine(result, _broadcast(r, len(ctx)))
+        return result
+
+      l = _broadcast(self._expr(expr.left, ctx), len(ctx))
+      if expr.right is None:
+        if expr.operand == BooleanOperation.EQ:
+          return _isNull(l)
+        elif expr.operand == BooleanOperation.NE:
+          return ~_isNull(l)
+        raise ExpressionException("only == and != allowed for comparison with None (NULL)")
+
+      r = _broadcast(self._expr(expr.right, ctx), len(ctx))
+      return NumpyExecutor._compare(expr.operand, l, r)
+
+    elif isinstance(expr, ArithmExpr):
+      return NumpyExecutor._arithmetic(expr.operand, self._expr(expr.left, ctx), self._expr(expr.right, ctx))
+
+    elif isinstance(expr, FuncCall):
+      if NumpyExecutor._aggType(expr) is not None:
+        return self._aggregate(expr, ctx)
+      return self._callUDF(expr, ctx)
+
+    elif isinstance(expr, DataFrame):
+      # scalar subquery
+      sub = self.evaluate(expr)
+      return _scalar(sub.arrays[0][0]) if sub.arrays and len(sub) else None
+
+    elif isinstance(expr, (list, tuple)):
+      return [self._expr(e, ctx) for e in expr]
+
+    raise ExpressionException(f"unsupported expression for local evaluation: {type(expr)}")
+
+  @staticmethod
+  def _compare(op: BooleanOperation, l, r):
+    import numpy
+    func = NumpyExecutor._COMPARISONS[op]
+    nulls = _isNull(l) | _isNull(r)
+    if l.dtype.kind == "O" or r.dtype.kind == "O":
+      if nulls.any():
+        # comparisons with NULL are never true
+        return numpy.fromiter((not n and bool(func(a, b)) for (a, b, n) in zip(l, r, nulls)), dtype=bool, count=len(l))
+
+    with numpy.errstate(invalid="ignore"):
+      result = numpy.asarray(func(l, r), dtype=bool)
+    return result & ~nulls
+
+  @staticmethod
+  def _arithmetic(op: ArithmeticOperation, l, r):
+    import numpy
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+      if op == ArithmeticOperation.ADD:
+        return l + r
+      elif op == ArithmeticOperation.SUB:
+        return l - r
+      elif op == ArithmeticOperation.MUL:
+        return l * r
+      elif op == ArithmeticOperation.DIV:
+        q = numpy.true_divide(l, r)
+        if _kind(l) in "iu" and _kind(r) in "iu" and numpy.all(numpy.isfinite(q)):
+          # integer division truncates, like in SQL
+          return numpy.trunc(q).astype(numpy.int64)
+        return q
+      elif op == ArithmeticOperation.MOD:
+        return numpy.fmod(l, r)
+      elif op == ArithmeticOperation.POW:
+        return numpy.power(l, r)
+    raise ExpressionException(f"unknown arithmetic operation: {op}")
+
+  def _callUDF(self, f: FuncCall, ctx: _Result):
+    func = getattr(f.udf, "func", None) if f.udf is not None else None
+    if func is None:
+      raise ExpressionException(f"function {f.funcName} cannot be evaluated locally")
+
+    args = [_broadcast(self._expr(c, ctx), len(ctx)).tolist() for c in f.inputCols]
+    return _toArray([func(*values) for values in zip(*args)])
+
+  ###################################
+  # aggregates
+
+  @staticmethod
+  def _aggType(f: FuncCall):
+    if isinstance(f.funcName, AggregateType):
+      return f.funcName
+    if isinstance(f.funcName, str) and f.udf is None:
+      return NumpyExecutor._AGGREGATES.get(f.funcName.lower())
+    return None
+
+  def _aggregate(self, f: FuncCall, ctx: _Result):
+    '''
+    The aggregate over all rows
+    '''
+    import numpy
+    aggType = NumpyExecutor._aggType(f)
+    if not f.inputCols or _isStar(f.inputCols[0]):
+      if aggType != AggregateType.COUNT:
+        raise ExpressionException(f"{AggregateType.getName(aggType)}(*) is not supported")
+      return len(ctx)
+
+    values = _broadcast(self._expr(f.inputCols[0], ctx), len(ctx))
+    values = values[~_isNull(values)]
+    if aggType == AggregateType.COUNT:
+      return len(values)
+    if len(values) == 0:
+      return None
+
+    if values.dtype.kind == "O":
+      values = values.tolist()
+      if aggType == AggregateType.MIN:
+        return min(values)
+      elif aggType == AggregateType.MAX:
+        return max(values)
+      elif aggType == AggregateType.SUM:
+        return sum(values)
+      return sum(values) / len(values)
+
+    if aggType == AggregateType.MIN:
+      return _scalar(values.min())
+    elif aggType == AggregateType.MAX:
+      return _scalar(values.max())
+    elif aggType == AggregateType.SUM:
+      return _scalar(values.sum())
+    return _scalar(numpy.mean(values))
+
+  def _aggregateGroups(self, f: FuncCall, ctx: _Result, inverse, numGroups: int):
+    '''
+    The aggregate for every group; inverse is the number of the group of every row
+    '''
+    import numpy
+    aggType = NumpyExecutor._aggType(f)
+    if aggType is None:
+      raise ExpressionException(f"aggregate {f.funcName} cannot be evaluated locally")
+
+    if not f.inputCols or _isStar(f.inputCols[0]):
+      return numpy.bincount(inverse, minlength=numGroups)
+
+    values = _broadcast(self._expr(f.inputCols[0], ctx), len(ctx))
+    valid = ~_isNull(values)
+    (values, inverse) = (values[valid], inverse[valid])
+    counts = numpy.bincount(inverse, minlength=numGroups)
+    if aggType == AggregateType.COUNT:
+      return counts
+
+    empty = counts == 0
+    if values.dtype.kind in "iufb" and aggType in [AggregateType.SUM, AggregateType.MEAN]:
+      sums = numpy.bincount(inverse, weights=values.astype(numpy.float64), minlength=numGroups)
+      if aggType == AggregateType.MEAN:
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+          return numpy.where(empty, numpy.nan, sums / counts)
+      if values.dtype.kind in "iub" and not empty.any():
+        return sums.astype(numpy.int64)
+      sums[empty] = numpy.nan
+      return sums
+
+    # per group: sort the values by their group
+    order = numpy.argsort(inverse, kind="stable")
+    (values, inverse) = (values[order], inverse[order])
+    starts = numpy.flatnonzero(numpy.r_[True, inverse[1:] != inverse[:-1]]) if len(inverse) else numpy.empty(0, dtype=numpy.int64)
+    groups = inverse[starts]
+
+    if values.dtype.kind in "iufb" and aggType in [AggregateType.MIN, AggregateType.MAX]:
+      reduce = numpy.minimum if aggType == AggregateType.MIN else numpy.maximum
+      reduced = reduce.reduceat(values, starts) if len(starts) else values[:0]
+      if not empty.any():
+        result = numpy.empty(numGroups, dtype=values.dtype)
+      else:
+        result = numpy.full(numGroups, numpy.nan)
+      result[groups] = reduced
+      return result
+
+    # Python objects, e.g. strings
+    func = {AggregateType.MIN: min, AggregateType.MAX: max, AggregateType.SUM: sum, AggregateType.MEAN: lambda v: sum(v) / len(v)}[aggType]
+    result = numpy.empty(numGroups, dtype=object)
+    result[:] = None
+    for (g, part) in zip(groups, numpy.split(values, starts[1:])):
+      result[g] = func(part.tolist())
+    return result
+
+  ###################################
+  # actions
+
+  @staticmethod
+  def _rowsOf(res: _Result) -> list:
+    import numpy
+    columns = []
+    for arr in res.arrays:
+      values = arr.tolist()
+      if arr.dtype.kind == "f" and numpy.isnan(arr).any():
+        # NaN stands for NULL
+        values = [None if v != v else v for v in values]
+      columns.append(values)
+    return list(zip(*columns)) if columns else [()] * len(res)
+
+  def _result(self, df):
+    '''
+    The header and the rows (tuples) of the DataFrame
+    '''
+    if isinstance(df, Unpivot):
+      rows = NumpyExecutor._rowsOf(self.evaluate(df.parents[0]))
+      return (list(df.header), df.reshape(rows[0] if rows else None))
+
+    res = self.evaluate(df)
+    return (list(res.names), NumpyExecutor._rowsOf(res))
+
+  def generate(self, df):
+    raise ValueError("DataFrames of materialized data are evaluated locally and not translated into SQL")
+
+  def generateQuery(self, df):
+    return self.generate(df)
+
+  def persist(self, df, indexColumns=None):
+    raise ValueError("DataFrames of materialized data are already held in memory and cannot be persisted")
+
+  def unpersist(self, df):
+    pass
+
+  def createView(self, df, name, materialized=False):
+    raise ValueError("DataFrames of materialized data cannot be stored as a view of the database")
+
+  def estimateRowCount(self, tableName: str, approx=None):
+    return None
+
+  def fetchone(self, df):
+    (_, rows) = self._result(df)
+    return rows[0] if rows else None
+
+  def collect(self, df, includeHeader):
+    (header, rows) = self._result(df)
+    tuples = columnar.RowConverter().convert(rows) if rows else []
+    if includeHeader:
+      tuples.insert(0, header)
+    return tuples
+
+  def collectAll(self, dfs, includeHeader=False, parallelism=None):
+    results = []
+    for df in dfs:
+      start = time.perf_counter()
+      rows = self.collect(df, includeHeader)
+      results.append(QueryResult(rows, None, time.perf_counter() - start))
+    return results
+
+  def iterator(self, df, includeHeader, batchSize=None):
+    (header, rows) = self._result(df)
+    if includeHeader:
+      yield header
+    yield from rows
+
+  def exists(self, df) -> bool:
+    if isinstance(df, Unpivot):
+      return len(self._result(df)[1]) > 0
+    return len(self.evaluate(df)) > 0
+
+  def containsMany(self, df, columns: List[str], candidates: List[tuple]) -> List[bool]:
+    res = self.evaluate(df)
+    selected = _Result([c for c in columns], [res.column(ColRef(c, None)) for c in columns], [set() for _ in columns], len(res))
+    rows = set(NumpyExecutor._rowsOf(selected))
+    return [tuple(c) in rows for c in candidates]
+
+  def to_numpy(self, df, asDict=False, batchSize=columnar.DEFAULT_BATCH_SIZE):
+    if isinstance(df, Unpivot):
+      (header, rows) = self._result(df)
+      arrays = [_toArray(list(values)) for values in zip(*rows)] if rows else [_toArray([]) for _ in header]
+    else:
+      res = self.evaluate(df)
+      (header, arrays) = (res.names, res.arrays)
+
+    names = columnar.uniqueNames(header)
+    if asDict:
+      return dict(zip(names, arrays))
+    return columnar.toStructured(names, arrays)
+
+  def to_arrow(self, df, batchSize=columnar.DEFAULT_BATCH_SIZE):
+    import pyarrow
+    arrays = self.to_numpy(df, True)
+    # NaN stands for NULL
+    return pyarrow.Table.from_arrays([pyarrow.array(a, from_pandas=True) for a in arrays.values()], names=list(arrays.keys()))
+
+  def to_df(self, df):
+    try:
+      import pyarrow
+    except ImportError:
+      import pandas
+      (header, rows) = self._result(df)
+      return pandas.DataFrame.from_records(rows, columns=header)
+
+    return self.to_arrow(df).to_pandas()
+
+  def _preview(self, df, limit):
+    (header, rows) = self._result(df)
+    return (header, rows if limit is None else rows[:limit + 1])
+
+  def _remainder(self, df, limit, countRemaining) -> str:
+    if not countRemaining:
+      return "and more..."
+    return f"and {len(self._result(df)[1]) - limit} more..."
+
+  # the same output as for the database
+  table = RelationalExecutor.table
+  toString = RelationalExecutor.toString
+
+  def _execAgg(self, df, f):
+    return self._aggregate(f, self.evaluate(df))
+
+  def _gen_agg(self, df, func):
+    return self.generate(df)
+
+  async def acollect(self, df, includeHeader=False):
+    return self.collect(df, includeHeader)
+
+  async def afetchone(self, df):
+    return self.fetchone(df)
+
+  async def ato_df(self, df):
+    return self.to_df(df)
+
+  async def abatches(self, df, batchSize=None, header=None):
+    (names, rows) = self._result(df)
+    if header is not None:
+      header.extend(names)
+    batchSize = batchSize or self.batchSize
+    for start in range(0, len(rows), batchSize):
+      yield rows[start:start + batchSize]
+
+  async def aiterator(self, df, includeHeader=False, batchSize=None):
+    for row in self.iterator(df, includeHeader):
+      yield row
+
+  def close(self):
+    pass
@@ -0,0 +1,492 @@
+from grizzly.dataframes.frame import Limit, Unpivot, Ordering, Table, ExternalTable, Projection, Filter, Join, Grouping, Union
+from grizzly.expression import AllColumns, BinaryExpression, ColRef, ComputedCol, FuncCall, LogicExpr, LogicOperation
+
+import logging
+logger = logging.getLogger(__name__)
+
+class CTERef(object):
+  '''
+  Reference to a common table expression of the query, which is read like a table
+  '''
+
+  def __init__(self, name):
+    self.table = name
+
+
+class SelectBlock(object):
+  '''
+  A single SELECT statement of the logical plan.
+
+  Several DataFrame operators can be merged into one block. All merged operators
+  (the members) read from the same source, thus every alias of a member is
+  replaced by the alias of the block when the SQL is generated.
+  '''
+
+  def __init__(self, source, alias):
+    # a Table/ExternalTable/CTERef, a Join or Union or another SelectBlock (i.e. a subquery)
+    self.source = source
+    self.alias = alias
+    self.aliasMap = {}
+
+    # inputs of Join and Union blocks
+    self.left = None
+    self.right = None
+
+    self.computedCols = []
+    # list of (expr, aliases) where aliases are additional replacements for
+    # predicates that were pushed down into this block
+    self.where = []
+    self.projection = None
+    self.grouping = None
+    self.ordering = None
+    self.orderBy = []
+    self.limit = None
+
+    # explicit (alias, column) list that replaces "*" if not all columns
+    # of the source are needed, see Optimizer._prune()
+    self.columns = None
+
+  def addMember(self, df):
+    self.aliasMap[df.alias] = self.alias
+    self.computedCols += df.computedCols
+
+  def isScan(self):
+    '''
+    True if this block only reads its source table without any further operation
+    '''
+    return (isinstance(self.source, Table) or isinstance(self.source, ExternalTable) or isinstance(self.source, CTERef)) \
+      and not self.where and not self.computedCols and self.projection is None \
+      and self.grouping is None and self.ordering is None and self.limit is None
+
+  def hasSingleSource(self):
+    return not (isinstance(self.source, Join) or isinstance(self.source, Union))
+
+
+class Optimizer(object):
+  '''
+  Rule-based rewrite of a DataFrame tree into a plan of SelectBlocks.
+
+  Without any rule enabled, every operator becomes its own block, which results
+  in the same nested queries as the plain SQLGenerator produces.
+
+  Rules:
+   - flatten: merge operators into the block of their parent
+   - pushdown: move filter predicates below joins, projections and computed columns
+   - prune: only select the columns from the inputs that are needed by the query
+  '''
+
+  def __init__(self, flatten: bool = True, pushdown: bool = True, prune: bool = True):
+    self.flatten = flatten
+    self.pushdown = pushdown
+    self.prune = prune
+    self._ctes = {}
+    super().__init__()
+
+  def optimize(self, df, ctes = None) -> SelectBlock:
+    '''
+    Create the plan for the given DataFrame. ctes maps the ids of DataFrames
+    that are replaced by common table expressions to their names
+    '''
+    self._ctes = ctes if ctes is not None else {}
+    try:
+      block = self.plan(df)
+    finally:
+      self._ctes = {}
+
+    if self.prune:
+      # the result of the query has to contain all columns
+      self._prune(block, None)
+    return block
+
+  def plan(self, df) -> SelectBlock:
+    if id(df) in self._ctes:
+      block = SelectBlock(CTERef(self._ctes[id(df)]), df.alias)
+      block.aliasMap[df.alias] = block.alias
+      return block
+
+    elif df._persisted is not None:
+      # read from the temporary table with the result of the DataFrame
+      block = SelectBlock(df._persisted, df.alias)
+      block.aliasMap[df.alias] = block.alias
+      return block
+
+    elif isinstance(df, Table) or isinstance(df, ExternalTable):
+      block = SelectBlock(df, df.alias)
+      block.addMember(df)
+      return block
+
+    elif isinstance(df, Join) or isinstance(df, Union):
+      block = SelectBlock(df, df.alias)
+      block.left = self.plan(df.leftParent())
+      block.right = self.plan(df.rightParent())
+      block.aliasMap[df.alias] = df.alias
+      if isinstance(df, Join):
+        block.computedCols += df.computedCols
+      return block
+
+    if isinstance(df, Unpivot):
+      raise ValueError("Unpivot must be the last operation")
+
+    child = self.plan(df.parents[0])
+
+    if isinstance(df, Filter) and self.pushdown:
+      return self._planFilter(child, df)
+
+    if self.flatten and self._canMerge(child, df):
+      logger.debug(f"merging {type(df).__name__} {df.alias} into block {child.alias}")
+      return self._merge(child, df)
+
+    block = SelectBlock(child, df.alias)
+    if isinstance(df, Grouping) and df.computedCols:
+      # computed columns over a grouping are added in an extra block on top
+      # as they may reference the aggregates
+      block.aliasMap[df.alias] = block.alias
+      block.grouping = df
+      outer = SelectBlock(block, df.alias)
+      outer.addMember(df)
+      return outer
+
+    return self._merge(block, df)
+
+  def _merge(self, block: SelectBlock, df) -> SelectBlock:
+    if isinstance(df, Grouping):
+      # computed columns of a grouping are never merged, see plan()
+      block.aliasMap[df.alias] = block.alias
+    else:
+      block.addMember(df)
+
+    if isinstance(df, Filter):
+      block.where.append((df.expr, None))
+    elif isinstance(df, Projection):
+      block.projection = df
+    elif isinstance(df, Grouping):
+      block.grouping = df
+    elif isinstance(df, Ordering):
+      block.ordering = df
+      block.orderBy = [(ref, self._resolve(block, ref.column) == "bare") for ref in df.by]
+    elif isinstance(df, Limit):
+      block.limit = df
+    else:
+      raise ValueError(f"unsupported operator {type(df)}")
+
+    return block
+
+  def _planFilter(self, child: SelectBlock, df: Filter) -> SelectBlock:
+    remaining = []
+    for conj in Optimizer._conjuncts(df.expr):
+      refs = Optimizer._getRefs(conj)
+      if refs is None or any([r.df is not df for r in refs]) or not self._push(child, conj, df.alias, [r.column for r in refs]):
+        remaining.append(conj)
+      else:
+        logger.debug(f"pushed down predicate of filter {df.alias}")
+
+    if not remaining and not df.computedCols:
+      return child
+
+    if self.flatten and self._canMerge(child, df):
+      block = child
+    else:
+      block = SelectBlock(child, df.alias)
+
+    block.addMember(df)
+    block.where += [(conj, None) for conj in remaining]
+    return block
+
+  def _push(self, block: SelectBlock, conj, fromAlias: str, cols) -> bool:
+    '''
+    Try to evaluate the predicate conj, that references the output columns cols of the
+    given block, as early as possible in the block or its inputs.
+    Returns True if the predicate was added to some block.
+    '''
+    if isinstance(block.source, Join):
+      join = block.source
+      side = Optimizer._joinSide(join, cols)
+      if side is None:
+        return False
+
+      how = join.how.lower()
+      if side == "left":
+        (target, alias, canPush) = (block.left, join.leftParent().alias, "right" not in how and "full" not in how)
+      else:
+        (target, alias, canPush) = (block.right, join.rightParent().alias, "left" not in how and "full" not in how)
+
+      if not canPush:
+        # rows of this side may be null-extended, so filter after the join
+        block.where.append((conj, {fromAlias: alias}))
+        return True
+
+      if not self._push(target, conj, fromAlias, cols):
+        wrapper = SelectBlock(target, alias)
+        wrapper.where.append((conj, {fromAlias: alias}))
+        if side == "left":
+          block.left = wrapper
+        else:
+          block.right = wrapper
+
+      return True
+
+    if isinstance(block.source, Union) or block.limit is not None:
+      return False
+
+    if not all([self._resolve(block, c) == "qualified" for c in cols]):
+      return False
+
+    if isinstance(block.source, SelectBlock) and self._push(block.source, conj, fromAlias, cols):
+      return True
+
+    block.where.append((conj, {fromAlias: block.alias}))
+    return True
+
+  def _prune(self, block: SelectBlock, required):
+    '''
+    Determine the columns of the block's source that are needed to produce the
+    required output columns (None for all columns) and continue with the inputs.
+    If the block passes through all columns of its source, only the required ones are selected.
+    '''
+    source = block.source
+    if isinstance(source, Union):
+      self._prune(block.left, None)
+      self._prune(block.right, None)
+      return
+
+    # names that are produced by the block itself and not read from the source
+    produced = [c.alias for c in block.computedCols]
+    if block.grouping is not None:
+      produced += [f.alias for f in block.grouping.aggFunc if f.alias]
+
+    used = Optimizer._usedColumns(block)
+    if used is not None:
+      used = [c for c in used if c not in produced]
+
+    passed = None
+    if block.grouping is not None or (block.projection is not None and block.projection.columns):
+      needed = used
+    elif required is None or used is None or (block.projection is not None and block.projection.doDistinct):
+      needed = None
+    else:
+      passed = [c for c in required if c not in produced]
+      needed = Optimizer._unique(passed + used)
+
+    if isinstance(source, Join):
+      sides = Optimizer._joinColumns(source, needed) if needed is not None else None
+      if sides is None:
+        self._prune(block.left, None)
+        self._prune(block.right, None)
+        return
+
+      (lCols, rCols) = sides
+      if passed:
+        lAlias = source.leftParent().alias
+        rAlias = source.rightParent().alias
+        block.columns = [(lAlias, c) for c in passed if c in lCols] + [(rAlias, c) for c in passed if c in rCols]
+
+      self._prune(block.left, lCols)
+      self._prune(block.right, rCols)
+      return
+
+    if passed:
+      block.columns = [(block.alias, c) for c in passed]
+
+    if isinstance(source, SelectBlock):
+      self._prune(source, needed)
+
+  @staticmethod
+  def _usedColumns(block: SelectBlock):
+    '''
+    Names of all columns that are referenced within the block, or None if all columns are referenced
+    '''
+    exprs = [expr for (expr, _) in block.where] + block.computedCols
+    if block.grouping is not None:
+      exprs += block.grouping.groupCols + block.grouping.aggFunc + block.grouping.having
+    elif block.projection is not None and block.projection.columns:
+      exprs += block.projection.columns
+    exprs += [ref for (ref, bare) in block.orderBy if not bare]
+
+    refs = Optimizer._getRefs(exprs)
+    if refs is None:
+      return None
+    return Optimizer._unique([r.column for r in refs])
+
+  @staticmethod
+  def _joinColumns(join: Join, cols):
+    '''
+    Split the columns needed from a join into the columns of the left and right input.
+    Returns None if a column cannot be assigned to an input.
+    '''
+    if not isinstance(join.on, list) and not isinstance(join.on, BinaryExpression):
+      # USING and NATURAL joins merge columns of both inputs
+      return None
+
+    lSchema = join.leftParent().schema.typeDict
+    rSchema = join.rightParent().schema.typeDict
+    if lSchema is None or rSchema is None:
+      return None
+
+    lCols = []
+    rCols = []
+    for c in cols:
+      if c not in lSchema and c not in rSchema:
+        return None
+      if c in lSchema:
+        lCols.append(c)
+      if c in rSchema:
+        rCols.append(c)
+
+    onRefs = Optimizer._getRefs(join.on)
+    if onRefs is None:
+      return None
+    for ref in onRefs:
+      if ref.df is join.leftParent():
+        lCols.append(ref.column)
+      elif ref.df is join.rightParent():
+        rCols.append(ref.column)
+      else:
+        return None
+
+    return (Optimizer._unique(lCols), Optimizer._unique(rCols))
+
+  @staticmethod
+  def _unique(cols):
+    result = []
+    for c in cols:
+      if c not in result:
+        result.append(c)
+    return result
+
+  @staticmethod
+  def _joinSide(join: Join, cols):
+    '''
+    Determine the input of the join that provides all of the given columns.
+    This requires the schemas of both inputs.
+    '''
+    lSchema = join.leftParent().schema.typeDict
+    rSchema = join.rightParent().schema.typeDict
+    if lSchema is None or rSchema is None or not cols:
+      return None
+
+    if all([c in lSchema and c not in rSchema for c in cols]):
+      return "left"
+    if all([c in rSchema and c not in lSchema for c in cols]):
+      return "right"
+
+    return None
+
+  @staticmethod
+  def _conjuncts(expr):
+    if isinstance(expr, LogicExpr) and expr.operand == LogicOperation.AND:
+      return Optimizer._conjuncts(expr.left) + Optimizer._conjuncts(expr.right)
+    return [expr]
+
+  @staticmethod
+  def _getRefs(expr):
+    '''
+    Collect all column references of the expression.
+    Returns None if the expression references all columns.
+    '''
+    if isinstance(expr, AllColumns):
+      return None
+    elif isinstance(expr, ColRef):
+      return [expr]
+    elif isinstance(expr, BinaryExpression):
+      refs = []
+      for e in [expr.left, expr.right]:
+        r = Optimizer._getRefs(e)
+        if r is None:
+          return None
+        refs += r
+      return refs
+    elif isinstance(expr, FuncCall):
+      return Optimizer._getRefs(expr.inputCols)
+    elif isinstance(expr, ComputedCol):
+      return Optimizer._getRefs(expr.value)
+    elif isinstance(expr, list) or isinstance(expr, tuple):
+      refs = []
+      for e in expr:
+        r = Optimizer._getRefs(e)
+        if r is None:
+          return None
+        refs += r
+      return refs
+    else:
+      # constants and subqueries
+      return []
+
+  def _canMerge(self, block: SelectBlock, df) -> bool:
+    if not block.hasSingleSource():
+      return False
+
+    if isinstance(df, Filter):
+      # WHERE is evaluated before anything else in the block, an ORDER BY does not matter
+      return block.projection is None and block.grouping is None and block.limit is None and not block.computedCols
+
+    elif isinstance(df, Projection):
+      if block.projection is not None or block.grouping is not None or block.computedCols:
+        return False
+
+      if block.ordering is not None or block.limit is not None:
+        # projecting the sorted/limited rows is the same as sorting/limiting projected rows
+        # unless the projection changes the number of rows
+        return not df.doDistinct and not Optimizer._isAggregating(df)
+
+      return True
+
+    elif isinstance(df, Ordering):
+      if df.computedCols or block.limit is not None:
+        return False
+
+      # the sort keys must be available in the block, either as a column of the source
+      # or as a column of the result
+      return all([self._resolve(block, ref.column) is not None for ref in df.by])
+
+    elif isinstance(df, Limit):
+      return not df.computedCols and block.limit is None
+
+    elif isinstance(df, Grouping):
+      return not df.computedCols and block.projection is None and block.grouping is None \
+        and block.ordering is None and block.limit is None and not block.computedCols
+
+    return False
+
+  def _resolve(self, block: SelectBlock, colName: str):
+    '''
+    Checks how the given output column of the block can be referenced inside the block.
+    Returns "qualified" if it is a column of the block's source, "bare" if it is
+    a result column that must be referenced by its name only, or None if it cannot
+    be referenced.
+    '''
+
+    computedAliases = [c.alias for c in block.computedCols]
+    if colName in computedAliases:
+      return "bare"
+
+    if block.grouping is not None:
+      if colName in [f.alias for f in block.grouping.aggFunc if f.alias]:
+        return "bare"
+      for g in block.grouping.groupCols:
+        if isinstance(g, ColRef) and g.df is not None and g.column == colName:
+          return "qualified"
+      return None
+
+    if block.projection is not None and block.projection.columns:
+      passThrough = False
+      for c in block.projection.columns:
+        if isinstance(c, AllColumns):
+          passThrough = True
+        elif isinstance(c, ColRef):
+          if c.alias == colName:
+            return "bare"
+          if not c.alias and c.column == colName:
+            return "qualified"
+        elif isinstance(c, FuncCall) and c.alias == colName:
+          return "bare"
+
+      return "qualified" if passThrough else None
+
+    return "qualified"
+
+  @staticmethod
+  def _isAggregating(df: Projection) -> bool:
+    for c in df.columns:
+      if isinstance(c, FuncCall) and c.udf is None:
+        return True
+    return False
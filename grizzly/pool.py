@@ -0,0 +1,355 @@
+from grizzly.relationaldbexecutor import RelationalExecutor
+from grizzly import columnar
+
+import collections
+import concurrent.futures
+import threading
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+class PoolTimeoutError(Exception):
+  def __init__(self, *args: object) -> None:
+      super().__init__(*args)
+
+class PooledConnection(object):
+  '''
+  A physical connection of the pool together with the executor that uses it.
+  The executor keeps the per-connection state, e.g. the installed UDFs.
+  '''
+  def __init__(self, connection, executor: RelationalExecutor):
+    self.connection = connection
+    self.executor = executor
+
+class ConnectionPool(object):
+  '''
+  A pool of DB-API connections that are created with the given factory.
+
+  At least minSize connections are kept open, at most maxSize connections are created.
+  acquire() waits up to timeout seconds for a free connection and raises PoolTimeoutError
+  otherwise. Before a connection is handed out, it is checked with healthCheck (a function
+  that gets the connection and returns True if it can be used) or, by default, by executing
+  checkQuery (False to disable the check). By default, the check query is the check_query
+  template of the profile in grizzly.yml or SELECT 1. Broken connections are closed and replaced.
+  A resultCache is shared by all connections; see ResultCache for the change markers
+  of SQLite, which only apply to a single connection.
+  '''
+
+  def __init__(self, factory, minSize=1, maxSize=10, timeout=30, healthCheck=None, checkQuery=None, queryGenerator=None, resultCache=None):
+    if minSize < 0 or maxSize < 1 or minSize > maxSize:
+      raise ValueError(f"invalid pool size: min={minSize}, max={maxSize}")
+
+    self.factory = factory
+    self.minSize = minSize
+    self.maxSize = maxSize
+    self.timeout = timeout
+    self.healthCheck = healthCheck
+    self.checkQuery = checkQuery
+    self.queryGenerator = queryGenerator
+    # shared by the executors of all connections
+    self.resultCache = resultCache
+
+    self._idle = collections.deque()
+    # number of open connections (idle and in use)
+    self._size = 0
+    self._closed = False
+    self._cond = threading.Condition()
+    # shared by the executors of all connections
+    self._generateLock = threading.RLock()
+
+    for _ in range(minSize):
+      self._size += 1
+      self._idle.append(self._create())
+
+  def _create(self) -> PooledConnection:
+    connection = self.factory()
+    executor = RelationalExecutor(connection, self.queryGenerator, resultCache=self.resultCache)
+    if self.queryGenerator is None:
+      # the profile was derived from the first connection, use the same generator for all others
+      self.queryGenerator = executor.queryGenerator
+    executor._generateLock = self._generateLock
+    return PooledConnection(connection, executor)
+
+  def _isHealthy(self, pooled: PooledConnection) -> bool:
+    if self.healthCheck is None and self.checkQuery is False:
+      return True
+
+    try:
+      if self.healthCheck is not None:
+        return self.healthCheck(pooled.connection)
+
+      cursor = pooled.connection.cursor()
+      cursor.execute(self._getCheckQuery())
+      cursor.fetchall()
+      cursor.close()
+      return True
+    except Exception as e:
+      logger.warning(f"connection failed health check: {e}")
+      return False
+
+  def _getCheckQuery(self) -> str:
+    if self.checkQuery is not None:
+      return self.checkQuery
+
+    # e.g. Oracle needs a FROM clause
+    templates = self.queryGenerator.templates
+    if "check_query" in templates:
+      return templates["check_query"]
+    return "SELECT 1"
+
+  def _discard(self, pooled: PooledConnection):
+    try:
+      pooled.connection.close()
+    except Exception as e:
+      logger.debug(f"failed to close connection: {e}")
+
+    with self._cond:
+      self._size -= 1
+      self._cond.notify()
+
+  def acquire(self, timeout=None) -> PooledConnection:
+    if timeout is None:
+      timeout = self.timeout
+    deadline = time.monotonic() + timeout
+
+    while True:
+      create = False
+      with self._cond:
+        while True:
+          if self._closed:
+            raise ValueError("connection pool is closed")
+
+          if self._idle:
+            pooled = self._idle.popleft()
+            break
+          if self._size < self.maxSize:
+            self._size += 1
+            create = True
+            break
+
+          remaining = deadline - time.monotonic()
+          if remaining <= 0:
+            raise PoolTimeoutError(f"no free connection within {timeout} seconds (max. {self.maxSize} connections)")
+          self._cond.wait(remaining)
+
+      if create:
+        try:
+          return self._create()
+        except Exception:
+          with self._cond:
+            self._size -= 1
+            self._cond.notify()
+          raise
+
+      if self._isHealthy(pooled):
+        return pooled
+
+      # try the next one or create a replacement
+      self._discard(pooled)
+
+  def release(self, pooled: PooledConnection, failed=False):
+    '''
+    Return the connection to the pool. The open transaction is committed (so that
+    created UDFs remain) or, if the action failed, rolled back.
+    '''
+    try:
+      if failed:
+        pooled.connection.rollback()
+        pooled.executor.resetPreQueries()
+      else:
+        pooled.connection.commit()
+    except Exception as e:
+      logger.warning(f"discarding connection: {e}")
+      self._discard(pooled)
+      return
+
+    with self._cond:
+      if self._closed:
+        self._size -= 1
+        pooled.connection.close()
+      else:
+        self._idle.append(pooled)
+      self._cond.notify()
+
+  def close(self):
+    with self._cond:
+      self._closed = True
+      while self._idle:
+        self._idle.popleft().connection.close()
+        self._size -= 1
+      self._cond.notify_all()
+
+class _Borrowed(object):
+  # context manager to borrow a connection from the pool
+  def __init__(self, pool: ConnectionPool):
+    self.pool = pool
+    self.pooled = None
+
+  def __enter__(self) -> RelationalExecutor:
+    self.pooled = self.pool.acquire()
+    return self.pooled.executor
+
+  def __exit__(self, excType, exc, tb):
+    # closing an iterator early is not a failure
+    failed = excType is not None and not issubclass(excType, GeneratorExit)
+    self.pool.release(self.pooled, failed)
+    return False
+
+class PooledExecutor(object):
+  '''
+  An executor that borrows a connection from a ConnectionPool for every action
+  and returns it afterwards, so that several threads can run queries at the same time.
+
+    grizzly.use(PooledExecutor(lambda: psycopg2.connect(...), minSize=2, maxSize=8))
+  '''
+
+  def __init__(self, connectionFactory, minSize=1, maxSize=10, timeout=30, healthCheck=None, checkQuery=None, queryGenerator=None,
+               approximateCounts=False, batchSize=1000, resultCache=None):
+    self.approximateCounts = approximateCounts
+    self.batchSize = batchSize
+    self.pool = ConnectionPool(connectionFactory, minSize, maxSize, timeout, healthCheck, checkQuery, queryGenerator, resultCache)
+    if self.pool.queryGenerator is None:
+      # create a connection to determine the profile of the generator
+      self.pool.release(self.pool.acquire())
+    super().__init__()
+
+  @property
+  def queryGenerator(self):
+    return self.pool.queryGenerator
+
+  def _borrow(self):
+    return _Borrowed(self.pool)
+
+  @property
+  def _generateLock(self):
+    return self.pool._generateLock
+
+  # generation does not need a connection
+  _generate = RelationalExecutor._generate
+  _prepareAll = RelationalExecutor._prepareAll
+
+  def collectAll(self, dfs, includeHeader=False, parallelism=None):
+    '''
+    Collect the results of all given DataFrames concurrently on up to parallelism
+    connections (default: the maximum size of the pool). All queries are generated
+    first and the pre-queries that they have in common are executed only once per
+    connection. Returns a QueryResult per DataFrame, in the order of the input.
+    '''
+    dfs = list(dfs)
+    (pre, queries) = self._prepareAll(dfs)
+
+    if parallelism is None:
+      parallelism = self.pool.maxSize
+    parallelism = max(1, min(parallelism, self.pool.maxSize, len(dfs)))
+
+    # concurrent DDL for the same objects may fail, e.g. in PostgreSQL
+    preLock = threading.Lock()
+
+    def run(df, sql, params):
+      with self._borrow() as executor:
+        with preLock:
+          executor._executePreQueries(pre)
+        return executor._collectGenerated(df, sql, params, includeHeader)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="grizzly") as threads:
+      futures = [threads.submit(run, df, sql, params) for (df, (sql, params)) in zip(dfs, queries)]
+      return [f.result() for f in futures]
+
+  def generate(self, df):
+    with self.pool._generateLock:
+      return self.queryGenerator.generate(df)
+
+  def generateQuery(self, df):
+    (pre,qry) = self.generate(df)
+    prequeries = ";".join(pre)
+    return f"{prequeries} {qry}"
+
+  def getSchemaForObject(self, objName: str):
+    with self._borrow() as executor:
+      return executor.getSchemaForObject(objName)
+
+  def estimateRowCount(self, tableName: str, approx=None):
+    if approx is None:
+      approx = self.approximateCounts
+    if not approx:
+      return None
+
+    with self._borrow() as executor:
+      return executor.estimateRowCount(tableName, True)
+
+  def fetchone(self, df):
+    with self._borrow() as executor:
+      return executor.fetchone(df)
+
+  def exists(self, df):
+    with self._borrow() as executor:
+      return executor.exists(df)
+
+  def containsMany(self, df, columns, candidates):
+    with self._borrow() as executor:
+      return executor.containsMany(df, columns, candidates)
+
+  def collect(self, df, includeHeader):
+    with self._borrow() as executor:
+      return executor.collect(df, includeHeader)
+
+  def iterator(self, df, includeHeader, batchSize=None):
+    # the connection is returned when the iterator is exhausted, closed or garbage collected
+    if batchSize is None:
+      batchSize = self.batchSize
+
+    with self._borrow() as executor:
+      yield from executor.iterator(df, includeHeader, batchSize)
+
+  def to_numpy(self, df, asDict=False, batchSize=columnar.DEFAULT_BATCH_SIZE):
+    with self._borrow() as executor:
+      return executor.to_numpy(df, asDict, batchSize)
+
+  def to_arrow(self, df, batchSize=columnar.DEFAULT_BATCH_SIZE):
+    with self._borrow() as executor:
+      return executor.to_arrow(df, batchSize)
+
+  def to_df(self, df):
+    with self._borrow() as executor:
+      return executor.to_df(df)
+
+  def table(self, df, limit=10):
+    with self._borrow() as executor:
+      return executor.table(df, limit)
+
+  def toString(self, df, delim=",", pretty=False, maxColWidth=20, limit=20, countRemaining=False):
+    with self._borrow() as executor:
+      return executor.toString(df, delim, pretty, maxColWidth, limit, countRemaining)
+
+  def persist(self, df, indexColumns=None):
+    raise ValueError("temporary tables are bound to a single connection, persist() is not supported with a connection pool")
+
+  def unpersist(self, df):
+    pass
+
+  def createView(self, df, name, materialized=False):
+    with self._borrow() as executor:
+      return executor.createView(df, name, materialized)
+
+  def refreshView(self, view):
+    with self._borrow() as executor:
+      return executor.refreshView(view)
+
+  def invalidateTables(self, tables=None):
+    if self.pool.resultCache is not None:
+      self.pool.resultCache.invalidate(tables)
+
+  def resultCacheInfo(self):
+    return self.pool.resultCache.info() if self.pool.resultCache is not None else None
+
+  def _execAgg(self, df, f):
+    with self._borrow() as executor:
+      return executor._execAgg(df, f)
+
+  def _gen_agg(self, df, func):
+    with self.pool._generateLock:
+      return self.queryGenerator._generateAggCode(df, func)
+
+  def close(self):
+    self.pool.close()
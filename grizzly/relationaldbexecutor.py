@@ -1,21 +1,107 @@
 # from grizzly.generator import GrizzlyGenerator
 from unicodedata import decimal
 from grizzly.sqlgenerator import SQLGenerator
+from grizzly.dataframes.frame import DataFrame, Table, Unpivot, View
+from grizzly.expression import AllColumns, FuncCall
+from grizzly.aggregates import AggregateType
+from grizzly.dataframes.schema import ColType
+from grizzly import columnar
+from grizzly.resultcache import ResultCache
+from grizzly.fingerprint import Fingerprint
 # Imports needed for getting the db vendor
 import sqlite3
 import cx_Oracle
 import psycopg2
 
+import hashlib
+import itertools
 import logging
+import sys
+import threading
+import time
 from typing import List
-from decimal import Decimal
+from collections import namedtuple
 
 logger = logging.getLogger(__name__)
 
+# result of a DataFrame in collectAll: the rows, the query, and the time in seconds to execute it and fetch the rows
+QueryResult = namedtuple("QueryResult", ["rows", "sql", "elapsed"])
+
+class RowsCursor(object):
+  '''
+  A cursor over rows that were already fetched, e.g. from the result cache
+  '''
+  def __init__(self, description, rows):
+    self._rows = rows
+    self._pos = 0
+    self.description = description
+    self.rowcount = len(self._rows)
+    self.arraysize = 1
+
+  def fetchone(self):
+    if self._pos >= len(self._rows):
+      return None
+    row = self._rows[self._pos]
+    self._pos += 1
+    return row
+
+  def fetchmany(self, size=None):
+    if size is None:
+      size = self.arraysize
+    rows = self._rows[self._pos:self._pos + size]
+    self._pos += len(rows)
+    return rows
+
+  def fetchall(self):
+    return self.fetchmany(len(self._rows))
+
+  def __iter__(self):
+    return self
+
+  def __next__(self):
+    row = self.fetchone()
+    if row is None:
+      raise StopIteration
+    return row
+
+  def close(self):
+    self._rows = []
+
+class UnpivotCursor(RowsCursor):
+  '''
+  Wraps the cursor of the single-row result of the parent of an Unpivot
+  and provides the reshaped rows
+  '''
+  def __init__(self, cursor, unpivot: Unpivot):
+    row = cursor.fetchone()
+    cursor.close()
+
+    description = [(name, None, None, None, None, None, None) for name in unpivot.header]
+    super().__init__(description, unpivot.reshape(row))
+
 class RelationalExecutor(object):
+
+  # used to name server-side cursors
+  _cursorIds = itertools.count()
+  # numbers for the names of temporary tables
+  _tempTableIds = itertools.count()
+  # upper bound for the number of parameters of a query, e.g. SQLite allows 32766
+  MAX_PARAMS = 30000
   
-  def __init__(self, connection, queryGenerator=None):
+  def __init__(self, connection, queryGenerator=None, approximateCounts=False, batchSize=1000, resultCache: ResultCache = None):
     self.connection = connection
+    # optional cache for the results of queries
+    self.resultCache = resultCache
+    # use catalog statistics for row counts of tables, if available
+    self.approximateCounts = approximateCounts
+    # number of rows to fetch at once when iterating over a result
+    self.batchSize = batchSize
+    # hashes of the pre-queries (UDFs, external tables) that were already executed on the connection
+    self._installed = set()
+    # name of a temporary table -> the DataFrame whose result it stores, see persist()
+    self._tempTables = {}
+    # the query generator is not thread-safe
+    self._generateLock = threading.RLock()
     # Create SQLGenerator with known connection type
     # Creates dependencies for cx_oracle and postgresql packages, if not wanted,
     # profile for SQLGenerator must be defined manually for udf compiler
@@ -31,30 +117,206 @@ class RelationalExecutor(object):
         self.queryGenerator = SQLGenerator()
     else:
       self.queryGenerator = queryGenerator
+
+    if self.queryGenerator.paramstyle is None:
+      self.queryGenerator.paramstyle = RelationalExecutor._getParamstyle(connection)
     super().__init__()
 
+  @staticmethod
+  def _getDriverModule(connection):
+    # the DB-API module of the connection
+    return sys.modules.get(type(connection).__module__.split(".")[0])
+
+  @staticmethod
+  def _getParamstyle(connection) -> str:
+    # the paramstyle is defined by the DB-API module of the connection
+    return getattr(RelationalExecutor._getDriverModule(connection), "paramstyle", "qmark")
+
+  def _generate(self, df):
+    '''
+    Produce pre-queries, query and the parameters to pass to the query
+    (None if constants are inlined)
+    '''
+    with self._generateLock:
+      if self.queryGenerator.bindParams:
+        return self.queryGenerator.generateParameterized(df)
+
+      (pre, sql) = self.queryGenerator.generate(df)
+      return (pre, sql, None)
+
   def generate(self, df):
-    return self.queryGenerator.generate(df)
+    with self._generateLock:
+      return self.queryGenerator.generate(df)
 
   def generateQuery(self, df):
     (pre,qry) = self.generate(df)
     prequeries = ";".join(pre)
     return f"{prequeries} {qry}"
 
-  def _execute(self, sql):
-    logger.debug(sql)
+  def _cursor(self, streaming=False, batchSize=None):
+    '''
+    Create a cursor. A streaming cursor does not fetch the complete result into
+    the client memory, but only batchSize rows at once.
+    '''
+    if not streaming:
+      return self.connection.cursor()
+
+    if isinstance(self.connection, psycopg2.extensions.connection):
+      # a named cursor is a server-side cursor, outside of a transaction it must be held
+      name = f"grizzly_cursor_{next(RelationalExecutor._cursorIds)}"
+      cursor = self.connection.cursor(name=name, withhold=self.connection.autocommit)
+      cursor.itersize = batchSize
+      return cursor
+
     cursor = self.connection.cursor()
+    cursor.arraysize = batchSize
+    if isinstance(self.connection, cx_Oracle.Connection):
+      cursor.prefetchrows = batchSize
+    return cursor
+
+  def _execute(self, sql, params=None, streaming=False, batchSize=None):
+    logger.debug(sql)
+    cursor = self._cursor(streaming, batchSize)
     try:
-      cursor.execute(sql)
+      if params:
+        cursor.execute(sql, params)
+      else:
+        cursor.execute(sql)
       return cursor  
     except Exception as e:
+      # a failed statement may roll back the transaction and the objects created in it
+      self._installed.clear()
       logger.error(f"Failed to execute query. Reason: {e}")
       logger.error(f"Query: {sql}")
+      if params:
+        logger.error(f"Parameters: {params}")
       logger.exception(e)
       raise e
     
 
+  def _executePreQueries(self, pre):
+    '''
+    Execute the pre-queries (e.g. to create UDFs or external tables) unless the very
+    same statements were already executed on this connection. If the profile allows it,
+    all statements are sent at once.
+    '''
+    (statements, hashes) = RelationalExecutor._pendingPreQueries(pre, self._installed, self.queryGenerator.templates)
+    for stmt in statements:
+      self._execute(stmt).close()
+
+    self._installed.update(hashes)
+
+  @staticmethod
+  def _pendingPreQueries(pre, installed: set, templates):
+    '''
+    The statements to execute for the given pre-queries (none, if all of them
+    are in installed) and the hashes of the pre-queries
+    '''
+    if not pre:
+      return ([], [])
+
+    # statements of a DataFrame may depend on each other, e.g. DROP and CREATE of an external
+    # table, so they are executed together if any of them is new
+    hashes = [hashlib.sha1(pq.encode("utf-8")).hexdigest() for pq in pre]
+    if all([h in installed for h in hashes]):
+      logger.debug(f"skipping {len(pre)} pre-queries, already executed")
+      return ([], hashes)
+
+    if "batch_prequeries" in templates and templates["batch_prequeries"]:
+      return ([";\n".join([pq.strip().rstrip(";") for pq in pre])], hashes)
+    return (list(pre), hashes)
+
+  def resetPreQueries(self):
+    '''
+    Forget about the executed pre-queries, e.g. if the created objects were dropped,
+    so that they are executed again for the next query.
+    '''
+    self._installed.clear()
+
+  def persist(self, df, indexColumns: List[str] = None) -> str:
+    '''
+    Store the result of the DataFrame in a temporary table and let the DataFrame read
+    from it. The transaction is committed, so that the table is not removed by the
+    rollback of a later statement. Returns the name of the table.
+    '''
+    if df._persisted is not None:
+      return df._persisted.table
+
+    tableName = f"grizzly_tmp_{next(RelationalExecutor._tempTableIds)}"
+    with self._generateLock:
+      (pre, statements) = self.queryGenerator.generateTempTable(df, tableName, indexColumns)
+    self._executePreQueries(pre)
+
+    self._execute(statements[0]).close()
+    self._tempTables[tableName] = df
+    try:
+      for stmt in statements[1:]:
+        self._execute(stmt).close()
+      self.connection.commit()
+    except Exception:
+      self._dropTempTable(tableName)
+      raise
+
+    # memoized SQL of derived DataFrames still contains the operations
+    df._invalidate()
+    df._persisted = Table(tableName, df.index, df.schema)
+    return tableName
+
+  def unpersist(self, df):
+    for (tableName, persisted) in list(self._tempTables.items()):
+      # the DataFrame may have been modified in place since
+      if persisted is df:
+        self._dropTempTable(tableName)
+
+    if df._persisted is not None:
+      df._invalidate()
+
+  def _dropTempTable(self, tableName: str):
+    df = self._tempTables.pop(tableName)
+    if df._persisted is not None and df._persisted.table == tableName:
+      df._invalidate()
+
+    for stmt in self.queryGenerator.getDropTempTable(tableName):
+      self._execute(stmt).close()
+
+    if self.resultCache is not None:
+      self.resultCache.invalidate(tableName)
+
+  def createView(self, df, name: str, materialized=False) -> View:
+    '''
+    Create a (materialized) view with the query of the DataFrame and return a View that reads from it
+    '''
+    with self._generateLock:
+      (pre, statements, sql) = self.queryGenerator.generateView(df, name, materialized)
+    self._executePreQueries(pre)
+    for stmt in statements:
+      self._execute(stmt).close()
+    self.connection.commit()
+
+    return View(name, df.index, df.schema, materialized, sql)
+
+  def refreshView(self, view: View):
+    with self._generateLock:
+      statements = self.queryGenerator.getRefreshView(view)
+    if not statements:
+      return
+
+    for stmt in statements:
+      self._execute(stmt).close()
+    self.connection.commit()
+
+    if self.resultCache is not None:
+      self.resultCache.invalidate(view.table)
+
   def close(self):
+    for tableName in list(self._tempTables.keys()):
+      try:
+        self._dropTempTable(tableName)
+      except Exception as e:
+        # dropped with the connection anyway
+        logger.debug(f"failed to drop temporary table {tableName}: {e}")
+
+    self._installed.clear()
     self.connection.close()
 
   def getSchemaForObject(self, objName: str):
@@ -74,49 +336,170 @@ class RelationalExecutor(object):
 
     return dtypes
 
+  def estimateRowCount(self, tableName: str, approx=None):
+    '''
+    Read the estimated number of rows of the given table from the catalog statistics.
+    Returns None if approximate counts are disabled or no (valid) estimate is available,
+    e.g. because the table was never analyzed.
+    '''
+    if approx is None:
+      approx = self.approximateCounts
+    if not approx:
+      return None
+
+    qry = self.queryGenerator.getRowCountQuery(tableName)
+    if qry is None:
+      return None
+
+    logger.debug(qry)
+    cursor = self.connection.cursor()
+    try:
+      cursor.execute(qry)
+      row = cursor.fetchone()
+    except Exception as e:
+      # statistics tables may not exist (e.g. sqlite_stat1 before ANALYZE)
+      logger.debug(f"no row count estimate for {tableName}: {e}")
+      return None
+    finally:
+      cursor.close()
+
+    if row is None or row[0] is None:
+      return None
+
+    # sqlite stores a list of numbers, the first is the number of rows
+    estimate = int(float(str(row[0]).split()[0]))
+    if estimate <= 0:
+      # reltuples is 0 for views and tables that were never analyzed (-1 on PostgreSQL 14+),
+      # an empty table is counted quickly anyway
+      return None
+
+    return estimate
+
 
   def fetchone(self, df):
     rs = self.execute(df)
-    return rs.fetchone()
+    row = rs.fetchone()
+    rs.close()
+    return row
+
+  def exists(self, df) -> bool:
+    with self._generateLock:
+      (pre, sql, params) = self.queryGenerator.generateExists(df)
+    self._executePreQueries(pre)
+    rs = self._execute(sql, params)
+    row = rs.fetchone()
+    rs.close()
+    return bool(row[0])
+
+  def containsMany(self, df, columns: List[str], candidates: List[tuple]) -> List[bool]:
+    """
+    For each candidate tuple, whether it exists in the DataFrame. The candidates are sent
+    with the query, a single query checks up to MAX_PARAMS values at once.
+    """
+    result = [False] * len(candidates)
+    chunkSize = max(1, RelationalExecutor.MAX_PARAMS // (len(columns) + 1))
+
+    for start in range(0, len(candidates), chunkSize):
+      with self._generateLock:
+        (pre, sql, params) = self.queryGenerator.generateContainsMany(df, columns, candidates[start:start + chunkSize])
+      self._executePreQueries(pre)
+      rs = self._execute(sql, params)
+      for row in rs.fetchall():
+        result[start + int(row[0])] = True
+      rs.close()
+
+    return result
 
   def collect(self, df, includeHeader):
     rs = self.execute(df)
+    return self._collectRows(rs, includeHeader)
 
+  def _collectRows(self, rs, includeHeader):
     tuples = []
 
     if includeHeader:
       cols = RelationalExecutor.__getHeader(rs)
       tuples.append(cols)
 
-    def convert(i):
-      t = type(i)
-      if t is int or t is float or t is str or t is bool:
-        return i
-      elif isinstance(i, Decimal):
-        return float(i)
-      else:
-        return str(i)
-
-    for row in rs:
-      # if the driver returns the tuple as some specialiced class (e.g. a Row implementation) 
-      # we hide this by converting it into a Python list
-      rowAsList = [convert(elem) for elem in row]
-      tuples.append(rowAsList)
+    # if the driver returns the tuple as some specialiced class (e.g. a Row implementation) 
+    # we hide this by converting it into a Python list
+    converter = columnar.RowConverter()
+    while True:
+      rows = rs.fetchmany(columnar.DEFAULT_BATCH_SIZE)
+      if not rows:
+        break
+      tuples.extend(converter.convert(rows))
 
+    rs.close()
     return tuples
 
-  def iterator(self, df, includeHeader):
+  def iterator(self, df, includeHeader, batchSize=None):
     '''
     Returns an iterator over the result of the DF
     If includeHeader is true, the first row to be returned are the column names
+
+    The rows are fetched in batches of batchSize rows (default: self.batchSize) with
+    a streaming cursor. The cursor is closed when the iterator is exhausted, closed
+    or garbage collected.
+    '''
+    if batchSize is None:
+      batchSize = self.batchSize
+
+    rs = self.execute(df, streaming=True, batchSize=batchSize)
+    try:
+      # server-side cursors know the result columns only after the first fetch
+      rows = rs.fetchmany(batchSize)
+
+      if includeHeader:
+        yield RelationalExecutor.__getHeader(rs)
+
+      while rows:
+        yield from rows
+        rows = rs.fetchmany(batchSize)
+    finally:
+      rs.close()
+
+  def to_numpy(self, df, asDict=False, batchSize=columnar.DEFAULT_BATCH_SIZE):
+    '''
+    Fetch the result in batches into one typed NumPy array per column.
+    Returns a structured array, or a dict of column name -> array if asDict is True.
     '''
     rs = self.execute(df)
 
-    if includeHeader:
-      yield RelationalExecutor.__getHeader(rs)
+    names = columnar.uniqueNames(RelationalExecutor.__getHeader(rs))
+    colTypes = self._columnTypes(df, rs)
+    arrays = columnar.fetchColumns(rs, colTypes, batchSize)
 
-    for row in rs:
-      yield row
+    if asDict:
+      return dict(zip(names, arrays))
+    return columnar.toStructured(names, arrays)
+
+  def to_arrow(self, df, batchSize=columnar.DEFAULT_BATCH_SIZE):
+    '''
+    Fetch the result in batches into a pyarrow.Table
+    '''
+    rs = self.execute(df)
+    names = RelationalExecutor.__getHeader(rs)
+    return columnar.fetchArrow(rs, names, self._columnTypes(df, rs), batchSize)
+
+  def _columnTypes(self, df, rs) -> List[ColType]:
+    '''
+    Determine the types of the result columns from the schema of the DataFrame
+    or, if unknown, from the type codes of the cursor description
+    '''
+    # DB-API modules provide type objects that compare equal to the type codes
+    module = RelationalExecutor._getDriverModule(self.connection)
+
+    colTypes = []
+    for desc in (rs.description or []):
+      colType = df.schema[desc[0]]
+      if colType == ColType.UNKNOWN and desc[1] is not None:
+        if hasattr(module, "NUMBER") and desc[1] == module.NUMBER:
+          colType = ColType.NUMERIC
+        elif hasattr(module, "STRING") and desc[1] == module.STRING:
+          colType = ColType.TEXT
+      colTypes.append(colType)
+    return colTypes
 
   @staticmethod
   def __getHeader(rs) -> List[str]:
@@ -126,48 +509,69 @@ class RelationalExecutor(object):
       cols = []
     return cols
 
+  def _preview(self, df, limit):
+    """
+    Fetch the header and at most limit + 1 rows, the additional row tells
+    whether there are more rows than shown
+    """
+    if limit is not None and not isinstance(df, Unpivot):
+      # the database stops after the rows to display. The attribute of a Limit hides the method
+      rs = self.execute(DataFrame.limit(df, limit + 1))
+    else:
+      rs = self.execute(df)
+
+    header = RelationalExecutor.__getHeader(rs)
+    rows = rs.fetchall() if limit is None else rs.fetchmany(limit + 1)
+    rs.close()
+    return (header, rows)
+
+  def _remainder(self, df, limit, countRemaining) -> str:
+    """
+    The note about the rows that were not displayed. The number of
+    rows is only determined if countRemaining is True
+    """
+    if not countRemaining:
+      return "and more..."
+
+    count = None
+    if isinstance(df, Table):
+      count = self.estimateRowCount(df.table)
+    if count is not None:
+      return f"and about {count - limit} more..." if count > limit else "and more..."
+
+    f = FuncCall(AggregateType.COUNT, [AllColumns(df)], None, "rowcount")
+    return f"and {self._execAgg(df, f) - limit} more..."
+
   def table(self,df,limit=10):
-    rs = self.execute(df)
     import beautifultable
     table = beautifultable.BeautifulTable()
 
-    header = RelationalExecutor.__getHeader(rs)
+    # like before, one row more than the limit is shown
+    (header, rows) = self._preview(df, limit)
     table.columns.header = header
 
-    cnt = 0
-    for row in rs:
-
-      if cnt > limit:
-        break
-
-      cnt += 1
+    for row in rows:
       table.rows.append(row)
 
-    rs.close()
     return str(table)
 
-  def toString(self, df, delim=",", pretty=False, maxColWidth=20, limit=20):
-    rs = self.execute(df)
-
-    cols = RelationalExecutor.__getHeader(rs)
+  def toString(self, df, delim=",", pretty=False, maxColWidth=20, limit=20, countRemaining=False):
+    (cols, rows) = self._preview(df, limit)
+    hasMore = limit is not None and len(rows) > limit
+    if hasMore:
+      rows = rows[:limit]
 
     if not pretty:
       strings = [delim.join(cols)]
-      cnt = 0
-      for row in rs:
-        cnt += 1
-        if limit is None or cnt <= limit:
-          strings.append(delim.join([str(col) for col in row]))
-        
-
-      rs.close()
+      for row in rows:
+        strings.append(delim.join([str(col) for col in row]))
 
-      if  limit is not None and cnt > limit and cnt - limit > 0:
-        strings.append(f"and {cnt - limit} more...")
+      if hasMore:
+        strings.append(self._remainder(df, limit, countRemaining))
 
       return "\n".join(strings)
     else:
-      firstRow = rs.fetchone()
+      firstRow = rows[0] if rows else [""] * len(cols)
 
       colWidths = [ min(maxColWidth, max(len(x),len(str(y)))) for x,y in zip(cols, firstRow)]
 
@@ -185,27 +589,29 @@ class RelationalExecutor(object):
 
         return rowFormat.format(*values)
 
-      resultRep = [formatRow(cols), formatRow(firstRow)]
-      cnt = 1 # we already fetched and processed the first row
-      for row in rs:
-        cnt += 1
-        if  limit is None or cnt <= limit:
-          resultRep.append(formatRow(row))
+      resultRep = [formatRow(cols)] + [formatRow(row) for row in rows]
 
-      rs.close()
-
-      if limit is not None and cnt > limit and cnt - limit > 0:
-        resultRep.append(f"and {cnt - limit} more...")
+      if hasMore:
+        resultRep.append(self._remainder(df, limit, countRemaining))
 
       return "\n".join(resultRep)
 
   def to_df(self, df):
-    (pre, qry) = self.queryGenerator.generate(df)
-    import pandas
-    p_df = pandas.read_sql(qry, self.connection)
-    return p_df
+    try:
+      import pyarrow
+    except ImportError:
+      # without Arrow, the DataFrame is built from the rows
+      import pandas
+      rs = self.execute(df)
+      header = df.header if isinstance(df, Unpivot) else RelationalExecutor.__getHeader(rs)
+      rows = rs.fetchall()
+      rs.close()
+      return pandas.DataFrame.from_records(rows, columns=header)
+
+    # the result is converted column-wise from Arrow instead of row by row
+    return self.to_arrow(df).to_pandas()
 
-  def execute(self, df):
+  def execute(self, df, streaming=False, batchSize=None):
     """
     Execute the operations and print results to stdout
     If pre-queries are necessary, e.g. for UDF or External table creation,
@@ -215,25 +621,127 @@ class RelationalExecutor(object):
     set the delimiter. Non-pretty mode ignores the maxColWidth parameter.
     """
 
-    (pre,sql) = self.queryGenerator.generate(df)
-    for pq in pre:
-      # print(pq)
-      self._execute(pq).close()
+    (pre,sql,params) = self._generate(df)
+    self._executePreQueries(pre)
     # print(sql)
-    return self._execute(sql)
+    return self._executeGenerated(df, sql, params, streaming, batchSize)
+
+  def _executeGenerated(self, df, sql, params, streaming=False, batchSize=None):
+    if self.resultCache is None:
+      rs = self._execute(sql, params, streaming, batchSize)
+    else:
+      rs = self._executeCached(df, sql, params, streaming, batchSize)
+
+    if isinstance(df, Unpivot):
+      rs = UnpivotCursor(rs, df)
+    return rs
+
+  def _executeCached(self, df, sql, params, streaming, batchSize):
+    cache = self.resultCache
+    # the generated SQL contains new aliases every time the DataFrame is built
+    key = ResultCache.key(Fingerprint.of(df), params)
+    tables = ResultCache.tablesOf(df)
+    marker = self._changeMarker(tables) if cache.useChangeMarkers else None
+
+    cached = cache.get(key, marker)
+    if cached is not None:
+      logger.debug(f"result cache hit: {sql}")
+      (description, rows) = cached
+      return RowsCursor(description, rows)
+
+    rs = self._execute(sql, params, streaming, batchSize)
+    if streaming:
+      # the result is not materialized
+      return rs
+
+    try:
+      description = [tuple(d) for d in (rs.description or [])]
+      rows = rs.fetchall()
+    finally:
+      rs.close()
+
+    cache.put(key, description, rows, tables, marker)
+    return RowsCursor(description, rows)
+
+  def _changeMarker(self, tables):
+    '''
+    The current value of the change marker of the profile for the given tables,
+    None if the profile has none or it cannot be determined
+    '''
+    query = self.queryGenerator.getChangeMarkerQuery(tables)
+    if query is None:
+      return None
+
+    try:
+      cursor = self.connection.cursor()
+      try:
+        cursor.execute(query)
+        row = cursor.fetchone()
+      finally:
+        cursor.close()
+    except Exception as e:
+      logger.debug(f"cannot determine change marker: {e}")
+      return None
+
+    if row is None:
+      return None
+
+    if "change_marker_per_connection" in self.queryGenerator.templates and self.queryGenerator.templates["change_marker_per_connection"]:
+      # e.g. SQLite: the values are only comparable on the same connection
+      return (id(self.connection),) + tuple(row)
+    return tuple(row)
+
+  def invalidateTables(self, tables=None):
+    '''
+    Remove the cached results of all queries that read the given table(s), e.g.
+    after the tables were modified by another application. All results if tables is None.
+    '''
+    if self.resultCache is not None:
+      self.resultCache.invalidate(tables)
+
+  def resultCacheInfo(self):
+    return self.resultCache.info() if self.resultCache is not None else None
+
+  def _prepareAll(self, dfs):
+    '''
+    Generate the queries of all DataFrames and the pre-queries needed by all of them
+    '''
+    generated = [self._generate(df) for df in dfs]
+    pre = SQLGenerator._makeUnique([pq for (dfPre, _, _) in generated for pq in dfPre])
+    return (pre, [(sql, params) for (_, sql, params) in generated])
+
+  def _collectGenerated(self, df, sql, params, includeHeader) -> QueryResult:
+    start = time.perf_counter()
+    rows = self._collectRows(self._executeGenerated(df, sql, params), includeHeader)
+    return QueryResult(rows, sql, time.perf_counter() - start)
+
+  def collectAll(self, dfs, includeHeader=False, parallelism=None):
+    '''
+    Collect the results of all given DataFrames. All queries are generated first and
+    the pre-queries that they have in common are executed only once. With a single
+    connection, the queries are executed one after the other.
+    Returns a QueryResult per DataFrame, in the order of the input.
+    '''
+    dfs = list(dfs)
+    (pre, queries) = self._prepareAll(dfs)
+    self._executePreQueries(pre)
+    return [self._collectGenerated(df, sql, params, includeHeader) for (df, (sql, params)) in zip(dfs, queries)]
 
   def _execAgg(self, df, f):
     """
     Really executes the aggregation and returns the single result
     """
-    (pre, aggQry) = self.queryGenerator._generateAggCode(df, f)
-    for pq in pre:
-      self._execute(pq).close()
+    with self._generateLock:
+      (pre, aggQry) = self.queryGenerator._generateAggCode(df, f)
+    self._executePreQueries(pre)
     # execute an SQL query and get the result set
     rs = self._execute(aggQry)
     #fetch first (and only) row, return first column only
-    return rs.fetchone()[0]  
+    row = rs.fetchone()
+    rs.close()
+    return row[0]
 
   def _gen_agg(self, df, func):
-    return self.queryGenerator._generateAggCode(df, func)
+    with self._generateLock:
+      return self.queryGenerator._generateAggCode(df, func)
 
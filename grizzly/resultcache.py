@@ -0,0 +1,244 @@
+from grizzly.dataframes.frame import DataFrame, Table, ExternalTable
+from grizzly.expression import Expr, ComputedCol
+
+from collections import OrderedDict, namedtuple
+import hashlib
+import os
+import sys
+import threading
+import time
+
+import logging
+logger = logging.getLogger(__name__)
+
+ResultCacheInfo = namedtuple("ResultCacheInfo", ["hits", "misses", "hitRate", "evictions", "invalidations", "size", "bytes", "maxBytes", "spilled", "spilledBytes"])
+
+class CachedResult(object):
+  def __init__(self, description, rows, tables, marker, size):
+    self.description = description
+    self.rows = rows
+    self.tables = tables
+    self.marker = marker
+    self.size = size
+    self.created = time.monotonic()
+    # file of the spilled rows
+    self.path = None
+
+class ResultCache(object):
+  '''
+  Caches the results of queries, keyed by the fingerprint of the DataFrame (see
+  grizzly.fingerprint) and the parameters of the query.
+
+  The cache holds at most maxBytes (estimated) in memory and, optionally, at most
+  maxEntries results. The least recently used results are evicted first. If spillDir
+  is given, evicted results are written as Arrow IPC files into this directory (up to
+  maxSpillBytes) instead of being dropped. Results older than ttl seconds are not used.
+
+  Results are invalidated explicitly with invalidate(tables) or, with useChangeMarkers,
+  when the change marker of the profile (e.g. SQLite's data_version, PostgreSQL's
+  statistics counters) for the tables of a query has changed since the result was stored.
+
+  SQLite's change marker only describes the state seen by one connection. If the cache
+  is shared by the connections of a pool, a result stored by one connection is therefore
+  not used (but replaced) by the others. Disable useChangeMarkers and invalidate the
+  tables explicitly to share results between the connections.
+  '''
+
+  def __init__(self, maxBytes=64 * 1024 * 1024, maxEntries=None, ttl=None, spillDir=None, maxSpillBytes=1024 * 1024 * 1024, useChangeMarkers=True):
+    self.maxBytes = maxBytes
+    self.maxEntries = maxEntries
+    self.ttl = ttl
+    self.spillDir = spillDir
+    self.maxSpillBytes = maxSpillBytes
+    self.useChangeMarkers = useChangeMarkers
+
+    self._memory = OrderedDict()
+    self._disk = OrderedDict()
+    self._bytes = 0
+    self._spilledBytes = 0
+    self._lock = threading.RLock()
+
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.invalidations = 0
+
+    if spillDir is not None:
+      os.makedirs(spillDir, exist_ok=True)
+
+  @staticmethod
+  def key(query: str, params) -> str:
+    return hashlib.sha1(f"{query}\x00{repr(params)}".encode("utf-8")).hexdigest()
+
+  @staticmethod
+  def tablesOf(df: DataFrame) -> frozenset:
+    '''
+    The names of the tables that are read by the DataFrame, including the ones
+    in subqueries of expressions
+    '''
+    tables = set()
+    visited = set()
+    todo = [df]
+    while todo:
+      obj = todo.pop()
+      if id(obj) in visited:
+        continue
+      visited.add(id(obj))
+
+      if isinstance(obj, (Table, ExternalTable)):
+        tables.add(obj.table)
+
+      if isinstance(obj, (list, tuple)):
+        todo.extend(obj)
+      elif isinstance(obj, (DataFrame, Expr, ComputedCol)):
+        todo.extend([v for (k, v) in vars(obj).items() if k != "_sqlMemo"])
+
+    return frozenset(tables)
+
+  @staticmethod
+  def _estimateBytes(rows) -> int:
+    if not rows:
+      return sys.getsizeof(rows)
+
+    sample = rows[:100]
+    perRow = sum([sys.getsizeof(r) + sum([sys.getsizeof(v) for v in r]) for r in sample]) / len(sample)
+    return int(sys.getsizeof(rows) + perRow * len(rows))
+
+  def get(self, key: str, marker=None):
+    '''
+    Returns the description and the rows of the cached result, or None
+    '''
+    with self._lock:
+      entry = self._memory.get(key)
+      if entry is None:
+        entry = self._disk.get(key)
+
+      if entry is None:
+        self.misses += 1
+        return None
+
+      expired = self.ttl is not None and time.monotonic() - entry.created > self.ttl
+      if expired or (marker is not None and entry.marker != marker):
+        self._remove(key)
+        self.invalidations += 1
+        self.misses += 1
+        return None
+
+      if entry.path is not None:
+        rows = self._load(entry)
+        if rows is None:
+          self._remove(key)
+          self.misses += 1
+          return None
+        self._removeFile(key)
+        entry.rows = rows
+        self._memory[key] = entry
+        self._bytes += entry.size
+      else:
+        self._memory.move_to_end(key)
+        rows = entry.rows
+
+      self.hits += 1
+      self._evict()
+      return (entry.description, rows)
+
+  def put(self, key: str, description, rows, tables=frozenset(), marker=None):
+    entry = CachedResult(description, rows, tables, marker, ResultCache._estimateBytes(rows))
+    with self._lock:
+      self._remove(key)
+      if entry.size > self.maxBytes:
+        # would evict everything else
+        if self.spillDir is not None:
+          self._spill(key, entry)
+          self._evict()
+        return
+
+      self._memory[key] = entry
+      self._bytes += entry.size
+      self._evict()
+
+  def _evict(self):
+    while self._memory and (self._bytes > self.maxBytes or (self.maxEntries is not None and len(self._memory) > self.maxEntries)):
+      (key, entry) = self._memory.popitem(last=False)
+      self._bytes -= entry.size
+      self.evictions += 1
+      if self.spillDir is not None:
+        self._spill(key, entry)
+
+    while self._disk and self._spilledBytes > self.maxSpillBytes:
+      self._removeFile(next(iter(self._disk)))
+
+  def _spill(self, key, entry: CachedResult):
+    try:
+      import pyarrow
+      import pyarrow.ipc
+
+      numCols = len(entry.description or [])
+      columns = list(zip(*entry.rows)) if entry.rows else [[] for _ in range(numCols)]
+      # only the values are stored, the column names may not be unique
+      table = pyarrow.Table.from_arrays([pyarrow.array(c) for c in columns], names=[f"c{i}" for i in range(numCols)])
+
+      path = os.path.join(self.spillDir, f"{key}.arrow")
+      with pyarrow.OSFile(path, "wb") as sink:
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+          writer.write_table(table)
+    except Exception as e:
+      # e.g. columns with values of different types
+      logger.debug(f"cannot spill result to disk: {e}")
+      return
+
+    entry.path = path
+    entry.rows = None
+    self._disk[key] = entry
+    self._spilledBytes += os.path.getsize(path)
+
+  def _load(self, entry: CachedResult):
+    try:
+      import pyarrow
+      import pyarrow.ipc
+      with pyarrow.memory_map(entry.path, "r") as source:
+        table = pyarrow.ipc.open_file(source).read_all()
+      return list(zip(*[c.to_pylist() for c in table.columns]))
+    except Exception as e:
+      logger.warning(f"cannot read spilled result {entry.path}: {e}")
+      return None
+
+  def _removeFile(self, key):
+    entry = self._disk.pop(key)
+    size = os.path.getsize(entry.path) if os.path.exists(entry.path) else 0
+    self._spilledBytes -= size
+    if os.path.exists(entry.path):
+      os.remove(entry.path)
+    entry.path = None
+
+  def _remove(self, key):
+    if key in self._memory:
+      self._bytes -= self._memory.pop(key).size
+    if key in self._disk:
+      self._removeFile(key)
+
+  def invalidate(self, tables=None):
+    '''
+    Remove the results of all queries that read one of the given tables
+    (a name or a list of names), or all results if tables is None
+    '''
+    if isinstance(tables, str):
+      tables = [tables]
+
+    with self._lock:
+      keys = list(self._memory.keys()) + list(self._disk.keys())
+      for key in keys:
+        entry = self._memory.get(key) or self._disk.get(key)
+        if tables is None or not entry.tables.isdisjoint(tables):
+          self._remove(key)
+          self.invalidations += 1
+
+  def clear(self):
+    self.invalidate(None)
+
+  def info(self) -> ResultCacheInfo:
+    with self._lock:
+      lookups = self.hits + self.misses
+      hitRate = self.hits / lookups if lookups > 0 else 0.0
+      return ResultCacheInfo(self.hits, self.misses, hitRate, self.evictions, self.invalidations,
+        len(self._memory) + len(self._disk), self._bytes, self.maxBytes, len(self._disk), self._spilledBytes)
@@ -1,14 +1,19 @@
 from grizzly.dataframes.schema import ColType
 from grizzly.config import Config
 from grizzly.aggregates import AggregateType
-from grizzly.dataframes.frame import Limit, Ordering, UDF, ModelUDF, Table, ExternalTable, Projection, Filter, Join, Grouping, DataFrame, Union
-from grizzly.expression import AllColumns, ArithmExpr, ArithmeticOperation, BoolExpr, BooleanOperation, ComputedCol, Constant, ExpressionException, FuncCall, ColRef, LogicExpr, LogicOperation, SetExpr, SetOperation
+from grizzly.dataframes.frame import Limit, Unpivot, Ordering, UDF, ModelUDF, Table, View, ExternalTable, Projection, Filter, Join, Grouping, DataFrame, Union
+from grizzly.expression import AllColumns, ArithmExpr, ArithmeticOperation, BinaryExpression, BoolExpr, BooleanOperation, ComputedCol, Constant, ExpressionException, FuncCall, ColRef, LogicExpr, LogicOperation, SetExpr, SetOperation
 from grizzly.generator import GrizzlyGenerator
+from grizzly.optimizer import CTERef, Optimizer, SelectBlock
+from grizzly.fingerprint import Fingerprint
 
 import grizzly.udfcompiler as udfcompiler
 from grizzly.udfcompiler.udfcompiler_exceptions import UDFCompilerException
 
 from typing import List, Set, Tuple
+from collections import OrderedDict, namedtuple
+from decimal import Decimal
+import datetime
 import re
 import logging
 logger = logging.getLogger(__name__)
@@ -16,13 +21,54 @@ logger = logging.getLogger(__name__)
 from typing import NewType
 SqlBigInt = NewType("bigint", int)
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "size", "maxSize"])
+
+# marks the position of a bind parameter in the generated code
+_paramMarker = re.compile("\x00([0-9]+)\x00")
+
 
 class SQLGenerator:
 
 
-  def __init__(self, profile: str = None):
+  def __init__(self, profile: str = None, optimize: bool = False, cacheSize: int = 0, bindParams: bool = False, paramstyle: str = None, memoize: bool = True, cte: bool = False, materializeCTEs: bool = False):
     self.profile = profile
     self.templates = Config.loadProfile(profile)
+
+    # if set, the DataFrame tree is rewritten by the optimizer before SQL is generated
+    # otherwise every operation results in its own nested query
+    self.optimize = optimize
+    self.optimizer = Optimizer()
+
+    # maps the aliases of DataFrames merged into one SELECT block to the block's alias
+    self._aliasMap = {}
+
+    # LRU cache of generated queries: (fingerprint, generator settings) -> (prequeries, sql)
+    # the cache is disabled if the size is 0
+    self.cacheSize = cacheSize
+    self._cache = OrderedDict()
+    self.cacheHits = 0
+    self.cacheMisses = 0
+
+    # if set, the executor uses generateParameterized() so that constants are passed
+    # as parameters with the placeholder style of the DB-API module (PEP 249 paramstyle)
+    self.bindParams = bindParams
+    self.paramstyle = paramstyle
+    # values of the constants of the query that is currently generated, None if constants are inlined
+    self._bindValues = None
+
+    # memoize the SQL of each DataFrame on the frame itself (see _buildFrom)
+    # fragments of other generators are recognized by the token
+    self.memoize = memoize
+    self.memoHits = 0
+    self._memoToken = object()
+    self._memoDeps = []
+
+    # if set, subplans that are used more than once in a query are generated only once as
+    # a common table expression (WITH). Materialized CTEs are used if the profile supports them
+    self.cte = cte
+    self.materializeCTEs = materializeCTEs
+    # DataFrame id -> name of the CTE that replaces it in the query that is currently generated
+    self._ctes = {}
     super().__init__()
 
   @staticmethod
@@ -85,7 +131,12 @@ class SQLGenerator:
     # we were given a constant
     elif isinstance(expr, Constant):
       alias = f"as {expr.alias}" if expr.alias is not None else ""
-      if isinstance(expr.value, str):
+      if self._bindValues is not None and SQLGenerator._isBindable(expr.value):
+        # a marker that is replaced by the actual placeholder once the query is complete,
+        # see _bindPlaceholders
+        exprSQL = f"\x00{len(self._bindValues)}\x00 {alias}"
+        self._bindValues.append(expr.value)
+      elif isinstance(expr.value, str):
         exprSQL = f"'{expr.value}' {alias}"
       elif isinstance(expr.value, list):
         
@@ -201,7 +252,7 @@ class SQLGenerator:
     # if the thing to produce is a DataFrame, we probably have a subquery
     elif isinstance(expr, DataFrame): 
       # if right hand side is a DataFrame, we need to create code first 
-      (pre,exprSQL) = self._buildFrom(expr)
+      (pre,exprSQL) = self._build(expr)
       
     elif isinstance(expr, AllColumns): # must be checked befor ColRef!
       exprSQL = "*"
@@ -210,7 +261,8 @@ class SQLGenerator:
     elif isinstance(expr, ColRef):
 
       if expr.df is not None:
-        exprSQL = f"{expr.df.alias}.{expr.column}"
+        alias = self._aliasMap.get(expr.df.alias, expr.df.alias)
+        exprSQL = f"{alias}.{expr.column}"
       else:
         exprSQL = expr.column
 
@@ -250,7 +302,63 @@ class SQLGenerator:
 
     return (pre,exprSQL)
 
-  def _buildFrom(self,df): #-> Tuple[List[str], str, str]:
+  def _buildFrom(self, df) -> Tuple[List[str], str]:
+    '''
+    Produce the SQL for the given DataFrame. The result is memoized on the DataFrame so that
+    frames derived from it do not need to generate its code again.
+    '''
+    if df is not None and id(df) in self._ctes:
+      return ([], f"SELECT * FROM {self._ctes[id(df)]}")
+
+    if df is not None and df._persisted is not None:
+      # the result is stored in a temporary table, incl. the computed columns
+      if self._memoDeps:
+        # derived frames must not keep the reference to the table after unpersist()
+        self._memoDeps[-1][id(df)] = (df, df._version, df.alias)
+      return ([], f"SELECT * FROM {df._persisted.table} {df._persisted.alias}")
+
+    if isinstance(df, Unpivot):
+      raise ValueError("Unpivot must be the last operation")
+
+    if df is None or not self.memoize or self._bindValues is not None or self._ctes:
+      # markers of bind parameters and CTE references are only valid for the current query
+      return self._generateFragment(df)
+
+    memo = df._sqlMemo
+    if memo is not None and memo[0] is self._memoToken and SQLGenerator._memoValid(memo[1]):
+      self.memoHits += 1
+      (_, deps, pre, sql) = memo
+    else:
+      self._memoDeps.append({})
+      try:
+        (pre, sql) = self._generateFragment(df)
+      finally:
+        deps = self._memoDeps.pop()
+
+      # the fragment is valid as long as this frame and all frames it was generated from are unchanged
+      deps[id(df)] = (df, df._version, df.alias)
+      df._sqlMemo = (self._memoToken, deps, list(pre), sql)
+
+    if self._memoDeps:
+      # the frame that is currently generated depends on this one
+      self._memoDeps[-1].update(deps)
+
+    return (list(pre), sql)
+
+  @staticmethod
+  def _memoValid(deps) -> bool:
+    for (df, version, alias) in deps.values():
+      if df._version != version or df.alias != alias:
+        return False
+    return True
+
+  def clearMemo(self):
+    '''
+    Discard all memoized fragments, e.g. after the templates were changed
+    '''
+    self._memoToken = object()
+
+  def _generateFragment(self, df) -> Tuple[List[str], str]:
 
     if df is not None:
 
@@ -326,27 +434,8 @@ class SQLGenerator:
         lAlias = df.leftParent().alias
         rAlias = df.rightParent().alias
 
-        if isinstance(df.on, ColRef):
-          (exprPre, onSQL) = self._exprToSQL(df.on)
-          onSQL = f"USING ({onSQL})"
-          preCode += exprPre
-        elif isinstance(df.on, LogicExpr) or isinstance(df.on, BoolExpr):
-          (exprPre, onSQL) = self._exprToSQL(df.on)
-          onSQL = "ON " + onSQL
-          preCode += exprPre
-        elif isinstance(df.on, list):
-
-          if len(df.on) != 2:
-            raise ExpressionException("on condition must consist of exacltly two columns")
-
-          (lOnPre,lOn) = self._exprToSQL(df.on[0])
-          (rOnPre,rOn) = self._exprToSQL(df.on[1])
-
-          onSQL = f"ON {lOn} {df.comp} {rOn}"
-          preCode += lOnPre
-          preCode += rOnPre
-        else:
-          onSQL = "" # let the DB figure it out itself
+        (onPre, onSQL) = self._joinCondition(df)
+        preCode += onPre
 
         proj = "*"
         if computedCols:
@@ -411,9 +500,9 @@ class SQLGenerator:
 
         limitClause = self.templates["limit"].lower()
 
-        (lPre,limitExpr) = self._exprToSQL(df.limit)
+        (lPre,limitExpr) = self._limitClause(df)
         pre += lPre
-        
+
 
         limitSQL = None
         if limitClause == "top":
@@ -424,7 +513,7 @@ class SQLGenerator:
           raise ValueError(f"Unknown keyword for LIMIT: {limitClause}")
 
         if df.offset is not None:
-          (oPre, offsetExpr) = self._exprToSQL(df.offset)
+          (oPre, offsetExpr) = self._inlineToSQL(df.offset)
           pre += oPre
           limitSQL += f" OFFSET {offsetExpr}"
 
@@ -440,20 +529,13 @@ class SQLGenerator:
           pre += exprPre
           by.append(exprSQL)
 
-        direction = ""
-        # If ascending is not specified, default is ascending on all columns. If specifiec, it can 
-        # be a bool for the order on all columns or a list, specifying a columnwise order.
-        if df.ascending is not None:
-          if isinstance(df.ascending, list):
-            by = [i + " " + ("ASC" if j else "DESC") for i, j in zip(by, df.ascending)]
-          else:
-            direction = "ASC" if df.ascending else "DESC"
-        else:
-          direction = "ASC"
+        by = SQLGenerator._orderByClause(df, by)
 
-        by = ",".join(by)
+        proj = "*"
+        if computedCols:
+          proj += ","+computedCols
 
-        qry = f"SELECT * FROM ({parentSQL}) {df.alias} ORDER BY {by} {direction}"
+        qry = f"SELECT {proj} FROM ({parentSQL}) {df.alias} ORDER BY {by}"
 
         return (preCode+pre, qry)
 
@@ -463,6 +545,359 @@ class SQLGenerator:
     else:
       return ("","")
 
+  def _build(self, df) -> Tuple[List[str], str]:
+    if self.optimize and df is not None:
+      plan = self.optimizer.optimize(df, self._ctes)
+      return self._buildBlock(plan)
+
+    return self._buildFrom(df)
+
+  def _buildWithCTEs(self, df) -> Tuple[List[str], str]:
+    '''
+    Produce the query where all subplans that are used several times are defined
+    once in the WITH clause and referenced by name
+    '''
+    groups = SQLGenerator._findCommonSubplans(df)
+    if not groups:
+      return self._build(df)
+
+    names = {}
+    for nodes in groups:
+      name = f"cte_{nodes[0].alias}"
+      for n in nodes:
+        names[id(n)] = name
+
+    template = "$$name$$ AS ($$qry$$)"
+    if "cte" in self.templates:
+      template = self.templates["cte"]
+    if self.materializeCTEs and "cte_materialized" in self.templates:
+      template = self.templates["cte_materialized"]
+
+    pre = []
+    definitions = []
+    try:
+      for nodes in groups:
+        # the definition itself must not be replaced by the reference
+        self._ctes = {k: v for (k, v) in names.items() if v != names[id(nodes[0])]}
+        (cPre, cSQL) = self._build(nodes[0])
+        pre += cPre
+        definitions.append(template.replace("$$name$$", names[id(nodes[0])]).replace("$$qry$$", cSQL))
+
+      self._ctes = names
+      (qPre, qry) = self._build(df)
+    finally:
+      self._ctes = {}
+
+    return (pre + qPre, f"WITH {', '.join(definitions)} {qry}")
+
+  @staticmethod
+  def _findCommonSubplans(df) -> List[List[DataFrame]]:
+    '''
+    Find all subplans that are used more than once. Subplans are the same if they are
+    the same object or have the same fingerprint.
+    Returns the groups of equal DataFrames, inner subplans before the outer ones.
+    '''
+    fingerprints = {}
+    refCount = {}
+    groups = {}
+    order = []
+
+    def visit(node):
+      if id(node) not in fingerprints:
+        fingerprints[id(node)] = Fingerprint.of(node)
+      fp = fingerprints[id(node)]
+
+      refCount[fp] = refCount.get(fp, 0) + 1
+      if fp in groups:
+        if all([n is not node for n in groups[fp]]):
+          groups[fp].append(node)
+        # all subplans of an equal DataFrame were already visited
+        return
+
+      groups[fp] = [node]
+      for child in SQLGenerator._inputs(node):
+        visit(child)
+      order.append(fp)
+
+    visit(df)
+
+    result = []
+    for fp in order:
+      node = groups[fp][0]
+      isTable = ((isinstance(node, Table) or isinstance(node, ExternalTable)) and not node.computedCols) or node._persisted is not None
+      if refCount[fp] > 1 and not isTable and node is not df:
+        result.append(groups[fp])
+    return result
+
+  @staticmethod
+  def _inputs(df) -> List[DataFrame]:
+    '''
+    All DataFrames the given one is computed from, including subqueries in expressions
+    '''
+    if df._persisted is not None:
+      # read from a temporary table
+      return []
+
+    inputs = list(df.parents) if df.parents else []
+    if isinstance(df, Join) or isinstance(df, Union):
+      inputs.append(df.rightParent())
+
+    exprs = list(df.computedCols)
+    if isinstance(df, Filter):
+      exprs.append(df.expr)
+    elif isinstance(df, Projection) and df.columns:
+      exprs += df.columns
+    elif isinstance(df, Grouping):
+      exprs += df.having
+
+    def visit(e):
+      if isinstance(e, DataFrame):
+        inputs.append(e)
+      elif isinstance(e, BinaryExpression):
+        visit(e.left)
+        visit(e.right)
+      elif isinstance(e, ComputedCol):
+        visit(e.value)
+      elif isinstance(e, FuncCall):
+        visit(e.inputCols)
+      elif isinstance(e, list) or isinstance(e, tuple):
+        for x in e:
+          visit(x)
+
+    visit(exprs)
+    return inputs
+
+  def _joinCondition(self, df: Join) -> Tuple[List[str], str]:
+    pre = []
+    if isinstance(df.on, ColRef):
+      (pre, onSQL) = self._exprToSQL(df.on)
+      onSQL = f"USING ({onSQL})"
+    elif isinstance(df.on, LogicExpr) or isinstance(df.on, BoolExpr):
+      (pre, onSQL) = self._exprToSQL(df.on)
+      onSQL = "ON " + onSQL
+    elif isinstance(df.on, list):
+
+      if len(df.on) != 2:
+        raise ExpressionException("on condition must consist of exacltly two columns")
+
+      (lOnPre,lOn) = self._exprToSQL(df.on[0])
+      (rOnPre,rOn) = self._exprToSQL(df.on[1])
+
+      onSQL = f"ON {lOn} {df.comp} {rOn}"
+      pre = lOnPre + rOnPre
+    else:
+      onSQL = "" # let the DB figure it out itself
+
+    return (pre, onSQL)
+
+  @staticmethod
+  def _orderByClause(df: Ordering, by: List[str]) -> str:
+    direction = ""
+    # If ascending is not specified, default is ascending on all columns. If specifiec, it can 
+    # be a bool for the order on all columns or a list, specifying a columnwise order.
+    if df.ascending is not None:
+      if isinstance(df.ascending, list):
+        by = [i + " " + ("ASC" if j else "DESC") for i, j in zip(by, df.ascending)]
+      else:
+        direction = "ASC" if df.ascending else "DESC"
+    else:
+      direction = "ASC"
+
+    return f"{','.join(by)} {direction}"
+
+  def _buildBlock(self, block: SelectBlock) -> Tuple[List[str], str]:
+    '''
+    Produce the SQL for a block of the optimized plan. Within the block all
+    aliases of merged DataFrames are replaced by the block's alias.
+    '''
+    outerMap = self._aliasMap
+    try:
+      if isinstance(block.source, Union):
+        (lpre, lSQL) = self._buildBlock(block.left)
+        (rpre, rSQL) = self._buildBlock(block.right)
+        allKW = "ALL" if not block.source.distinct else ""
+        return (lpre + rpre, f"{lSQL} UNION {allKW} {rSQL}")
+
+      (pre, fromSQL) = self._buildSource(block)
+
+      self._aliasMap = block.aliasMap
+
+      # projection list
+      if block.grouping is not None:
+        cols = []
+        for attr in block.grouping.groupCols:
+          (exprPre, exprSQL) = self._exprToSQL(attr)
+          pre += exprPre
+          cols.append(exprSQL)
+        for f in block.grouping.aggFunc:
+          (fPre,fCode) = self._generateFuncCall(f)
+          pre += fPre
+          cols.append(fCode)
+      elif block.projection is not None and block.projection.columns:
+        cols = []
+        for attr in block.projection.columns:
+          (ePre, exprSQL) = self._exprToSQL(attr)
+          pre += ePre
+          cols.append(exprSQL)
+      elif block.columns:
+        cols = [f"{alias}.{c}" for (alias, c) in block.columns]
+      else:
+        cols = ["*"]
+
+      for x in block.computedCols:
+        (exprPre, exprSQL) = self._exprToSQL(x)
+        pre += exprPre
+        cols.append(exprSQL)
+
+      distinct = "DISTINCT " if block.projection is not None and block.projection.doDistinct else ""
+      top = ""
+      limitClause = ""
+      if block.limit is not None:
+        (lPre, limitExpr) = self._limitClause(block.limit)
+        pre += lPre
+        if self.templates["limit"].lower() == "top":
+          top = f"TOP {limitExpr} "
+        else:
+          limitClause = f" LIMIT {limitExpr}"
+        if block.limit.offset is not None:
+          (oPre, offsetExpr) = self._inlineToSQL(block.limit.offset)
+          pre += oPre
+          limitClause += f" OFFSET {offsetExpr}"
+
+      qry = f"SELECT {distinct}{top}{','.join(cols)} FROM {fromSQL}"
+
+      if block.where:
+        conditions = []
+        for (expr, aliases) in block.where:
+          if aliases:
+            self._aliasMap = dict(block.aliasMap, **aliases)
+          (exprPre, exprSQL) = self._exprToSQL(expr)
+          self._aliasMap = block.aliasMap
+          pre += exprPre
+          if len(block.where) > 1 and isinstance(expr, LogicExpr):
+            exprSQL = f"({exprSQL})"
+          conditions.append(exprSQL)
+        qry += " WHERE " + " and ".join(conditions)
+
+      if block.grouping is not None:
+        qry += " GROUP BY " + ",".join(cols[:len(block.grouping.groupCols)])
+
+        if block.grouping.having:
+          havings = []
+          for h in block.grouping.having:
+            (hPre,hSQL) = self._exprToSQL(h)
+            pre += hPre
+            havings.append(hSQL)
+          qry += " HAVING " + " AND ".join(havings)
+
+      if block.ordering is not None:
+        by = []
+        for (ref, bare) in block.orderBy:
+          if bare:
+            by.append(ref.column)
+          else:
+            (exprPre, exprSQL) = self._exprToSQL(ref)
+            pre += exprPre
+            by.append(exprSQL)
+        qry += " ORDER BY " + SQLGenerator._orderByClause(block.ordering, by)
+
+      qry += limitClause
+
+      return (pre, qry)
+    finally:
+      self._aliasMap = outerMap
+
+  def _buildSource(self, block: SelectBlock) -> Tuple[List[str], str]:
+    source = block.source
+    if isinstance(source, Table) or isinstance(source, CTERef):
+      return ([], f"{source.table} {block.alias}")
+
+    elif isinstance(source, ExternalTable):
+      return (SQLGenerator._generateCreateExtTable(source, self.templates), f"{source.table} {block.alias}")
+
+    elif isinstance(source, SelectBlock):
+      return self._buildInput(source, block.alias)
+
+    elif isinstance(source, Join):
+      (lpre, lSQL) = self._buildInput(block.left, source.leftParent().alias)
+      (rpre, rSQL) = self._buildInput(block.right, source.rightParent().alias)
+
+      self._aliasMap = block.aliasMap
+      (onPre, onSQL) = self._joinCondition(source)
+
+      return (onPre + lpre + rpre, f"{lSQL} {source.how} JOIN {rSQL} {onSQL}")
+
+    else:
+      raise ValueError(f"unsupported source {type(source)}")
+
+  def _buildInput(self, block: SelectBlock, alias: str) -> Tuple[List[str], str]:
+    '''
+    Produce the FROM item for the given block. Plain table scans are referenced directly
+    '''
+    if self.optimizer.flatten and block.isScan():
+      # the alias of the scan is not referenced by anything else
+      inner = SelectBlock(block.source, alias)
+      return self._buildSource(inner)
+
+    (pre, sql) = self._buildBlock(block)
+    return (pre, f"({sql}) {alias}")
+
+  def _limitClause(self, df: Limit) -> Tuple[List[str], str]:
+    return self._inlineToSQL(df.limit)
+
+  def _inlineToSQL(self, expr) -> Tuple[List[str], str]:
+    '''
+    Produce the SQL for the expression with all constants inlined, even if
+    bind parameters are used, e.g. for LIMIT and OFFSET
+    '''
+    values = self._bindValues
+    self._bindValues = None
+    try:
+      return self._exprToSQL(expr)
+    finally:
+      self._bindValues = values
+
+  @staticmethod
+  def _isBindable(value) -> bool:
+    return isinstance(value, (str, int, float, Decimal, datetime.date))
+
+  def _bindPlaceholders(self, sql: str, values: List):
+    '''
+    Replace the markers of the constants by the placeholders of the paramstyle.
+    Returns the SQL and the parameters in the order of their placeholders
+    '''
+    paramstyle = self.paramstyle or "qmark"
+    if paramstyle in ["format", "pyformat"] and values:
+      # a literal % must be escaped if the query has parameters. Without, the
+      # query is executed without parameters (see RelationalExecutor._execute)
+      sql = sql.replace("%", "%%")
+
+    params = {} if paramstyle in ["named", "pyformat"] else []
+
+    def placeholder(m):
+      value = values[int(m.group(1))]
+      num = len(params) + 1
+      if paramstyle == "qmark":
+        params.append(value)
+        return "?"
+      elif paramstyle == "format":
+        params.append(value)
+        return "%s"
+      elif paramstyle == "numeric":
+        params.append(value)
+        return f":{num}"
+      elif paramstyle == "named":
+        params[f"p{num}"] = value
+        return f":p{num}"
+      elif paramstyle == "pyformat":
+        params[f"p{num}"] = value
+        return f"%(p{num})s"
+      else:
+        raise ValueError(f"unsupported paramstyle: {paramstyle}")
+
+    sql = _paramMarker.sub(placeholder, sql)
+    return (sql, params)
+
 
   @staticmethod
   def _generateCreateFunc(udf: UDF, templates) -> str:
@@ -650,11 +1085,82 @@ class SQLGenerator:
     return (preQuery, aggSQL)
 
   def generate(self, df) -> Tuple[Set[str],str]:
-    (preQueryCode, qryString) = self._buildFrom(df)
+    (preQueryCode, qryString, _) = self._generate(df, False)
+    return (preQueryCode, qryString)
+
+  def generateParameterized(self, df):
+    '''
+    Produce the query with placeholders instead of inlined constants.
+    Returns the pre-queries, the query, and its parameters as a list or dict,
+    depending on the paramstyle.
+    '''
+    return self._generate(df, True)
+
+  def _generate(self, df, parameterized: bool):
+    if isinstance(df, Unpivot):
+      # the result is reshaped by the executor
+      df = df.parents[0]
+
+    key = None
+    if self.cacheSize > 0 and df is not None:
+      key = (Fingerprint.of(df), self._cacheMode(), ("params", self.paramstyle) if parameterized else None)
+      if key in self._cache:
+        self.cacheHits += 1
+        self._cache.move_to_end(key)
+        (preQueryCode, qryString, params) = self._cache[key]
+        return (list(preQueryCode), qryString, SQLGenerator._copyParams(params))
+
+      self.cacheMisses += 1
+
+    self._bindValues = [] if parameterized else None
+    try:
+      if self.cte and df is not None:
+        (preQueryCode, qryString) = self._buildWithCTEs(df)
+      else:
+        (preQueryCode, qryString) = self._build(df)
+      values = self._bindValues
+    finally:
+      self._bindValues = None
+
+    params = None
+    if parameterized:
+      # pre-queries are executed without parameters
+      preQueryCode = [_paramMarker.sub(lambda m: self._inlineToSQL(Constant(values[int(m.group(1))]))[1], pq) for pq in preQueryCode]
+      (qryString, params) = self._bindPlaceholders(qryString, values)
 
     preQueryCode = SQLGenerator._makeUnique(preQueryCode)
 
-    return (preQueryCode, qryString)
+    if key is not None:
+      self._cache[key] = (list(preQueryCode), qryString, SQLGenerator._copyParams(params))
+      while len(self._cache) > self.cacheSize:
+        self._cache.popitem(last=False)
+
+    return (preQueryCode, qryString, params)
+
+  @staticmethod
+  def _copyParams(params):
+    return params.copy() if params is not None else None
+
+  def _cacheMode(self):
+    # the generated code depends on the optimizer settings
+    optimizer = (self.optimizer.flatten, self.optimizer.pushdown, self.optimizer.prune) if self.optimize else None
+    return (optimizer, self.cte, self.materializeCTEs)
+
+  def cacheInfo(self) -> CacheInfo:
+    return CacheInfo(self.cacheHits, self.cacheMisses, len(self._cache), self.cacheSize)
+
+  def clearCache(self):
+    self._cache.clear()
+    self.cacheHits = 0
+    self.cacheMisses = 0
+
+  def invalidate(self, df):
+    '''
+    Remove the cached queries for the given DataFrame (for all generator settings)
+    '''
+    fingerprint = Fingerprint.of(df)
+    for key in [k for k in self._cache.keys() if k[0] == fingerprint]:
+      del self._cache[key]
 
   def getTableSchema(self, tableName):
     
@@ -677,6 +1183,145 @@ class SQLGenerator:
 
     return (qry, columnNames, columnTypes)
 
+  def generateExists(self, df):
+    '''
+    Produce a query that returns a single row with 1 if the DataFrame has at least one row,
+    0 otherwise. The database can stop at the first row that is found.
+    Returns the pre-queries, the query and its parameters (None if constants are inlined)
+    '''
+    (pre, sql, params) = self._generate(df, self.bindParams)
+    template = self.templates["exists_query"] if "exists_query" in self.templates else "SELECT CASE WHEN EXISTS ($$qry$$) THEN 1 ELSE 0 END"
+    return (pre, template.replace("$$qry$$", sql), params)
+
+  def generateContainsMany(self, df, columns: List[str], candidates: List[tuple]):
+    '''
+    Produce a semi-join of the candidate tuples (as a VALUES list) with the DataFrame
+    that returns the positions of the candidates that exist in the DataFrame.
+    The values of the candidates are always passed as parameters.
+    Returns the pre-queries, the query and its parameters
+    '''
+    if isinstance(df, Unpivot):
+      raise ValueError("membership tests are not supported for Unpivot")
+
+    self._bindValues = []
+    try:
+      (pre, sql) = self._build(df)
+
+      rows = []
+      for (i, candidate) in enumerate(candidates):
+        values = [str(i)] + ["NULL" if v is None else self._exprToSQL(Constant(v))[1].strip() for v in candidate]
+        rows.append(",".join(values))
+      values = self._bindValues
+    finally:
+      self._bindValues = None
+
+    if "values_row" in self.templates:
+      # e.g. Oracle before 23c
+      rowsSQL = " UNION ALL ".join([self.templates["values_row"].replace("$$values$$", r) for r in rows])
+    else:
+      rowsSQL = "VALUES " + ",".join([f"({r})" for r in rows])
+
+    candCols = ",".join(["idx"] + [f"c{i}" for i in range(len(columns))])
+    cond = " AND ".join([f"d.{c} = candidates.c{i}" for (i, c) in enumerate(columns)])
+    qry = f"WITH candidates({candCols}) AS ({rowsSQL}) SELECT candidates.idx FROM candidates WHERE EXISTS (SELECT 1 FROM ({sql}) d WHERE {cond})"
+
+    # pre-queries are executed without parameters
+    pre = [_paramMarker.sub(lambda m: self._inlineToSQL(Constant(values[int(m.group(1))]))[1], pq) for pq in pre]
+    (qry, params) = self._bindPlaceholders(qry, values)
+    return (SQLGenerator._makeUnique(pre), qry, params)
+
+  def generateTempTable(self, df, tableName: str, indexColumns: List[str] = None):
+    '''
+    Produce the statements that store the result of the DataFrame in the temporary table
+    and create an index on the given columns. Constants are always inlined, as not all
+    systems allow parameters in DDL statements.
+    Returns the pre-queries and the statements
+    '''
+    if isinstance(df, Unpivot):
+      raise ValueError("Unpivot cannot be stored in a table")
+
+    (pre, sql, _) = self._generate(df, False)
+    template = self.templates["create_temp_table"] if "create_temp_table" in self.templates else "CREATE TEMPORARY TABLE $$name$$ AS $$qry$$"
+    statements = [template.replace("$$name$$", tableName).replace("$$qry$$", sql)]
+
+    if indexColumns:
+      template = self.templates["create_index"] if "create_index" in self.templates else "CREATE INDEX $$name$$ ON $$table$$ ($$columns$$)"
+      statements.append(template.replace("$$name$$", f"{tableName}_idx").replace("$$table$$", tableName).replace("$$columns$$", ",".join(indexColumns)))
+
+    return (pre, statements)
+
+  def getDropTempTable(self, tableName: str) -> List[str]:
+    '''
+    The statement(s) to drop the temporary table
+    '''
+    template = self.templates["drop_temp_table"] if "drop_temp_table" in self.templates else "DROP TABLE $$name$$"
+    if not isinstance(template, list):
+      template = [template]
+    return [t.replace("$$name$$", tableName) for t in template]
+
+  def generateView(self, df, name: str, materialized: bool):
+    '''
+    Produce the statements that create a view or a materialized view with the query of the
+    DataFrame. Without a create_materialized_view template, the materialized view is emulated
+    with a table. Constants are always inlined.
+    Returns the pre-queries, the statements and the query of the view
+    '''
+    if isinstance(df, Unpivot):
+      raise ValueError("Unpivot cannot be stored in a view")
+
+    (pre, sql, _) = self._generate(df, False)
+    if not materialized:
+      template = self.templates["create_view"] if "create_view" in self.templates else "CREATE VIEW $$name$$ AS $$qry$$"
+    elif "create_materialized_view" in self.templates:
+      template = self.templates["create_materialized_view"]
+    else:
+      template = "CREATE TABLE $$name$$ AS $$qry$$"
+
+    return (pre, [template.replace("$$name$$", name).replace("$$qry$$", sql)], sql)
+
+  def getRefreshView(self, view: View) -> List[str]:
+    '''
+    The statements to update the result of a materialized view, none for plain views,
+    which always show the current data
+    '''
+    if not view.materialized:
+      return []
+
+    if "refresh_materialized_view" in self.templates:
+      template = self.templates["refresh_materialized_view"]
+    elif "create_materialized_view" in self.templates:
+      raise ValueError(f"no refresh_materialized_view template for profile {self.profile}")
+    else:
+      # the emulating table is filled again
+      template = ["DELETE FROM $$name$$", "INSERT INTO $$name$$ $$qry$$"]
+
+    if not isinstance(template, list):
+      template = [template]
+    return [t.replace("$$name$$", view.table).replace("$$qry$$", view.query) for t in template]
+
+  def getChangeMarkerQuery(self, tableNames):
+    '''
+    Query that returns a value which changes whenever the data of one of the given tables
+    is modified. None if the dialect does not define one.
+    '''
+    if "change_marker" not in self.templates:
+      return None
+
+    # without the schema and in lower case, like most catalogs store unquoted names
+    names = sorted(set([t.split(".")[-1].lower() for t in tableNames]))
+    tables = ",".join([f"'{t}'" for t in names]) if names else "''"
+    return self.templates["change_marker"].replace("$$tables$$", tables)
+
+  def getRowCountQuery(self, tableName):
+    '''
+    Query to read the estimated number of rows of a table from the catalog
+    statistics. None if the dialect does not define one.
+    '''
+    if "rowcount_query" not in self.templates:
+      return None
+
+    return self.templates["rowcount_query"].replace("$$tablename$$", tableName)
+
 
   @staticmethod
   def _makeUnique(preQueries: List[str]) -> List[str]:
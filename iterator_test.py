@@ -0,0 +1,53 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class IteratorTest(unittest.TestCase):
+
+  def setUp(self):
+    c = sqlite3.connect(":memory:")
+    c.execute("create table numbers (n int, name text)")
+    c.executemany("insert into numbers values (?, ?)", [(i, f"n{i}") for i in range(25)])
+    self.executor = RelationalExecutor(c, SQLGenerator("sqlite"), batchSize=4)
+    grizzly.use(self.executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_iter(self):
+    df = grizzly.read_table("numbers")
+    rows = [row for row in df]
+    self.assertEqual(rows, [(i, f"n{i}") for i in range(25)])
+
+  def test_iterrowsBatchSize(self):
+    df = grizzly.read_table("numbers")
+    df = df[df.n > 20]
+    rows = list(df.iterrows(batchSize=3))
+    self.assertEqual(rows, [(0, [21, "n21"]), (1, [22, "n22"]), (2, [23, "n23"]), (3, [24, "n24"])])
+
+  def test_itertuples(self):
+    df = grizzly.read_table("numbers")
+    df = df[df.n < 3]
+    rows = list(df.itertuples(batchSize=1))
+    self.assertEqual([r.name for r in rows], ["n0", "n1", "n2"])
+
+  def test_itertuplesEmpty(self):
+    df = grizzly.read_table("numbers")
+    df = df[df.n > 100]
+    self.assertEqual(list(df.itertuples()), [])
+
+  def test_closeEarly(self):
+    df = grizzly.read_table("numbers")
+    it = self.executor.iterator(df, includeHeader=True)
+    self.assertEqual(next(it), ["n", "name"])
+    self.assertEqual(next(it), (0, "n0"))
+    # the cursor is closed by closing the generator
+    it.close()
+    self.assertEqual(list(it), [])
+    self.assertEqual(len(df), 25)
+
+if __name__ == "__main__":
+    unittest.main()
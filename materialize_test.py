@@ -0,0 +1,150 @@
+import unittest
+import sqlite3
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+import grizzly
+from grizzly.aggregates import AggregateType
+from grizzly.dataframes.frame import LocalTable
+from grizzly.expression import SetExpr, SetOperation
+from grizzly.generator import GrizzlyGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class MaterializeTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.con.execute("create table sales (id int, shop int, amount real, product text)")
+    self.con.executemany("insert into sales values (?, ?, ?, ?)",
+      [(i, i % 4, None if i % 7 == 0 else (i * 13) % 50 + 0.5, f"p{i % 5}") for i in range(60)])
+    self.con.execute("create table shops (shop int, city text)")
+    self.con.executemany("insert into shops values (?, ?)", [(0, "Berlin"), (1, "Ilmenau"), (2, "Erfurt"), (5, "Jena")])
+    self.con.commit()
+
+    self.statements = []
+    self.con.set_trace_callback(self.statements.append)
+    grizzly.use(RelationalExecutor(self.con))
+
+  def tearDown(self):
+    grizzly.close()
+
+  def local(self, table, schema=None):
+    df = grizzly.read_table(table, schema=schema)
+    return df.materialize()
+
+  def assertSameRows(self, local, remote):
+    self.statements.clear()
+    actual = local.collect()
+    # evaluated without any query
+    self.assertEqual(self.statements, [])
+    self.assertEqual(sorted(actual, key=repr), sorted(remote.collect(), key=repr))
+
+  def test_materialize(self):
+    df = self.local("sales")
+    self.assertIsInstance(df, LocalTable)
+    self.assertEqual(list(df.data.keys()), ["id", "shop", "amount", "product"])
+    self.assertEqual(df.data["id"].dtype, numpy.int64)
+    self.assertSameRows(df, grizzly.read_table("sales"))
+
+  def test_filter(self):
+    local = self.local("sales")
+    remote = grizzly.read_table("sales")
+    self.assertSameRows(local[(local.amount > 20) & (local.product != "p1")], remote[(remote.amount > 20) & (remote.product != "p1")])
+    self.assertSameRows(local[local.amount == None], remote[remote.amount == None])
+    self.assertSameRows(local[SetExpr(local.shop, [1, 3], SetOperation.IN)], remote[SetExpr(remote.shop, [1, 3], SetOperation.IN)])
+
+  def test_projection(self):
+    local = self.local("sales")
+    remote = grizzly.read_table("sales")
+    self.assertSameRows(local[["product", "shop"]].distinct(), remote[["product", "shop"]].distinct())
+
+    local["double"] = local.amount * 2
+    remote["double"] = remote.amount * 2
+    self.assertSameRows(local[local.id < 10], remote[remote.id < 10])
+
+  def test_grouping(self):
+    local = self.local("sales")
+    remote = grizzly.read_table("sales")
+
+    def grouped(df):
+      g = df.groupby(["shop", "product"])
+      g = g.agg(col="amount", aggType=AggregateType.SUM, alias="total")
+      g = g.agg(col="amount", aggType=AggregateType.MIN, alias="smallest")
+      return g.agg(col="amount", aggType=AggregateType.COUNT, alias="cnt")
+
+    (l, r) = (grouped(local).collect(), grouped(remote).collect())
+    self.assertEqual(len(l), len(r))
+    for (a, b) in zip(sorted(l), sorted(r)):
+      self.assertEqual(a[:2], b[:2])
+      self.assertAlmostEqual(a[2], b[2])
+      self.assertEqual(a[3:], b[3:])
+
+  def test_groupingNullKey(self):
+    self.con.execute("create table ratings (id int, stars int)")
+    self.con.executemany("insert into ratings values (?, ?)", [(i, None if i % 5 == 0 else i % 3) for i in range(30)])
+
+    def grouped(df):
+      g = df.groupby("stars")
+      g = g.agg(col="id", aggType=AggregateType.COUNT, alias="cnt")
+      return g.sort_values("stars")
+
+    local = grouped(self.local("ratings"))
+    self.assertEqual(local.collect(), grouped(grizzly.read_table("ratings")).collect())
+    # not the string representation of NumPy values
+    self.assertEqual([type(r[0]) for r in local.collect()[1:]], [float] * 3)
+
+  def test_having(self):
+    local = self.local("sales")
+    remote = grizzly.read_table("sales")
+
+    def grouped(df):
+      g = df.groupby("shop")
+      g = g.agg(col="amount", aggType=AggregateType.MAX, alias="largest")
+      return g[g.largest > 48]
+
+    self.assertSameRows(grouped(local), grouped(remote))
+
+  def test_join(self):
+    for how in ["inner", "left outer", "right outer", "full outer"]:
+      if how != "inner" and how != "left outer" and sqlite3.sqlite_version_info < (3, 39):
+        continue
+      with self.subTest(how=how):
+        (sales, shops) = (self.local("sales"), self.local("shops"))
+        local = sales.join(shops, on=(sales.shop == shops.shop), how=how)
+        (sales, shops) = (grizzly.read_table("sales"), grizzly.read_table("shops"))
+        remote = sales.join(shops, on=(sales.shop == shops.shop), how=how)
+        self.assertSameRows(local, remote)
+
+  def test_orderingAndLimit(self):
+    local = self.local("sales").sort_values(["shop", "amount"], ascending=[True, False])
+    remote = grizzly.read_table("sales").sort_values(["shop", "amount"], ascending=[True, False])
+    self.assertEqual(local.collect(), remote.collect())
+    self.assertEqual(local[2:7].collect(), remote[2:7].collect())
+    self.assertEqual(local.tail(3), remote.tail(3))
+
+  def test_actions(self):
+    local = self.local("sales")
+    self.statements.clear()
+
+    self.assertEqual(local.count("id"), 60)
+    self.assertEqual(local.max("amount"), 49.5)
+    self.assertTrue((3,) in local[["id"]])
+    self.assertEqual(local[["id", "shop"]].contains_many([(1, 1), (1, 2)]), [True, False])
+    self.assertEqual(local[local.id < 3].to_numpy(asDict=True)["product"].tolist(), ["p0", "p1", "p2"])
+    self.assertIn("and 50 more...", GrizzlyGenerator.toString(local, limit=10, countRemaining=True))
+    self.assertEqual(self.statements, [])
+
+  def test_mixed(self):
+    local = self.local("shops")
+    remote = grizzly.read_table("sales")
+    self.assertRaises(ValueError, lambda: remote.join(local, on=["shop", "shop"]).collect())
+
+  def test_noSQL(self):
+    self.assertRaises(ValueError, lambda: self.local("sales").generateQuery())
+
+if __name__ == "__main__":
+  unittest.main()
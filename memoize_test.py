@@ -0,0 +1,85 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class MemoizeTest(unittest.TestCase):
+
+  def setUp(self):
+    c = sqlite3.connect("grizzly.db")
+    self.gen = SQLGenerator("sqlite")
+    executor = RelationalExecutor(c, self.gen)
+    grizzly.use(executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def base(self):
+    df = grizzly.read_table("events")
+    df = df[df.theyear >= 2015]
+    df["next"] = df.theyear + 1
+    return df.join(grizzly.read_table("t3"), on = ["globaleventid", "globaleventid"], how = "inner")
+
+  def assertSameSQL(self, df):
+    # compare with a generator that does not memoize
+    (pre, sql) = self.gen.generate(df)
+    (expectedPre, expectedSQL) = SQLGenerator("sqlite", memoize=False).generate(df)
+    self.assertEqual(sql, expectedSQL)
+    self.assertEqual(pre, expectedPre)
+
+  def test_sharedBase(self):
+    base = self.base()
+    self.gen.generate(base)
+    hits = self.gen.memoHits
+
+    r1 = base[base.actor1countrycode == "AUS"]
+    r2 = base[["globaleventid", "next"]]
+    self.assertSameSQL(r1)
+    self.assertSameSQL(r2)
+
+    # only the new operators were generated, the base was reused
+    self.assertEqual(self.gen.memoHits, hits + 2)
+
+  def test_setitemInvalidates(self):
+    df = grizzly.read_table("events")
+    df = df[df.theyear >= 2015]
+    p = df[["globaleventid"]]
+    self.gen.generate(p)
+
+    df["prev"] = df.theyear - 1
+    (_, sql) = self.gen.generate(p)
+    self.assertIn("as prev", sql)
+    self.assertSameSQL(p)
+
+  def test_groupingInvalidates(self):
+    df = grizzly.read_table("events")
+    g = df.groupby("theyear")
+    g.count("actor1name", "cnt")
+    self.gen.generate(g)
+
+    g.max("actor2name", "m")
+    (_, sql) = self.gen.generate(g)
+    self.assertIn("as m", sql)
+    self.assertSameSQL(g)
+
+  def test_aliasChange(self):
+    df = grizzly.read_table("events")
+    df = df[df.theyear >= 2015]
+    self.gen.generate(df)
+
+    # aggregations assign a new alias to the frame
+    df.count("globaleventid")
+    self.assertSameSQL(df)
+
+  def test_bindParams(self):
+    df = self.base()
+    self.gen.bindParams = True
+    (_, _, params1) = self.gen.generateParameterized(df)
+    (_, _, params2) = self.gen.generateParameterized(df)
+    self.assertEqual(params1, [1, 2015])
+    self.assertEqual(params2, [1, 2015])
+
+if __name__ == "__main__":
+    unittest.main()
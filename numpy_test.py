@@ -0,0 +1,67 @@
+import unittest
+import sqlite3
+
+try:
+  import numpy
+except ImportError:
+  numpy = None
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class NumpyTest(unittest.TestCase):
+
+  def setUp(self):
+    c = sqlite3.connect(":memory:")
+    c.execute("create table numbers (n int, half real, name text, maybe int)")
+    c.executemany("insert into numbers values (?, ?, ?, ?)", [(i, i / 2, f"n{i}", None if i % 5 == 0 else i) for i in range(25)])
+    grizzly.use(RelationalExecutor(c, SQLGenerator("sqlite")))
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_structured(self):
+    df = grizzly.read_table("numbers")
+    arr = df.to_numpy(batchSize=7)
+
+    self.assertEqual(arr.dtype.names, ("n", "half", "name", "maybe"))
+    self.assertEqual(arr.dtype["n"], numpy.int64)
+    self.assertEqual(arr.dtype["half"], numpy.float64)
+    self.assertEqual(arr.dtype["name"], object)
+    self.assertEqual(len(arr), 25)
+    self.assertEqual(arr["n"].tolist(), list(range(25)))
+    self.assertEqual(arr["name"][3], "n3")
+
+  def test_dict(self):
+    df = grizzly.read_table("numbers")
+    df = df[df.n < 12]
+    cols = df.to_numpy(asDict=True, batchSize=4)
+
+    self.assertEqual(list(cols.keys()), ["n", "half", "name", "maybe"])
+    self.assertEqual(cols["half"].tolist(), [i / 2 for i in range(12)])
+    # NULL values in a numeric column are stored as NaN
+    self.assertEqual(cols["maybe"].dtype, numpy.float64)
+    self.assertTrue(numpy.isnan(cols["maybe"][5]))
+    self.assertEqual(cols["maybe"][6], 6)
+
+  def test_schemaTypes(self):
+    df = grizzly.read_table("numbers", schema={"n": int, "half": float, "name": str, "maybe": int})
+    df = df[df.n > 100]
+    cols = df.to_numpy(asDict=True)
+
+    self.assertEqual(len(cols["n"]), 0)
+    self.assertEqual(cols["n"].dtype, numpy.float64)
+    self.assertEqual(cols["name"].dtype, object)
+
+  def test_duplicateNames(self):
+    df = grizzly.read_table("numbers")
+    j = df.join(grizzly.read_table("numbers"), on = ["n", "n"], how = "inner")
+    arr = j.values()
+
+    self.assertEqual(arr.dtype.names, ("n", "half", "name", "maybe", "n_1", "half_1", "name_1", "maybe_1"))
+    self.assertEqual(arr["n"].tolist(), arr["n_1"].tolist())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+import unittest
+import sqlite3
+
+from matcher import CodeMatcher
+
+import grizzly
+from grizzly.aggregates import AggregateType
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class OptimizerTest(CodeMatcher):
+
+  def setUp(self):
+    c = sqlite3.connect("grizzly.db")
+    self.gen = SQLGenerator("sqlite", optimize=True)
+    executor = RelationalExecutor(c, self.gen)
+    grizzly.use(executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_flattenTable(self):
+    df = grizzly.read_table("events")
+    actual = df.generateQuery()
+    expected = "select * from events $t0"
+    self.matchSnipped(actual, expected)
+
+  def test_flattenChain(self):
+    df = grizzly.read_table("events")
+    df = df[df['globaleventid'] == 468189636]
+    df = df[["globaleventid","actor1name"]]
+    df = df.sort_values("globaleventid", ascending=False)
+    df = df.limit(10)
+
+    actual = df.generateQuery()
+    expected = "select $t0.globaleventid, $t0.actor1name from events $t0 where $t0.globaleventid = 468189636 order by $t0.globaleventid desc limit 10"
+    self.matchSnipped(actual, expected)
+
+  def test_flattenFilters(self):
+    df = grizzly.read_table("events")
+    df = df[(df.theyear == 2015) | (df.theyear == 2016)]
+    df = df[df.actor1name != None]
+
+    actual = df.generateQuery()
+    expected = "select * from events $t0 where ($t0.theyear = 2015 or $t0.theyear = 2016) and $t0.actor1name is not null"
+    self.matchSnipped(actual, expected)
+
+  def test_flattenGroupBy(self):
+    df = grizzly.read_table("events")
+    df = df[df['globaleventid'] < 470259271]
+    g = df.groupby(["theyear","actor1name"])
+    a = g.agg(col="actor2name", aggType=AggregateType.COUNT, alias="cnt_actor")
+    f = a.filter(a["cnt_actor"] > 2)
+    f = f.sort_values("cnt_actor")[:5]
+
+    actual = f.generateQuery()
+    expected = "select $t0.theyear, $t0.actor1name, count($t0.actor2name) as cnt_actor from events $t0 where $t0.globaleventid < 470259271 group by $t0.theyear, $t0.actor1name having cnt_actor > 2 order by cnt_actor asc limit 5"
+    self.matchSnipped(actual, expected)
+
+  def test_noMergeAfterLimit(self):
+    df = grizzly.read_table("events")
+    df = df[:10]
+    df = df[df['globaleventid'] == 468189636]
+
+    actual = df.generateQuery()
+    expected = "select * from (select * from events $t0 limit 10) $t1 where $t1.globaleventid = 468189636"
+    self.matchSnipped(actual, expected)
+
+  def test_noMergeProjectionOverGroupBy(self):
+    df = grizzly.read_table("events")
+    g = df.groupby("theyear")
+    g = g.count("actor1name", "cnt")
+    p = g[["cnt"]]
+
+    actual = p.generateQuery()
+    expected = "select $t2.cnt from (select $t0.theyear, count($t0.actor1name) as cnt from events $t0 group by $t0.theyear) $t2"
+    self.matchSnipped(actual, expected)
+
+  def test_flattenJoinInputs(self):
+    df = grizzly.read_table("events")
+    df = df[df['globaleventid'] == 470259271]
+
+    df2 = grizzly.read_table("events")
+
+    joined = df.join(other = df2, on=["globaleventid", "globaleventid"], how = "inner")
+
+    actual = joined.generateQuery()
+    expected = "select * from (select * from events $t0 where $t0.globaleventid = 470259271) $t1 inner join events $t2 on $t1.globaleventid = $t2.globaleventid"
+    self.matchSnipped(actual, expected)
+
+  def test_flattenToggle(self):
+    df = grizzly.read_table("events")
+    df = df[df['globaleventid'] == 468189636]
+    df = df['goldsteinscale']
+
+    self.gen.optimize = False
+    nested = df.generateQuery()
+    self.matchSnipped(nested, "select $t2.goldsteinscale from (select * from (select * from events $t0) $t1 where $t1.globaleventid = 468189636) $t2")
+
+    self.gen.optimize = True
+    self.gen.optimizer.flatten = False
+    self.gen.optimizer.pushdown = False
+    self.gen.optimizer.prune = False
+    self.matchSnipped(df.generateQuery(), "select $t2.goldsteinscale from (select * from (select * from events $t0) $t1 where $t1.globaleventid = 468189636) $t2")
+
+    self.gen.optimizer.pushdown = True
+    self.matchSnipped(df.generateQuery(), "select $t2.goldsteinscale from (select * from events $t0 where $t0.globaleventid = 468189636) $t2")
+
+    self.gen.optimizer.flatten = True
+    self.matchSnipped(df.generateQuery(), "select $t0.goldsteinscale from events $t0 where $t0.globaleventid = 468189636")
+
+  def test_flattenSameResult(self):
+    df = grizzly.read_table("events")
+    df = df[df['globaleventid'] <= 468189636]
+    df = df[["globaleventid","actor1name","actor2name"]]
+    df = df.sort_values("globaleventid")
+    df = df[:20]
+
+    self.gen.optimize = False
+    nested = df.collect()
+
+    self.gen.optimize = True
+    flattened = df.collect()
+
+    self.assertEqual(nested, flattened)
+
+  def test_pushdownJoin(self):
+    l = grizzly.read_table("events", schema={"globaleventid": int, "theyear": int})
+    r = grizzly.read_table("events", schema={"globaleventid": int, "actor1countrycode": str})
+
+    j = l.join(r, on=["globaleventid", "globaleventid"], how="inner")
+    j = j[(j.theyear == 2015) & (j.actor1countrycode == 'AUS')]
+
+    actual = j.generateQuery()
+    expected = "select * from (select * from events $t0 where $t0.theyear = 2015) $t0 inner join (select * from events $t1 where $t1.actor1countrycode = 'AUS') $t1 on $t0.globaleventid = $t1.globaleventid"
+    self.matchSnipped(actual, expected)
+
+  def test_pushdownOuterJoin(self):
+    l = grizzly.read_table("events", schema={"globaleventid": int, "theyear": int})
+    r = grizzly.read_table("events", schema={"globaleventid": int, "actor1countrycode": str})
+
+    j = l.join(r, on=["globaleventid", "globaleventid"], how="left")
+    j = j[(j.theyear == 2015) & (j.actor1countrycode == 'AUS')]
+
+    # the predicate on the null-extended side must be evaluated after the join
+    actual = j.generateQuery()
+    expected = "select * from (select * from events $t0 where $t0.theyear = 2015) $t0 left join events $t1 on $t0.globaleventid = $t1.globaleventid where $t1.actor1countrycode = 'AUS'"
+    self.matchSnipped(actual, expected)
+
+  def test_pushdownUnknownSide(self):
+    l = grizzly.read_table("events")
+    r = grizzly.read_table("events")
+
+    j = l.join(r, on=["globaleventid", "globaleventid"], how="inner")
+    j = j[j.theyear == 2015]
+
+    actual = j.generateQuery()
+    expected = "select * from (select * from events $t0 inner join events $t1 on $t0.globaleventid = $t1.globaleventid) $t3 where $t3.theyear = 2015"
+    self.matchSnipped(actual, expected)
+
+  def test_pushdownComputed(self):
+    df = grizzly.read_table("events")
+    df["x"] = df.theyear + 1
+    df = df[["globaleventid", "theyear", "x"]]
+    df = df[(df.theyear == 2015) & (df.x > 3)]
+
+    actual = df.generateQuery()
+    expected = "select $t1.globaleventid, $t1.theyear, $t1.x from (select $t0.globaleventid, $t0.theyear, ($t0.theyear + 1) as x from events $t0 where $t0.theyear = 2015) $t1 where $t1.x > 3"
+    self.matchSnipped(actual, expected)
+
+  def test_pushdownSameResult(self):
+    l = grizzly.read_table("events", schema={"globaleventid": int, "actor1name": str, "theyear": int})
+    r = grizzly.read_table("t3", schema={"globaleventid": int, "actiongeo_long": float})
+
+    j = l.join(r, on=["globaleventid", "globaleventid"], how="left")
+    j = j[(j.theyear >= 2015) & (j.actiongeo_long != None)]
+    j = j.sort_values("actiongeo_long")
+
+    self.gen.optimize = False
+    nested = j.collect()
+
+    self.gen.optimize = True
+    pushed = j.collect()
+
+    self.assertEqual(nested, pushed)
+
+  def test_pruneSubquery(self):
+    df = grizzly.read_table("events")
+    df = df[:10]
+    df = df[df['theyear'] == 2015]
+    df = df[["globaleventid", "actor1name"]]
+
+    actual = df.generateQuery()
+    expected = "select $t1.globaleventid, $t1.actor1name from (select $t0.theyear, $t0.globaleventid, $t0.actor1name from events $t0 limit 10) $t1 where $t1.theyear = 2015"
+    self.matchSnipped(actual, expected)
+
+  def test_pruneNested(self):
+    df = grizzly.read_table("events")
+    df = df[df['globaleventid'] == 468189636]
+    df = df['goldsteinscale']
+
+    self.gen.optimizer.flatten = False
+    self.gen.optimizer.pushdown = False
+    actual = df.generateQuery()
+    expected = "select $t2.goldsteinscale from (select $t1.goldsteinscale from (select $t0.goldsteinscale, $t0.globaleventid from events $t0) $t1 where $t1.globaleventid = 468189636) $t2"
+    self.matchSnipped(actual, expected)
+
+  def test_pruneJoin(self):
+    l = grizzly.read_table("events", schema={"globaleventid": int, "theyear": int, "actor1name": str})
+    r = grizzly.read_table("events", schema={"globaleventid": int, "actor1countrycode": str, "actiongeo_long": float})
+
+    j = l.join(r, on=["globaleventid", "globaleventid"], how="inner")
+    j = j[:5]
+    j = j[["actor1name", "actiongeo_long"]]
+
+    actual = j.generateQuery()
+    expected = "select $t3.actor1name, $t3.actiongeo_long from (select $t0.actor1name, $t1.actiongeo_long from events $t0 inner join events $t1 on $t0.globaleventid = $t1.globaleventid) $t3 limit 5"
+    self.matchSnipped(actual, expected)
+
+  def test_pruneKeepsStar(self):
+    l = grizzly.read_table("events")
+    r = grizzly.read_table("events")
+
+    # without schemas the columns cannot be assigned to the join inputs
+    j = l.join(r, on=["globaleventid", "globaleventid"], how="inner")
+    j = j[:5]
+    j = j[["actor1name"]]
+
+    actual = j.generateQuery()
+    expected = "select $t3.actor1name from (select * from events $t0 inner join events $t1 on $t0.globaleventid = $t1.globaleventid) $t3 limit 5"
+    self.matchSnipped(actual, expected)
+
+  def test_pruneSameResult(self):
+    df = grizzly.read_table("events")
+    df["y"] = df.theyear * 2
+    df = df[df['globaleventid'] <= 468189636]
+    df = df.sort_values("globaleventid")[:20]
+    df = df[df.actor1name != None]
+    df = df[["globaleventid", "y"]]
+
+    self.gen.optimizer.prune = False
+    unpruned = df.collect()
+
+    self.gen.optimizer.prune = True
+    pruned = df.collect()
+
+    self.assertEqual(unpruned, pruned)
+
+if __name__ == "__main__":
+    unittest.main()
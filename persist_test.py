@@ -0,0 +1,164 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class PersistTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.con.execute("create table orders (id int, customer int, amount real)")
+    self.con.executemany("insert into orders values (?, ?, ?)", [(i, i % 10, i * 1.5) for i in range(100)])
+    self.con.execute("create table customers (customer int, name text)")
+    self.con.executemany("insert into customers values (?, ?)", [(i, f"c{i}") for i in range(10)])
+    self.con.commit()
+
+    self.statements = []
+    self.con.set_trace_callback(self.statements.append)
+    self.executor = RelationalExecutor(self.con, SQLGenerator("sqlite"))
+    grizzly.use(self.executor)
+
+  def tearDown(self):
+    try:
+      grizzly.close()
+    except sqlite3.ProgrammingError:
+      # already closed by the test
+      pass
+
+  def tempTables(self):
+    rows = self.con.execute("select name from sqlite_temp_master where type = 'table'").fetchall()
+    return [r[0] for r in rows]
+
+  def joined(self):
+    orders = grizzly.read_table("orders")
+    customers = grizzly.read_table("customers")
+    df = orders.join(customers, on=(orders.customer == customers.customer))
+    return df[df.amount > 30]
+
+  def test_persist(self):
+    df = self.joined()
+    expected = df.collect()
+
+    self.statements.clear()
+    self.assertIs(df.cache(), df)
+    self.assertEqual(len(self.tempTables()), 1)
+    self.assertTrue(any(["CREATE TEMP TABLE" in s for s in self.statements]))
+
+    self.statements.clear()
+    self.assertEqual(df.collect(), expected)
+    self.assertEqual(len(self.statements), 1)
+    self.assertNotIn("JOIN", self.statements[0])
+    self.assertIn(self.tempTables()[0], self.statements[0])
+
+  def test_derived(self):
+    df = self.joined()
+    derived = df[df.id > 50]
+    # memoized SQL of the derived DataFrame is outdated after persisting
+    before = derived.collect()
+
+    df.persist()
+    self.statements.clear()
+    self.assertEqual(derived.collect(), before)
+    self.assertNotIn("JOIN", self.statements[-1])
+
+    g = df.groupby("name").count("id", "cnt")
+    self.assertEqual(len(g.collect()), 10)
+
+  def test_optimizer(self):
+    grizzly.use(RelationalExecutor(self.con, SQLGenerator("sqlite", optimize=True)))
+    df = self.joined()
+    expected = df[df.id < 60].collect()
+
+    df.persist()
+    self.statements.clear()
+    self.assertEqual(df[df.id < 60].collect(), expected)
+    self.assertNotIn("JOIN", self.statements[-1])
+
+  def test_index(self):
+    df = grizzly.read_table("orders")
+    df = df[df.amount > 10]
+    df.persist(indexColumns="customer")
+
+    indexes = self.con.execute("select tbl_name from sqlite_temp_master where type = 'index'").fetchall()
+    self.assertEqual([r[0] for r in indexes], self.tempTables())
+
+  def test_unpersist(self):
+    df = self.joined()
+    expected = df.collect()
+    df.persist()
+
+    df.unpersist()
+    self.assertEqual(self.tempTables(), [])
+    self.statements.clear()
+    self.assertEqual(df.collect(), expected)
+    self.assertIn("JOIN", self.statements[-1])
+
+  def test_unpersistDerived(self):
+    df = self.joined()
+    df.persist()
+    derived = df[df.id > 50]
+    expected = derived.collect()
+
+    df.unpersist()
+    self.statements.clear()
+    self.assertEqual(derived.collect(), expected)
+    self.assertIn("JOIN", self.statements[-1])
+    self.assertEqual(len(derived), len(expected))
+
+  def test_sqlCache(self):
+    grizzly.use(RelationalExecutor(self.con, SQLGenerator("sqlite", cacheSize=16)))
+    df = self.joined()
+    before = df[["id"]]
+    expected = before.collect()
+
+    # cached SQL of the operations is not used for the persisted DataFrame
+    df.persist()
+    derived = df[["id"]]
+    self.statements.clear()
+    self.assertEqual(derived.collect(), expected)
+    self.assertNotIn("JOIN", self.statements[-1])
+
+    # and the one of the temporary table not after unpersist()
+    df.unpersist()
+    self.assertEqual(derived.collect(), expected)
+    self.assertIn("JOIN", self.statements[-1])
+
+  def test_modified(self):
+    df = grizzly.read_table("orders")
+    df = df[df.id < 5]
+    df.persist()
+
+    # the stored result does not contain the new column
+    df["double"] = df.amount * 2
+    self.assertEqual(df.collect()[2], [2, 2, 3.0, 6.0])
+
+    df.unpersist()
+    self.assertEqual(self.tempTables(), [])
+
+  def test_close(self):
+    df = self.joined()
+    df.persist()
+    other = grizzly.read_table("orders")
+    other.cache()
+    self.assertEqual(len(self.tempTables()), 2)
+
+    self.con.set_trace_callback(None)
+    statements = []
+    self.con.set_trace_callback(statements.append)
+    grizzly.close()
+    self.assertEqual(len([s for s in statements if s.startswith("DROP TABLE")]), 2)
+    self.assertIsNone(df._persisted)
+    self.assertIsNone(other._persisted)
+
+  def test_templates(self):
+    df = grizzly.read_table("orders")
+    (_, statements) = SQLGenerator("oracle").generateTempTable(df, "tmp", ["id"])
+    self.assertTrue(statements[0].startswith("CREATE GLOBAL TEMPORARY TABLE tmp ON COMMIT PRESERVE ROWS AS SELECT"))
+    self.assertEqual(statements[1], "CREATE INDEX tmp_idx ON tmp (id)")
+    self.assertEqual(SQLGenerator("oracle").getDropTempTable("tmp"), ["TRUNCATE TABLE tmp", "DROP TABLE tmp"])
+    self.assertEqual(SQLGenerator("postgresql").getDropTempTable("tmp"), ["DROP TABLE tmp"])
+
+if __name__ == "__main__":
+  unittest.main()
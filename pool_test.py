@@ -0,0 +1,120 @@
+import unittest
+import sqlite3
+import tempfile
+import os
+import threading
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.pool import PooledExecutor, PoolTimeoutError
+
+class PoolTest(unittest.TestCase):
+
+  def setUp(self):
+    (fd, self.path) = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    c = sqlite3.connect(self.path)
+    c.execute("create table numbers (n int)")
+    c.executemany("insert into numbers values (?)", [(i,) for i in range(100)])
+    c.commit()
+    c.close()
+
+    self.created = 0
+
+  def tearDown(self):
+    grizzly.close()
+    os.remove(self.path)
+
+  def factory(self):
+    self.created += 1
+    return sqlite3.connect(self.path, check_same_thread=False)
+
+  def use(self, **kwargs):
+    self.executor = PooledExecutor(self.factory, queryGenerator=SQLGenerator("sqlite"), **kwargs)
+    grizzly.use(self.executor)
+    return self.executor.pool
+
+  def test_borrowAndReturn(self):
+    pool = self.use(minSize=2, maxSize=4)
+    self.assertEqual(self.created, 2)
+
+    df = grizzly.read_table("numbers")
+    df = df[df.n < 10]
+    self.assertEqual(len(df), 10)
+    self.assertEqual(df.collect()[0], [0])
+    self.assertEqual(df.max("n"), 9)
+    self.assertEqual(len(pool._idle), 2)
+    self.assertEqual(self.created, 2)
+
+  def test_iteratorHoldsConnection(self):
+    pool = self.use(minSize=0, maxSize=1, timeout=0.1)
+
+    df = grizzly.read_table("numbers")
+    it = iter(df)
+    self.assertEqual(next(it), (0,))
+    self.assertEqual(len(pool._idle), 0)
+
+    with self.assertRaises(PoolTimeoutError):
+      len(df)
+
+    it.close()
+    self.assertEqual(len(pool._idle), 1)
+    self.assertEqual(len(df), 100)
+
+  def test_healthCheck(self):
+    pool = self.use(minSize=1, maxSize=1)
+    pool._idle[0].connection.close()
+
+    # the broken connection is replaced
+    self.assertEqual(len(grizzly.read_table("numbers")), 100)
+    self.assertEqual(self.created, 2)
+
+  def test_checkQuery(self):
+    pool = self.use(minSize=1, maxSize=1)
+    self.assertEqual(pool._getCheckQuery(), "SELECT 1")
+
+    pool.queryGenerator = SQLGenerator("oracle")
+    self.assertEqual(pool._getCheckQuery(), "SELECT 1 FROM dual")
+
+  def test_noCheck(self):
+    pool = self.use(minSize=1, maxSize=1, checkQuery=False)
+    broken = pool._idle[0]
+    broken.connection.close()
+
+    # the connection is handed out without a check
+    self.assertIs(pool.acquire(), broken)
+    pool.release(broken)
+    self.assertEqual(self.created, 1)
+
+  def test_installedPerConnection(self):
+    pool = self.use(minSize=2, maxSize=2)
+    first = pool.acquire()
+    second = pool.acquire()
+
+    first.executor._executePreQueries(["create table if not exists log (n int)"])
+    self.assertEqual(len(first.executor._installed), 1)
+    self.assertEqual(len(second.executor._installed), 0)
+
+    pool.release(first)
+    pool.release(second)
+
+  def test_threads(self):
+    self.use(minSize=0, maxSize=3)
+    results = []
+
+    def run(limit):
+      df = grizzly.read_table("numbers")
+      df = df[df.n < limit]
+      results.append(len(df.collect()))
+
+    threads = [threading.Thread(target=run, args=(i * 10,)) for i in range(1, 9)]
+    for t in threads:
+      t.start()
+    for t in threads:
+      t.join()
+
+    self.assertEqual(sorted(results), [i * 10 for i in range(1, 9)])
+    self.assertLessEqual(self.created, 3)
+
+if __name__ == "__main__":
+    unittest.main()
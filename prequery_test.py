@@ -0,0 +1,49 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class PreQueryTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.executor = RelationalExecutor(self.con, SQLGenerator("sqlite"))
+    grizzly.use(self.executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def count(self, table):
+    return self.con.execute(f"select count(*) from {table}").fetchone()[0]
+
+  def test_skipUnchanged(self):
+    pre = ["create table log (n int)", "insert into log values (1)"]
+    self.executor._executePreQueries(pre)
+    # would fail if the table was created again
+    self.executor._executePreQueries(pre)
+    self.assertEqual(self.count("log"), 1)
+
+  def test_changedRunsAll(self):
+    self.executor._executePreQueries(["drop table if exists log", "create table log (n int)", "insert into log values (1)"])
+    self.executor._executePreQueries(["drop table if exists log", "create table log (n int)", "insert into log values (2)"])
+    self.assertEqual(self.con.execute("select n from log").fetchall(), [(2,)])
+
+  def test_reset(self):
+    pre = ["create table if not exists log (n int)", "insert into log values (1)"]
+    self.executor._executePreQueries(pre)
+    self.executor.resetPreQueries()
+    self.executor._executePreQueries(pre)
+    self.assertEqual(self.count("log"), 2)
+
+  def test_failureForgetsInstalled(self):
+    pre = ["create table if not exists log (n int)", "insert into log values (1)"]
+    self.executor._executePreQueries(pre)
+    with self.assertRaises(sqlite3.OperationalError):
+      self.executor._execute("select * from missing")
+    self.executor._executePreQueries(pre)
+    self.assertEqual(self.count("log"), 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+import unittest
+import sqlite3
+import shutil
+import tempfile
+import time
+
+import grizzly
+from grizzly.relationaldbexecutor import RelationalExecutor
+from grizzly.resultcache import ResultCache
+
+class ResultCacheTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.con.execute("create table facts (id int, name text)")
+    self.con.executemany("insert into facts values (?, ?)", [(i, f"n{i}") for i in range(10)])
+    self.con.commit()
+    grizzly.use(RelationalExecutor(self.con))
+
+  def tearDown(self):
+    grizzly.close()
+
+  def use(self, cache):
+    executor = RelationalExecutor(self.con, resultCache=cache)
+    grizzly.use(executor)
+    return executor
+
+  def test_hit(self):
+    executor = self.use(ResultCache())
+    df = grizzly.read_table("facts")
+    df = df[df.id < 5]
+
+    first = df.collect()
+    second = df.collect()
+    self.assertEqual(first, second)
+    self.assertEqual(len(second), 5)
+
+    info = executor.resultCacheInfo()
+    self.assertEqual(info.hits, 1)
+    self.assertEqual(info.misses, 1)
+    self.assertEqual(info.hitRate, 0.5)
+    self.assertEqual(info.size, 1)
+    self.assertGreater(info.bytes, 0)
+
+  def test_rebuilt(self):
+    executor = self.use(ResultCache())
+    for _ in range(2):
+      # new aliases in the generated SQL
+      df = grizzly.read_table("facts")
+      df = df[df.id < 5]
+      self.assertEqual(len(df.collect()), 5)
+
+    self.assertEqual(executor.resultCacheInfo().hits, 1)
+
+    df = grizzly.read_table("facts")
+    df = df[df.id < 6]
+    self.assertEqual(len(df.collect()), 6)
+    self.assertEqual(executor.resultCacheInfo().hits, 1)
+
+  def test_sharedByConnections(self):
+    path = tempfile.mkdtemp()
+    try:
+      db = f"{path}/facts.db"
+      con = sqlite3.connect(db)
+      con.execute("create table facts (id int, name text)")
+      con.commit()
+
+      cache = ResultCache()
+      first = RelationalExecutor(con, resultCache=cache)
+      other = sqlite3.connect(db)
+      second = RelationalExecutor(other, resultCache=cache)
+
+      grizzly.use(first)
+      self.assertEqual(grizzly.read_table("facts").collect(), [])
+      con.execute("insert into facts values (1, 'n1')")
+      con.commit()
+
+      # the change marker of the first connection is not comparable
+      grizzly.use(second)
+      self.assertEqual(len(grizzly.read_table("facts").collect()), 1)
+      first.close()
+    finally:
+      shutil.rmtree(path)
+
+  def test_paramsInKey(self):
+    self.assertNotEqual(ResultCache.key("select ?", [1]), ResultCache.key("select ?", [2]))
+    self.assertEqual(ResultCache.key("select ?", [1]), ResultCache.key("select ?", [1]))
+
+  def test_tablesOf(self):
+    df = grizzly.read_table("facts")
+    other = grizzly.read_table("other")
+    j = df.join(other, on = (df.id == other.id), how="inner")
+    self.assertEqual(ResultCache.tablesOf(j), frozenset(["facts", "other"]))
+
+  def test_invalidate(self):
+    cache = ResultCache(useChangeMarkers=False)
+    executor = self.use(cache)
+    df = grizzly.read_table("facts")
+
+    self.assertEqual(len(df.collect()), 10)
+    # not visible without a change marker
+    self.con.execute("insert into facts values (10, 'n10')")
+    self.assertEqual(len(df.collect()), 10)
+
+    executor.invalidateTables("other")
+    self.assertEqual(len(df.collect()), 10)
+
+    executor.invalidateTables(["facts"])
+    self.assertEqual(len(df.collect()), 11)
+    self.assertEqual(cache.info().invalidations, 1)
+
+  def test_changeMarker(self):
+    cache = ResultCache()
+    self.use(cache)
+    df = grizzly.read_table("facts")
+
+    self.assertEqual(len(df.collect()), 10)
+    self.assertEqual(len(df.collect()), 10)
+    self.con.execute("insert into facts values (10, 'n10')")
+    self.assertEqual(len(df.collect()), 11)
+
+    info = cache.info()
+    self.assertEqual(info.hits, 1)
+    self.assertEqual(info.invalidations, 1)
+
+  def test_ttl(self):
+    cache = ResultCache(ttl=0.05, useChangeMarkers=False)
+    self.use(cache)
+    df = grizzly.read_table("facts")
+
+    df.collect()
+    df.collect()
+    time.sleep(0.1)
+    df.collect()
+
+    info = cache.info()
+    self.assertEqual(info.hits, 1)
+    self.assertEqual(info.misses, 2)
+
+  def test_evictLRU(self):
+    cache = ResultCache(maxEntries=2)
+    for k in ["a", "b", "c"]:
+      if k == "c":
+        # a was used last, b is evicted
+        self.assertIsNotNone(cache.get("a"))
+      cache.put(k, [("x",)], [(1,)])
+
+    self.assertIsNone(cache.get("b"))
+    self.assertIsNotNone(cache.get("a"))
+    self.assertIsNotNone(cache.get("c"))
+    self.assertEqual(cache.info().evictions, 1)
+
+  def test_byteBudget(self):
+    rows = [(i, f"value {i}") for i in range(1000)]
+    size = ResultCache._estimateBytes(rows)
+    cache = ResultCache(maxBytes=int(size * 2.5))
+
+    for k in ["a", "b", "c"]:
+      cache.put(k, [("id",), ("v",)], rows)
+
+    info = cache.info()
+    self.assertEqual(info.size, 2)
+    self.assertLessEqual(info.bytes, info.maxBytes)
+    self.assertIsNone(cache.get("a"))
+
+    # too large for the cache at all
+    cache.put("d", [("id",), ("v",)], rows * 3)
+    self.assertIsNone(cache.get("d"))
+    self.assertIsNotNone(cache.get("c"))
+
+  def test_spill(self):
+    spillDir = tempfile.mkdtemp()
+    try:
+      rows = [(i, f"value {i}", i / 2) for i in range(1000)]
+      size = ResultCache._estimateBytes(rows)
+      cache = ResultCache(maxBytes=int(size * 1.5), spillDir=spillDir)
+
+      cache.put("a", [("id",), ("v",), ("f",)], rows)
+      cache.put("b", [("id",), ("v",), ("f",)], rows[:600])
+
+      info = cache.info()
+      self.assertEqual(info.spilled, 1)
+      self.assertGreater(info.spilledBytes, 0)
+
+      (description, loaded) = cache.get("a")
+      self.assertEqual(loaded, rows)
+      self.assertEqual(description, [("id",), ("v",), ("f",)])
+
+      cache.clear()
+      info = cache.info()
+      self.assertEqual((info.size, info.spilled, info.spilledBytes, info.bytes), (0, 0, 0, 0))
+    finally:
+      shutil.rmtree(spillDir)
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class RowCountTest(unittest.TestCase):
+
+  def setUp(self):
+    c = sqlite3.connect(":memory:")
+    c.execute("create table numbers (n int, m int)")
+    c.executemany("insert into numbers values (?, ?)", [(i, i % 3) for i in range(100)])
+    c.execute("analyze")
+    # the statistics are outdated now
+    c.executemany("insert into numbers values (?, ?)", [(i, i % 3) for i in range(100, 120)])
+    c.execute("create table empty (n int)")
+
+    self.executor = RelationalExecutor(c, SQLGenerator("sqlite"))
+    grizzly.use(self.executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_exactByDefault(self):
+    df = grizzly.read_table("numbers")
+    self.assertEqual(len(df), 120)
+    self.assertEqual(df.rowcount(), (120, True))
+    self.assertEqual(df.shape, (2, 120))
+
+  def test_approx(self):
+    df = grizzly.read_table("numbers")
+    self.assertEqual(df.rowcount(approx=True), (100, False))
+
+  def test_approxMode(self):
+    self.executor.approximateCounts = True
+    df = grizzly.read_table("numbers")
+    self.assertEqual(len(df), 100)
+    self.assertEqual(df.shape, (2, 100))
+    self.assertEqual(df.rowcount(approx=False), (120, True))
+
+  def test_approxFiltered(self):
+    df = grizzly.read_table("numbers")
+    df = df[df.m == 1]
+    self.assertEqual(df.rowcount(approx=True), (40, True))
+
+  def test_approxNoStatistics(self):
+    df = grizzly.read_table("empty")
+    self.assertEqual(df.rowcount(approx=True), (0, True))
+
+  def test_approxZeroEstimate(self):
+    self.executor.connection.execute("update sqlite_stat1 set stat = '0' where tbl = 'numbers'")
+    df = grizzly.read_table("numbers")
+    self.assertEqual(df.rowcount(approx=True), (120, True))
+
+  def test_approxNoStatisticsTable(self):
+    c = sqlite3.connect(":memory:")
+    c.execute("create table numbers (n int)")
+    c.execute("insert into numbers values (1)")
+    grizzly.use(RelationalExecutor(c, SQLGenerator("sqlite"), approximateCounts=True))
+
+    self.assertEqual(grizzly.read_table("numbers").rowcount(), (1, True))
+
+if __name__ == "__main__":
+    unittest.main()
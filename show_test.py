@@ -0,0 +1,87 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class ShowTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.con.execute("create table numbers (id int, name text)")
+    self.con.executemany("insert into numbers values (?, ?)", [(i, f"n{i}") for i in range(100)])
+    self.con.commit()
+
+    self.statements = []
+    self.con.set_trace_callback(self.statements.append)
+    self.executor = RelationalExecutor(self.con)
+    grizzly.use(self.executor)
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_limitPushedDown(self):
+    df = grizzly.read_table("numbers")
+    res = self.executor.toString(df, limit=5)
+
+    lines = res.split("\n")
+    self.assertEqual(lines[0], "id,name")
+    self.assertEqual(lines[1:6], [f"{i},n{i}" for i in range(5)])
+    self.assertEqual(lines[6], "and more...")
+    self.assertEqual(len(lines), 7)
+
+    self.assertEqual(len(self.statements), 1)
+    self.assertIn("LIMIT 6", self.statements[0].upper())
+
+  def test_countRemaining(self):
+    df = grizzly.read_table("numbers")
+    df = df[df.id >= 10]
+    res = self.executor.toString(df, limit=5, countRemaining=True)
+    self.assertEqual(res.split("\n")[-1], "and 85 more...")
+
+  def test_estimatedRemaining(self):
+    self.con.execute("analyze")
+    self.executor.approximateCounts = True
+    df = grizzly.read_table("numbers")
+    res = self.executor.toString(df, limit=5, countRemaining=True)
+    self.assertEqual(res.split("\n")[-1], "and about 95 more...")
+
+  def test_noRemainder(self):
+    df = grizzly.read_table("numbers")
+    df = df[df.id < 5]
+    res = self.executor.toString(df, limit=5, countRemaining=True)
+    self.assertEqual(len(res.split("\n")), 6)
+    self.assertNotIn("more", res)
+
+  def test_noLimit(self):
+    df = grizzly.read_table("numbers")
+    res = self.executor.toString(df, limit=None)
+    self.assertEqual(len(res.split("\n")), 101)
+    self.assertNotIn("LIMIT", self.statements[0].upper())
+
+  def test_pretty(self):
+    df = grizzly.read_table("numbers")
+    res = self.executor.toString(df, pretty=True, limit=3)
+    lines = res.split("\n")
+    self.assertEqual(len(lines), 5)
+    self.assertEqual(lines[-1], "and more...")
+
+    empty = df[df.id < -1]
+    res = self.executor.toString(empty, pretty=True, limit=3)
+    self.assertEqual(len(res.split("\n")), 1)
+
+  def test_table(self):
+    df = grizzly.read_table("numbers")
+    res = self.executor.table(df, limit=5)
+    self.assertIn("n5", res)
+    self.assertNotIn("n6", res)
+    self.assertIn("LIMIT 6", self.statements[0].upper())
+
+  def test_sliced(self):
+    df = grizzly.read_table("numbers")[:3]
+    res = self.executor.toString(df, limit=2)
+    self.assertEqual(res.split("\n"), ["id,name", "0,n0", "1,n1", "and more..."])
+    self.assertIn("n2", self.executor.table(df, limit=2))
+
+if __name__ == "__main__":
+  unittest.main()
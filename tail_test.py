@@ -0,0 +1,69 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class TailTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.con.execute("create table scores (id int, grp int, score real)")
+    self.con.executemany("insert into scores values (?, ?, ?)", [(i, i % 3, (i * 37) % 101) for i in range(50)])
+    self.con.commit()
+
+    self.statements = []
+    self.con.set_trace_callback(self.statements.append)
+    grizzly.use(RelationalExecutor(self.con))
+
+  def tearDown(self):
+    grizzly.close()
+
+  def test_tail(self):
+    df = grizzly.read_table("scores")
+    df = df.sort_values("score")
+    expected = df.collect()[-5:]
+    self.statements.clear()
+
+    self.assertEqual(df.tail(5), expected)
+
+    self.assertEqual(len(self.statements), 1)
+    sql = self.statements[0].upper()
+    self.assertIn("DESC", sql)
+    self.assertIn("LIMIT 5", sql)
+    self.assertNotIn("OFFSET", sql)
+    self.assertNotIn("COUNT", sql)
+
+  def test_tailDescending(self):
+    df = grizzly.read_table("scores")
+    df = df.sort_values("id", ascending=False)
+    self.assertEqual([r[0] for r in df.tail(3)], [2, 1, 0])
+
+  def test_tailMixed(self):
+    df = grizzly.read_table("scores")
+    df = df.sort_values(["grp", "id"], ascending=[True, False])
+    expected = df.collect()[-4:]
+    self.assertEqual(df.tail(4), expected)
+
+    # the ordering itself is unchanged
+    self.assertEqual(df.collect()[-4:], expected)
+
+  def test_tailComputed(self):
+    df = grizzly.read_table("scores")
+    df = df.sort_values("score")
+    df["double"] = df.score * 2
+    expected = df.collect()[-3:]
+    self.assertEqual(len(expected[0]), 4)
+    self.assertEqual(df.tail(3), expected)
+
+  def test_tailMoreThanRows(self):
+    df = grizzly.read_table("scores")
+    df = df.sort_values("id")
+    self.assertEqual(len(df.tail(100)), 50)
+
+  def test_tailUnordered(self):
+    df = grizzly.read_table("scores")
+    self.assertRaises(ValueError, lambda: df.tail(5))
+
+if __name__ == "__main__":
+  unittest.main()
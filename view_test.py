@@ -0,0 +1,85 @@
+import unittest
+import sqlite3
+
+import grizzly
+from grizzly.dataframes.frame import Table, View
+from grizzly.sqlgenerator import SQLGenerator
+from grizzly.relationaldbexecutor import RelationalExecutor
+
+class ViewTest(unittest.TestCase):
+
+  def setUp(self):
+    self.con = sqlite3.connect(":memory:")
+    self.con.execute("create table orders (id int, customer int, amount real)")
+    self.con.executemany("insert into orders values (?, ?, ?)", [(i, i % 10, i * 1.5) for i in range(100)])
+    self.con.commit()
+
+    self.statements = []
+    self.con.set_trace_callback(self.statements.append)
+    grizzly.use(RelationalExecutor(self.con, SQLGenerator("sqlite")))
+
+  def tearDown(self):
+    grizzly.close()
+
+  def large(self):
+    df = grizzly.read_table("orders")
+    return df[df.amount > 100]
+
+  def objects(self, type):
+    return [r[0] for r in self.con.execute(f"select name from sqlite_master where type = '{type}'").fetchall()]
+
+  def test_view(self):
+    df = self.large()
+    expected = df.collect()
+
+    view = df.to_view("large_orders")
+    self.assertIsInstance(view, View)
+    self.assertIsInstance(view, Table)
+    self.assertIn("large_orders", self.objects("view"))
+
+    self.statements.clear()
+    self.assertEqual(view.collect(), expected)
+    self.assertIn("FROM large_orders", self.statements[-1])
+    self.assertNotIn("amount >", self.statements[-1])
+
+    # a plain view always shows the current data
+    self.con.execute("insert into orders values (1000, 1, 1000)")
+    self.assertEqual(len(view.collect()), len(expected) + 1)
+    view.refresh()
+
+  def test_derived(self):
+    view = self.large().to_view("large_orders")
+    self.assertEqual(view[view.customer == 3].count("id"), 3)
+
+  def test_materialized(self):
+    df = self.large()
+    expected = df.collect()
+
+    view = df.to_view("large_orders", materialized=True)
+    # emulated with a table
+    self.assertIn("large_orders", self.objects("table"))
+    self.assertEqual(view.collect(), expected)
+
+    self.con.execute("insert into orders values (1000, 1, 1000)")
+    self.con.commit()
+    self.assertEqual(view.collect(), expected)
+
+    view.refresh()
+    self.assertEqual(len(view.collect()), len(expected) + 1)
+    self.assertTrue(any([s.startswith("INSERT INTO large_orders SELECT") for s in self.statements]))
+
+  def test_templates(self):
+    df = grizzly.read_table("orders")
+    df = df[df.id > 5]
+    (_, statements, sql) = SQLGenerator("postgresql").generateView(df, "v", True)
+    self.assertEqual(statements, [f"CREATE MATERIALIZED VIEW v AS {sql}"])
+    # constants are inlined
+    self.assertIn("5", sql)
+
+    view = View("v", None, df.schema, True, sql)
+    self.assertEqual(SQLGenerator("postgresql").getRefreshView(view), ["REFRESH MATERIALIZED VIEW v"])
+    self.assertEqual(SQLGenerator("sqlite").getRefreshView(view), ["DELETE FROM v", f"INSERT INTO v {sql}"])
+    self.assertEqual(SQLGenerator("postgresql").getRefreshView(View("v", None, df.schema, False, sql)), [])
+
+if __name__ == "__main__":
+  unittest.main()